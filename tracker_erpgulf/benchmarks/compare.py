@@ -0,0 +1,65 @@
+"""
+Compare two benchmark runs written by `run.py`.
+
+    python -m tracker_erpgulf.benchmarks.compare base.json new.json [--threshold 0.1]
+
+Results are matched on scenario, metric and checkpoint (the n-th sample of a
+scenario). A p50 that is worse than the base by more than `threshold` is a
+regression; the exit status is 1 if there is any, so CI can gate on it.
+"""
+
+import argparse
+import json
+import sys
+
+HIGHER_IS_BETTER = {"rows_per_sec"}
+
+
+def load(path):
+    with open(path) as f:
+        report = json.load(f)
+
+    results, seen = {}, {}
+    for result in report["results"]:
+        if "p50" not in result:
+            continue
+        key = (result["scenario"], result["metric"])
+        checkpoint = seen[key] = seen.get(key, 0) + 1
+        results[key + (checkpoint,)] = result
+    return report["meta"], results
+
+
+def compare(base, new, threshold=0.1):
+    """Rows of (scenario, metric, checkpoint, base p50, new p50, change, regressed)."""
+    rows = []
+    for key in sorted(base.keys() & new.keys()):
+        old, current = base[key]["p50"], new[key]["p50"]
+        change = (current - old) / old if old else 0.0
+        worse = -change if key[1] in HIGHER_IS_BETTER else change
+        rows.append(key + (old, current, change, worse > threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed p50 slowdown, 0.1 = 10%%")
+    args = parser.parse_args(argv)
+
+    base_meta, base = load(args.base)
+    new_meta, new = load(args.new)
+    if base_meta.get("params") != new_meta.get("params"):
+        print(f"warning: runs used different parameters: {base_meta.get('params')} vs {new_meta.get('params')}")
+
+    rows = compare(base, new, args.threshold)
+    print(f"{base_meta.get('commit')} -> {new_meta.get('commit')}")
+    for scenario, metric, checkpoint, old, current, change, regressed in rows:
+        flag = "REGRESSION" if regressed else ""
+        print(f"{scenario:16} {metric:14} #{checkpoint}  {old:12.6f} {current:12.6f} {change:+8.1%}  {flag}")
+
+    return 1 if any(row[-1] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
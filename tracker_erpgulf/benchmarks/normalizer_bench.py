@@ -0,0 +1,45 @@
+"""
+Micro-benchmark of the entry normalizer.
+
+    python -m tracker_erpgulf.benchmarks.normalizer_bench [--entries 5000] [--repeat 5]
+
+Prints one JSON object with the per-entry cost (best of `repeat` runs).
+Needs no site or database.
+"""
+
+import argparse
+import json
+import time
+
+from tracker_erpgulf.benchmarks.synthetic import SyntheticFleet
+from tracker_erpgulf.tracker_erpgulf.normalizer import compile_normalizer
+
+
+def run(entries=5000, repeat=5):
+    normalize = compile_normalizer("Asia/Qatar")
+    payload = SyntheticFleet(entries, start_ms=1760000000000).snapshot()
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for entry in payload:
+            normalize(entry, entry["vehicleId"])
+        timings.append(time.perf_counter() - started)
+
+    best = min(timings)
+    return {
+        "benchmark": "normalizer",
+        "entries": entries,
+        "repeat": repeat,
+        "best_seconds": round(best, 6),
+        "us_per_entry": round(best / entries * 1e6, 2),
+        "entries_per_sec": round(entries / best),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.entries, args.repeat)))
@@ -0,0 +1,199 @@
+"""
+End-to-end benchmarks against a site, fed by a synthetic fleet through a local
+stub provider.
+
+    bench --site <site> execute tracker_erpgulf.benchmarks.run.run \
+        --kwargs "{'vehicles': 500, 'minutes': 60, 'checkpoints': 4}"
+
+Scenarios:
+- ingestion: one `create_vehicle_tracking` per simulated minute (poll time, rows/sec)
+- dashboard: uncached `build_dashboard_data` as history grows
+- route_map / route_api / tracking_report: one vehicle-day, as history grows
+- tracking_summary: the fleet's daily summaries for today
+
+Every sample is written to one JSON document (printed, and saved under
+`sites/<site>/private/benchmarks/`) that `compare.py` can diff against an
+earlier run. Run it on a development site: it writes BENCH-* vehicles and
+their history, and removes them afterwards unless `cleanup=False`.
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import frappe
+from frappe.utils import cint, now_datetime, nowdate
+
+from tracker_erpgulf.benchmarks.stub_provider import serve
+from tracker_erpgulf.benchmarks.synthetic import SyntheticFleet
+
+PREFIX = "BENCH"
+
+
+def run(vehicles=200, minutes=30, checkpoints=3, repeat=5, seed=0, cleanup=True, output=None):
+    vehicles, minutes, checkpoints, repeat = cint(vehicles), cint(minutes), max(cint(checkpoints), 1), cint(repeat) or 1
+    frappe.only_for("System Manager")
+
+    report = {
+        "meta": get_meta(vehicles=vehicles, minutes=minutes, checkpoints=checkpoints, repeat=repeat, seed=seed),
+        "results": [],
+    }
+    fleet = SyntheticFleet(
+        vehicles,
+        start_ms=(time.time() - minutes * 60) * 1000,
+        seed=cint(seed),
+        prefix=PREFIX,
+        tz=frappe.utils.get_system_timezone(),
+    )
+    checkpoint_minutes = {round(minutes * (i + 1) / checkpoints) for i in range(checkpoints)}
+    probe_vehicle = f"{PREFIX}-00000"
+
+    try:
+        with serve(fleet.minutes(minutes)) as provider, stub_account(provider.url):
+            polls = []
+            for minute in range(1, minutes + 1):
+                started = time.perf_counter()
+                result = call_tracker()
+                polls.append((time.perf_counter() - started, result))
+
+                if minute in checkpoint_minutes:
+                    history = frappe.db.count("Vehicle Tracking System", {"reg_no": ["like", f"{PREFIX}-%"]})
+                    record_polls(report, polls, history, provider)
+                    record_queries(report, history, probe_vehicle, repeat)
+                    polls = []
+    finally:
+        if cleanup:
+            remove_benchmark_data()
+
+    save(report, output)
+    return report
+
+
+def call_tracker():
+    from tracker_erpgulf.tracker_erpgulf.tracker import create_vehicle_tracking
+
+    return create_vehicle_tracking()
+
+
+@contextmanager
+def stub_account(url):
+    """Point ingestion at the stub provider without touching Vehicle Tracking Setting."""
+    account = frappe._dict(name="benchmark", base_url=url, params={})
+    with patch(
+        "tracker_erpgulf.tracker_erpgulf.tracker.get_provider_accounts",
+        return_value=[account],
+    ):
+        yield
+
+
+def record_polls(report, polls, history, provider):
+    durations = [duration for duration, _result in polls]
+    received = sum(result.get("received", 0) for _duration, result in polls)
+    errors = [result for _duration, result in polls if result.get("status") != "success"]
+
+    add(report, "ingestion", "poll_seconds", durations, history)
+    add(report, "ingestion", "rows_per_sec", [received / sum(durations)] if sum(durations) else [0], history)
+    add(report, "ingestion", "payload_bytes", [provider.bytes_sent / max(provider.requests, 1)], history, unit="bytes")
+    if errors:
+        report["results"].append({"scenario": "ingestion", "metric": "errors", "history_rows": history, "samples": errors})
+
+
+def record_queries(report, history, vehicle, repeat):
+    from tracker_erpgulf.tracker_erpgulf.report.vehicle_daily_route_map import vehicle_daily_route_map
+    from tracker_erpgulf.tracker_erpgulf.report.vehicle_tracking_report import vehicle_tracking_report
+    from tracker_erpgulf.tracker_erpgulf.route import ROUTE_CACHE_PREFIX, get_day_route
+    from tracker_erpgulf.tracker_erpgulf.vehicle_tracking_dashboard import build_dashboard_data, clear_dashboard_cache
+
+    today = nowdate()
+    scenarios = {
+        "dashboard": build_dashboard_data,
+        "route_map": lambda: vehicle_daily_route_map.execute({"vehicle": vehicle, "route_date": today}),
+        "route_api": lambda: get_day_route(vehicle, today),
+        "tracking_report": lambda: vehicle_tracking_report.execute(
+            {"mode": "Raw Points", "vehicle": vehicle, "from_date": today, "to_date": today}
+        ),
+        "tracking_summary": lambda: vehicle_tracking_report.execute({"mode": "Summary", "from_date": today, "to_date": today}),
+    }
+
+    for scenario, call in scenarios.items():
+        samples = []
+        for _ in range(repeat):
+            frappe.cache().delete_keys(ROUTE_CACHE_PREFIX)
+            clear_dashboard_cache()
+            started = time.perf_counter()
+            call()
+            samples.append(time.perf_counter() - started)
+        add(report, scenario, "seconds", samples, history)
+
+
+def add(report, scenario, metric, samples, history, unit=None):
+    samples = sorted(samples)
+    report["results"].append({
+        "scenario": scenario,
+        "metric": metric,
+        "unit": unit or ("rows/s" if metric == "rows_per_sec" else "s"),
+        "history_rows": history,
+        "n": len(samples),
+        "min": round(samples[0], 6),
+        "p50": round(statistics.median(samples), 6),
+        "p95": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 6),
+        "max": round(samples[-1], 6),
+        "mean": round(statistics.fmean(samples), 6),
+    })
+
+
+def get_meta(**params):
+    app_path = frappe.get_app_path("tracker_erpgulf")
+    try:
+        commit = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=app_path, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "timestamp": str(now_datetime()),
+        "commit": commit,
+        "site": frappe.local.site,
+        "python": platform.python_version(),
+        "frappe": frappe.__version__,
+        "db": frappe.db.db_type,
+        "ingestion_mode": frappe.db.get_single_value("Vehicle Tracking Setting", "ingestion_mode"),
+        "params": params,
+    }
+
+
+def save(report, output=None):
+    path = output or frappe.get_site_path(
+        "private", "benchmarks", f"benchmark-{now_datetime().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=1, default=str)
+    report["meta"]["output"] = path
+    print(json.dumps(report, indent=1, default=str))
+
+
+def remove_benchmark_data():
+    from tracker_erpgulf.tracker_erpgulf.doctype.vehicle_device_profile.vehicle_device_profile import PROFILE_HASH_KEY
+    from tracker_erpgulf.tracker_erpgulf.fleet import invalidate_fleet_index
+    from tracker_erpgulf.tracker_erpgulf.vehicle_tracking_dashboard import clear_dashboard_cache
+
+    like = f"{PREFIX}-%"
+    frappe.db.delete("Vehicle Tracking System", {"reg_no": ["like", like]})
+    frappe.db.delete("Vehicle Live State", {"vehicle": ["like", like]})
+    frappe.db.delete("Vehicle Trip", {"vehicle": ["like", like]})
+    frappe.db.delete("Vehicle Daily Summary", {"vehicle": ["like", like]})
+    frappe.db.delete("Vehicle Device Profile", {"vehicle": ["like", like]})
+    frappe.db.delete("Geofence Event", {"vehicle": ["like", like]})
+    frappe.db.delete("Vehicle", {"name": ["like", like]})
+    frappe.db.commit()
+
+    invalidate_fleet_index()
+    clear_dashboard_cache()
+    frappe.cache().delete_value(PROFILE_HASH_KEY)
@@ -0,0 +1,58 @@
+"""
+Local stand-in for the Vamosys endpoint: serves one payload per request.
+"""
+
+import gzip
+import json
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            payload = next(server.payloads, [])
+        body = json.dumps(payload, separators=(",", ":")).encode()
+
+        headers = {"Content-Type": "application/json"}
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+        headers["Content-Length"] = str(len(body))
+
+        self.send_response(200)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+        with server.lock:
+            server.requests += 1
+            server.bytes_sent += len(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@contextmanager
+def serve(payloads):
+    """
+    Serve `payloads` (an iterable of JSON-able bodies) on a free local port,
+    one per request; yields the server, whose `url` is the endpoint.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.payloads = iter(payloads)
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.bytes_sent = 0
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/vehicles"
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,138 @@
+"""
+Synthetic Vamosys fleet: realistic provider payloads without a provider.
+
+Each vehicle alternates between driving (a random walk around Doha at city
+speeds), short stops and longer parking, with odometer, working hours and
+timestamps that move on consistently between snapshots. Needs no site.
+"""
+
+import math
+import random
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+
+CENTER = (25.2854, 51.5310)  # Doha
+SPREAD_DEGREES = 0.15
+AREAS = ["Salwa Road", "C Ring Road", "Industrial Area", "West Bay", "Al Wakrah", "Lusail", "Al Rayyan"]
+
+
+class SyntheticFleet:
+    def __init__(self, vehicles, start_ms=None, seed=0, prefix="BENCH", tz="Asia/Qatar"):
+        self.rng = random.Random(seed)
+        self.tz = ZoneInfo(tz)  # lastSeen is local time, like the provider's
+        self.now_ms = int(start_ms if start_ms is not None else time.time() * 1000)
+        self.vehicles = [self._new_vehicle(i, prefix) for i in range(vehicles)]
+
+    def _new_vehicle(self, i, prefix):
+        rng = self.rng
+        return {
+            "plate": f"{prefix}-{i:05d}",
+            "lat": CENTER[0] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES),
+            "lng": CENTER[1] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES),
+            "heading": rng.uniform(0, 2 * math.pi),
+            "state": rng.choice("MSP"),
+            "state_left": rng.randint(1, 30),  # minutes
+            "speed": 0,
+            "odometer": rng.randint(10_000, 400_000) * 1000,
+            "working_ms": 0,
+            "ac": rng.random() < 0.7,
+            "make": rng.choice(["Toyota", "Nissan", "Isuzu", "Mitsubishi"]),
+            "model": rng.choice(["Hiace", "Urvan", "NPR", "Canter"]),
+            "area": rng.choice(AREAS),
+        }
+
+    def step(self, seconds=60):
+        """Advance every vehicle by `seconds`."""
+        rng = self.rng
+        self.now_ms += seconds * 1000
+
+        for vehicle in self.vehicles:
+            vehicle["state_left"] -= seconds / 60
+            if vehicle["state_left"] <= 0:
+                vehicle["state"] = rng.choices("MSP", weights=(6, 3, 1))[0]
+                vehicle["state_left"] = {"M": rng.randint(5, 40), "S": rng.randint(1, 8), "P": rng.randint(20, 120)}[vehicle["state"]]
+
+            if vehicle["state"] == "M":
+                vehicle["speed"] = max(5, min(120, int(rng.gauss(45, 18))))
+                vehicle["heading"] += rng.gauss(0, 0.4)
+                meters = vehicle["speed"] / 3.6 * seconds
+                vehicle["lat"] += meters * math.cos(vehicle["heading"]) / 111_320
+                vehicle["lng"] += meters * math.sin(vehicle["heading"]) / (111_320 * math.cos(math.radians(vehicle["lat"])))
+                vehicle["odometer"] += int(meters)
+                vehicle["working_ms"] += seconds * 1000
+            else:
+                vehicle["speed"] = 0
+                if vehicle["state"] == "S":
+                    vehicle["working_ms"] += seconds * 1000
+
+    def snapshot(self):
+        """The provider payload at the current time: one entry per vehicle."""
+        now = datetime.fromtimestamp(self.now_ms / 1000, tz=self.tz)
+        last_seen = now.strftime("%d-%m-%Y %H:%M:%S")
+        return [self._entry(vehicle, last_seen) for vehicle in self.vehicles]
+
+    def minutes(self, minutes, interval=60):
+        """Yield `minutes` consecutive snapshots `interval` seconds apart."""
+        for _ in range(minutes):
+            self.step(interval)
+            yield self.snapshot()
+
+    def _entry(self, vehicle, last_seen):
+        rng = self.rng
+        moving = vehicle["state"] == "M"
+        return {
+            "vehicleId": vehicle["plate"],
+            "regNo": vehicle["plate"],
+            "vehicleName": vehicle["plate"],
+            "shortName": vehicle["plate"],
+            "vehicleMake": vehicle["make"],
+            "vehicleModel": vehicle["model"],
+            "vehicleType": "Truck",
+            "vehicleTypeLabel": "Truck",
+            "driverName": f"Driver {vehicle['plate'][-3:]}",
+            "driverMobile": "+97450000000",
+            "deviceId": f"DEV{vehicle['plate'][-5:]}",
+            "deviceModel": "GT06",
+            "gpsSimNo": "97455000000",
+            "date": self.now_ms,
+            "dateSec": self.now_ms // 1000,
+            "lastSeen": last_seen,
+            "lastComunicationTime": self.now_ms,
+            "lat": round(vehicle["lat"], 6),
+            "lng": round(vehicle["lng"], 6),
+            "speed": vehicle["speed"],
+            "direction": int(math.degrees(vehicle["heading"])) % 360,
+            "position": vehicle["state"],
+            "color": vehicle["state"],
+            "odoDistance": vehicle["odometer"],
+            "distanceCovered": vehicle["odometer"] % 250_000,
+            "todayWorkingHours": vehicle["working_ms"],
+            "movingTime": vehicle["working_ms"],
+            "parkedTime": 0,
+            "idleTime": 0,
+            "ac": vehicle["ac"] and vehicle["state"] != "P",
+            "ignitionStatus": "ON" if vehicle["state"] != "P" else "OFF",
+            "status": "ON" if vehicle["state"] != "P" else "OFF",
+            "isOverSpeed": "Y" if vehicle["speed"] > 100 else "N",
+            "overSpeedLimit": 100,
+            "vehicleBusy": "yes" if moving else "no",
+            "live": "yes",
+            "expired": "no",
+            "expiryStatus": "no",
+            "expiryDate": "31-12-2027",
+            "expiryDays": 800,
+            "onboardDate": "01-01-2024",
+            "address": f"{vehicle['area']}, Doha, Qatar",
+            "insideGeoFence": "-",
+            "deviceVolt": round(rng.uniform(12.1, 13.9), 1),
+            "powerStatus": "1",
+            "temperature": rng.randint(25, 45),
+            "fuelLitre": rng.randint(10, 80),
+            "tankSize": 80,
+            "altitude": rng.randint(0, 40),
+            "sensorBasedVehicleMode": [{"sensor": 1, "mode": "ON" if moving else "OFF"}],
+            "gpsSignal": rng.randint(2, 5),  # unmapped keys end up in more_details
+            "gsmSignal": rng.randint(2, 5),
+        }
@@ -0,0 +1,43 @@
+import click
+from frappe.commands import get_site, pass_context
+
+
+@click.command("rebuild-daily-attendance")
+@click.option("--from-date", required=True, help="First day to rebuild (YYYY-MM-DD)")
+@click.option("--to-date", help="Last day to rebuild, defaults to --from-date")
+@pass_context
+def rebuild_daily_attendance(context, from_date, to_date=None):
+    """Recompute Daily Attendance from Employee Checkin for a date range."""
+    import frappe
+
+    from tracker_erpgulf.tracker_erpgulf.attendance import rebuild_daily_attendance as rebuild
+
+    frappe.init(site=get_site(context))
+    frappe.connect()
+    try:
+        rows = rebuild(from_date, to_date)
+        click.echo(f"Rebuilt {rows} Daily Attendance rows")
+    finally:
+        frappe.destroy()
+
+
+@click.command("rebuild-vehicle-daily-summary")
+@click.option("--from-date", required=True, help="First day to rebuild (YYYY-MM-DD)")
+@click.option("--to-date", help="Last day to rebuild, defaults to --from-date")
+@pass_context
+def rebuild_vehicle_daily_summary(context, from_date, to_date=None):
+    """Recompute Vehicle Daily Summary from raw tracking points for a date range."""
+    import frappe
+
+    from tracker_erpgulf.tracker_erpgulf.daily_summary import rebuild_daily_summaries
+
+    frappe.init(site=get_site(context))
+    frappe.connect()
+    try:
+        vehicle_days = rebuild_daily_summaries(from_date, to_date)
+        click.echo(f"Rebuilt {vehicle_days} Vehicle Daily Summary rows")
+    finally:
+        frappe.destroy()
+
+
+commands = [rebuild_daily_attendance, rebuild_vehicle_daily_summary]
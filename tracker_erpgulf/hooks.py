@@ -238,15 +238,33 @@ app_license = "mit"
 # Automatically update python controller files with type annotations for this app.
 # export_python_type_annotations = True
 
-# default_log_clearing_doctypes = {
-# 	"Logging DocType Name": 30  # days to retain logs
-# }
+default_log_clearing_doctypes = {
+    "Vehicle Tracking Poll Log": 14  # days to retain logs
+}
 
 scheduler_events = {
     "cron": {
         "* * * * *": [  # runs every minute
             "tracker_erpgulf.tracker_erpgulf.schedule.scheduled_vehicle_tracking"
+        ],
+        "*/10 * * * *": [
+            "tracker_erpgulf.tracker_erpgulf.trips.enqueue_trip_update"
         ]
+    },
+    "daily_long": [
+        "tracker_erpgulf.tracker_erpgulf.retention.enqueue_retention"
+    ]
+}
+doc_events = {
+    "Vehicle": {
+        "after_insert": "tracker_erpgulf.tracker_erpgulf.fleet.invalidate_fleet_index",
+        "on_update": "tracker_erpgulf.tracker_erpgulf.fleet.invalidate_fleet_index",
+        "after_rename": "tracker_erpgulf.tracker_erpgulf.fleet.invalidate_fleet_index",
+        "on_trash": "tracker_erpgulf.tracker_erpgulf.fleet.invalidate_fleet_index"
+    },
+    "Employee Checkin": {
+        "on_update": "tracker_erpgulf.tracker_erpgulf.attendance.update_daily_attendance",
+        "after_delete": "tracker_erpgulf.tracker_erpgulf.attendance.update_daily_attendance"
     }
 }
 doctype_js = {
@@ -0,0 +1,10 @@
+import frappe
+
+
+def execute():
+    """Index Employee Checkin for the date-range and per-employee lookups of the check-in reports."""
+    if not frappe.db.table_exists("Employee Checkin"):
+        return
+
+    frappe.db.add_index("Employee Checkin", ["time"])
+    frappe.db.add_index("Employee Checkin", ["employee", "time"])
@@ -0,0 +1,59 @@
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import frappe
+from frappe.utils.data import get_system_timezone
+
+
+CHUNK_SIZE = 5000
+
+
+def execute():
+    """
+    Fill `event_time` on existing tracking points from the epoch-millisecond
+    `date` column (or `last_comm`, then `creation`, when it is unusable).
+    Walks the table in primary-key order and commits per chunk.
+    """
+    system_tz = ZoneInfo(get_system_timezone())
+    last_name = ""
+
+    while True:
+        rows = frappe.db.sql(
+            """
+            SELECT name, date, last_comm, creation, event_time
+            FROM `tabVehicle Tracking System`
+            WHERE name > %s
+            ORDER BY name
+            LIMIT %s
+            """,
+            (last_name, CHUNK_SIZE),
+            as_dict=True,
+        )
+        if not rows:
+            break
+
+        last_name = rows[-1].name
+        updates = {}
+
+        for row in rows:
+            if row.event_time:
+                continue
+            try:
+                event_time = datetime.fromtimestamp(int(row.date) / 1000, tz=timezone.utc)
+                event_time = event_time.astimezone(system_tz).replace(tzinfo=None)
+            except (TypeError, ValueError, OverflowError, OSError):
+                event_time = row.last_comm or row.creation
+            updates[row.name] = event_time
+
+        if updates:
+            cases = " ".join(["WHEN %s THEN %s"] * len(updates))
+            params = [value for pair in updates.items() for value in pair]
+            frappe.db.sql(
+                f"""
+                UPDATE `tabVehicle Tracking System`
+                SET event_time = CASE name {cases} END
+                WHERE name IN ({", ".join(["%s"] * len(updates))})
+                """,
+                params + list(updates),
+            )
+        frappe.db.commit()
@@ -0,0 +1,14 @@
+import frappe
+from frappe.utils import getdate, nowdate
+
+from tracker_erpgulf.tracker_erpgulf.attendance import rebuild_daily_attendance
+
+
+def execute():
+    """Build Daily Attendance from the existing Employee Checkin history."""
+    if not frappe.db.table_exists("Employee Checkin"):
+        return
+
+    first = frappe.db.sql("SELECT MIN(time) FROM `tabEmployee Checkin`")[0][0]
+    if first:
+        rebuild_daily_attendance(getdate(first), nowdate())
@@ -0,0 +1,11 @@
+import frappe
+from frappe.utils import getdate, nowdate
+
+from tracker_erpgulf.tracker_erpgulf.daily_summary import rebuild_daily_summaries
+
+
+def execute():
+    """Build Vehicle Daily Summary from the raw points still in Vehicle Tracking System."""
+    first = frappe.db.sql("SELECT MIN(event_time) FROM `tabVehicle Tracking System`")[0][0]
+    if first:
+        rebuild_daily_summaries(getdate(first), nowdate())
@@ -0,0 +1,47 @@
+import frappe
+
+TABLE = "tabVehicle Tracking System"
+CHUNK_SIZE = 10000
+# Same id as tracker_erpgulf.tracker_erpgulf.normalizer.location_id
+LOCATION_ID = "LEFT(SHA2(nearest_location, 256), 16)"
+
+
+def execute():
+    """
+    Store each distinct nearest_location text once in Tracking Location, point
+    every tracking row at it through `location`, then drop the text column.
+    Runs in primary-key chunks, committing after each one.
+    """
+    if not frappe.db.has_column("Vehicle Tracking System", "nearest_location"):
+        return
+
+    last = ""
+    while True:
+        names = frappe.db.sql_list(
+            f"SELECT name FROM `{TABLE}` WHERE name > %s ORDER BY name LIMIT {CHUNK_SIZE}",
+            (last,),
+        )
+        if not names:
+            break
+
+        frappe.db.sql(
+            f"""
+            INSERT IGNORE INTO `tabTracking Location` (name, owner, modified_by, creation, modified, docstatus, address)
+            SELECT DISTINCT {LOCATION_ID}, 'Administrator', 'Administrator', NOW(6), NOW(6), 0, nearest_location
+            FROM `{TABLE}`
+            WHERE name IN %(names)s AND IFNULL(nearest_location, '') != ''
+            """,
+            {"names": names},
+        )
+        frappe.db.sql(
+            f"""
+            UPDATE `{TABLE}`
+            SET location = IF(IFNULL(nearest_location, '') = '', NULL, {LOCATION_ID})
+            WHERE name IN %(names)s
+            """,
+            {"names": names},
+        )
+        frappe.db.commit()
+        last = names[-1]
+
+    frappe.db.sql_ddl(f"ALTER TABLE `{TABLE}` DROP COLUMN `nearest_location`")
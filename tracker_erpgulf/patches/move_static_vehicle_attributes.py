@@ -0,0 +1,75 @@
+import frappe
+
+from tracker_erpgulf.tracker_erpgulf.doctype.vehicle_device_profile.vehicle_device_profile import (
+    PROFILE_HASH_KEY,
+    STATIC_FIELDS,
+    profile_hash,
+    upsert_device_profiles,
+)
+
+TABLE = "tabVehicle Tracking System"
+CHUNK_SIZE = 10000
+
+
+def execute():
+    """
+    Move static vehicle attributes from every tracking row to one Vehicle Device
+    Profile per vehicle, store more_details as compact JSON, then drop the
+    static columns. On MariaDB 10.4+ the DROP COLUMN is instant and frees no
+    space; rebuilding the table to reclaim it is left to an OPTIMIZE TABLE in a
+    maintenance window (see README).
+    """
+    columns = [field for field in STATIC_FIELDS if frappe.db.has_column("Vehicle Tracking System", field)]
+    if columns:
+        seed_profiles(columns)
+
+    compact_more_details()
+
+    if columns:
+        frappe.db.sql_ddl(f"ALTER TABLE `{TABLE}` " + ", ".join(f"DROP COLUMN `{c}`" for c in columns))
+
+
+def seed_profiles(columns):
+    rows = frappe.db.sql(
+        f"""
+        SELECT t.vehicle_name, t.reg_no, {", ".join(f"t.`{c}`" for c in columns)}
+        FROM `{TABLE}` t
+        JOIN (
+            SELECT vehicle_name, MAX(creation) AS creation
+            FROM `{TABLE}`
+            GROUP BY vehicle_name
+        ) latest ON latest.vehicle_name = t.vehicle_name AND latest.creation = t.creation
+        WHERE t.vehicle_name IS NOT NULL
+        """,
+        as_dict=True,
+    )
+
+    profiles = {row.vehicle_name: dict(row, profile_hash=profile_hash(row)) for row in rows}
+    names = list(profiles)
+    for start in range(0, len(names), 500):
+        upsert_device_profiles({name: profiles[name] for name in names[start:start + 500]})
+    frappe.db.commit()
+    frappe.cache().delete_value(PROFILE_HASH_KEY)
+
+
+def compact_more_details():
+    """Re-encode pretty-printed more_details in primary-key chunks, committing after each."""
+    last = ""
+    while True:
+        names = frappe.db.sql_list(
+            f"SELECT name FROM `{TABLE}` WHERE name > %s ORDER BY name LIMIT {CHUNK_SIZE}",
+            (last,),
+        )
+        if not names:
+            break
+
+        frappe.db.sql(
+            f"""
+            UPDATE `{TABLE}`
+            SET more_details = JSON_COMPACT(more_details)
+            WHERE name IN %(names)s AND more_details LIKE %(pretty)s AND JSON_VALID(more_details)
+            """,
+            {"names": names, "pretty": "%\n%"},
+        )
+        frappe.db.commit()
+        last = names[-1]
@@ -0,0 +1,26 @@
+import frappe
+
+from tracker_erpgulf.tracker_erpgulf.doctype.vehicle_live_state.vehicle_live_state import (
+    LIVE_STATE_FIELDS,
+    upsert_live_states,
+)
+
+
+def execute():
+    """Fill Vehicle Live State from the most recent snapshot of each vehicle."""
+    columns = ", ".join(f"t.`{field}`" for field in LIVE_STATE_FIELDS)
+
+    rows = frappe.db.sql(
+        f"""
+        SELECT t.vehicle_name, {columns}
+        FROM `tabVehicle Tracking System` t
+        JOIN (
+            SELECT vehicle_name, MAX(creation) AS creation
+            FROM `tabVehicle Tracking System`
+            GROUP BY vehicle_name
+        ) latest ON latest.vehicle_name = t.vehicle_name AND latest.creation = t.creation
+        """,
+        as_dict=True,
+    )
+
+    upsert_live_states(rows)
@@ -1,12 +1,40 @@
 frappe.ui.form.on("Vehicle", {
     refresh(frm) {
 
+        // 📌 0. Current state from Vehicle Live State
+        if (!frm.is_new()) {
+            frappe.call({
+                method: "tracker_erpgulf.tracker_erpgulf.vehicle.get_live_state",
+                args: { vehicle: frm.doc.name },
+                callback: function (r) {
+                    const state = r.message;
+                    if (!state) return;
+
+                    const colors = {
+                        "M - Moving Vehicle": "green",
+                        "S - Stopped Vehicle": "orange",
+                        "P - Parked Vehicle": "red"
+                    };
+                    frm.dashboard.add_indicator(
+                        `${state.position || "-"} · ${state.speed || 0} km/h`,
+                        colors[state.position] || "gray"
+                    );
+                    frm.dashboard.add_indicator(`A/C ${state.ac || "-"}`, state.ac === "ON" ? "blue" : "gray");
+                    frm.dashboard.add_indicator(
+                        `Last Seen ${state.last_comm ? frappe.datetime.str_to_user(state.last_comm) : "-"}`,
+                        "gray"
+                    );
+                }
+            });
+        }
+
         // 📌 1. View Daily Route Map
         frm.add_custom_button("View Daily Route Map", function () {
             let vehicle = frm.doc.name;
 
             frappe.set_route("query-report", "Vehicle Daily Route Map", {
-                vehicle: vehicle
+                vehicle: vehicle,
+                route_date: frappe.datetime.get_today()
             });
         }, "Actions");
 
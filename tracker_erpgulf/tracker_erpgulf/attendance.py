@@ -0,0 +1,133 @@
+import frappe
+from frappe.utils import add_days, get_datetime, getdate, now
+
+
+ATTENDANCE_FIELDS = (
+    "employee", "employee_name", "department", "attendance_date", "status",
+    "first_in", "last_out", "working_hours", "checkins", "device_id",
+)
+
+
+def get_daily_rows(conditions, values):
+    """
+    First IN, last OUT and check-in count per employee-day for the check-ins
+    matching `conditions` (on `ec`, the Employee Checkin table).
+    """
+    rows = frappe.db.sql(
+        f"""
+        SELECT
+            ec.employee,
+            MAX(ec.employee_name) AS employee_name,
+            emp.department,
+            DATE(ec.time) AS attendance_date,
+            MIN(CASE WHEN ec.log_type = 'IN' THEN ec.time END) AS first_in,
+            MAX(CASE WHEN ec.log_type = 'OUT' THEN ec.time END) AS last_out,
+            COUNT(*) AS checkins,
+            MIN(ec.device_id) AS device_id
+        FROM `tabEmployee Checkin` ec
+        LEFT JOIN `tabEmployee` emp ON emp.name = ec.employee
+        WHERE {conditions}
+        GROUP BY ec.employee, DATE(ec.time), emp.department
+        """,
+        values,
+        as_dict=True,
+    )
+
+    for row in rows:
+        if row.first_in and row.last_out:
+            row.working_hours = round((row.last_out - row.first_in).total_seconds() / 3600, 2)
+            row.status = "Present"
+        else:
+            row.working_hours = 0
+            row.status = "Incomplete"
+
+    return rows
+
+
+def upsert_daily_attendance(rows):
+    if not rows:
+        return
+
+    timestamp = now()
+    user = frappe.session.user
+    columns = ("name", "owner", "modified_by", "creation", "modified", "docstatus") + ATTENDANCE_FIELDS
+
+    values = []
+    for row in rows:
+        values.extend([frappe.generate_hash(length=10), user, user, timestamp, timestamp, 0])
+        values.extend(row.get(field) for field in ATTENDANCE_FIELDS)
+
+    placeholders = ", ".join(["(" + ", ".join(["%s"] * len(columns)) + ")"] * len(rows))
+    updates = ", ".join(f"`{field}` = VALUES(`{field}`)" for field in ATTENDANCE_FIELDS[1:] + ("modified", "modified_by"))
+
+    frappe.db.sql(
+        f"""
+        INSERT INTO `tabDaily Attendance` ({", ".join(f"`{c}`" for c in columns)})
+        VALUES {placeholders}
+        ON DUPLICATE KEY UPDATE {updates}
+        """,
+        values,
+    )
+
+
+def refresh_employee_days(days):
+    """Recompute the Daily Attendance rows of the given (employee, date) pairs."""
+    for employee, day in days:
+        rows = get_daily_rows(
+            "ec.employee = %(employee)s AND ec.time >= %(start)s AND ec.time < %(end)s",
+            {"employee": employee, "start": day, "end": add_days(day, 1)},
+        )
+        if rows:
+            upsert_daily_attendance(rows)
+        else:
+            frappe.db.delete("Daily Attendance", {"employee": employee, "attendance_date": day})
+
+
+def update_daily_attendance(doc, method=None):
+    """
+    Employee Checkin doc event (on_update, which also runs on insert, and
+    after_delete): refresh the day of the check-in, and its old day if it moved.
+    """
+    days = {(doc.employee, getdate(doc.time))} if doc.employee and doc.time else set()
+
+    before = doc.get_doc_before_save()
+    if before and before.employee and before.time:
+        days.add((before.employee, getdate(before.time)))
+
+    refresh_employee_days(days)
+
+
+def rebuild_daily_attendance(from_date, to_date=None):
+    """Recompute Daily Attendance for every employee, one day per query."""
+    day = getdate(from_date)
+    to_date = getdate(to_date or from_date)
+    rebuilt = 0
+
+    while day <= to_date:
+        start = get_datetime(day)
+        rows = get_daily_rows(
+            "ec.time >= %(start)s AND ec.time < %(end)s",
+            {"start": start, "end": add_days(start, 1)},
+        )
+        frappe.db.delete("Daily Attendance", {"attendance_date": day})
+        for chunk_start in range(0, len(rows), 500):
+            upsert_daily_attendance(rows[chunk_start:chunk_start + 500])
+        frappe.db.commit()
+
+        rebuilt += len(rows)
+        day = add_days(day, 1)
+
+    return rebuilt
+
+
+@frappe.whitelist()
+def enqueue_rebuild_daily_attendance(from_date, to_date=None):
+    """Rebuild Daily Attendance for a date range in the background."""
+    frappe.only_for(["System Manager", "HR Manager"])
+    frappe.enqueue(
+        "tracker_erpgulf.tracker_erpgulf.attendance.rebuild_daily_attendance",
+        queue="long",
+        timeout=3600,
+        from_date=from_date,
+        to_date=to_date,
+    )
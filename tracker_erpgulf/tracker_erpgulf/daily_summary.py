@@ -0,0 +1,202 @@
+"""
+Vehicle Daily Summary: one row per vehicle per day, folded incrementally from
+the tracking rows as ingestion writes them.
+
+Each point closes the interval since the vehicle's previous point, which is
+attributed to the previous point's state (moving, idle or parked; AC on).
+Odometer increases are attributed to the day of the later point.
+"""
+
+from datetime import datetime, time as dt_time
+
+import frappe
+from frappe.utils import add_days, cint, flt, get_datetime, getdate, now
+
+
+SUMMARY_DOCTYPE = "Vehicle Daily Summary"
+MAX_GAP_SECONDS = 30 * 60  # longer silences are not attributed to any state
+
+STATE_FIELDS = {
+    "M - Moving Vehicle": "moving_time",
+    "S - Stopped Vehicle": "idle_time",
+    "P - Parked Vehicle": "parked_time",
+}
+POINT_FIELDS = (
+    "vehicle_name", "reg_no", "event_time", "kms", "speed", "position", "ac",
+    "is_over_speed", "today_workinghours",
+)
+ADDITIVE_FIELDS = (
+    "points", "distance", "moving_time", "idle_time", "parked_time", "ac_on_time", "over_speed_count",
+)
+
+
+def fold_points(points, previous=None):
+    """
+    Summarize the time-ordered `points` of one vehicle, continuing from its
+    `previous` point, into {date: totals}. Points that are not newer than the
+    one before them are counted but close no interval.
+    """
+    totals = {}
+    previous_time = get_datetime(previous.get("event_time")) if previous else None
+
+    for point in points:
+        point_time = get_datetime(point.get("event_time"))
+        if point_time is None:
+            continue
+
+        day = point_time.date()
+        summary = totals.get(day)
+        if summary is None:
+            summary = totals[day] = dict.fromkeys(ADDITIVE_FIELDS, 0)
+            summary.update(first_seen=point_time, last_seen=point_time, max_speed=0, working_hours=0)
+
+        speed = cint(point.get("speed"))
+        summary["points"] += 1
+        summary["max_speed"] = max(summary["max_speed"], speed)
+        summary["over_speed_count"] += point.get("is_over_speed") == "YES"
+        summary["working_hours"] = max(summary["working_hours"], flt(point.get("today_workinghours")) / 3_600_000)
+        summary["first_seen"] = min(summary["first_seen"], point_time)
+        summary["last_seen"] = max(summary["last_seen"], point_time)
+
+        if previous_time is not None and point_time <= previous_time:
+            continue
+
+        if previous_time is not None:
+            if (point_time - previous_time).total_seconds() <= MAX_GAP_SECONDS:
+                # Only the part of the interval that falls on this day
+                start = max(previous_time, datetime.combine(day, dt_time.min))
+                seconds = (point_time - start).total_seconds()
+                state = STATE_FIELDS.get(previous.get("position"), "parked_time")
+                summary[state] += seconds
+                if previous.get("ac") == "ON":
+                    summary["ac_on_time"] += seconds
+
+            if point.get("kms") and previous.get("kms"):
+                summary["distance"] += max(flt(point["kms"]) - flt(previous["kms"]), 0)
+
+        previous, previous_time = point, point_time
+
+    return totals
+
+
+def update_daily_summaries(rows):
+    """
+    Ingestion hook: fold freshly written tracking rows into the summaries. Must
+    run before Vehicle Live State is updated, which holds each vehicle's
+    previous point.
+    """
+    by_vehicle = {}
+    for row in rows:
+        if row.get("vehicle_name") and row.get("event_time"):
+            by_vehicle.setdefault(row["vehicle_name"], []).append(row)
+    if not by_vehicle:
+        return
+
+    previous = {
+        state.vehicle: state
+        for state in frappe.get_all(
+            "Vehicle Live State",
+            filters={"vehicle": ["in", list(by_vehicle)]},
+            fields=["vehicle", "event_time", "kms", "position", "ac"],
+        )
+    }
+
+    summaries = []
+    for vehicle, points in by_vehicle.items():
+        points.sort(key=lambda point: get_datetime(point["event_time"]))
+        for day, totals in fold_points(points, previous.get(vehicle)).items():
+            summaries.append({"vehicle": vehicle, "reg_no": points[-1].get("reg_no"), "summary_date": day, **totals})
+
+    upsert_daily_summaries(summaries)
+
+
+def upsert_daily_summaries(summaries):
+    """Merge totals into existing rows: sums are added, extremes widened."""
+    if not summaries:
+        return
+
+    timestamp = now()
+    user = frappe.session.user
+    fields = ("vehicle", "reg_no", "summary_date", "first_seen", "last_seen", "max_speed", "working_hours") + ADDITIVE_FIELDS
+    columns = ("name", "owner", "modified_by", "creation", "modified", "docstatus") + fields
+
+    values = []
+    for summary in summaries:
+        values.extend([frappe.generate_hash(length=10), user, user, timestamp, timestamp, 0])
+        values.extend(summary.get(field) for field in fields)
+
+    placeholders = ", ".join(["(" + ", ".join(["%s"] * len(columns)) + ")"] * len(summaries))
+    additions = ", ".join(f"`{field}` = `{field}` + VALUES(`{field}`)" for field in ADDITIVE_FIELDS)
+
+    frappe.db.sql(
+        f"""
+        INSERT INTO `tab{SUMMARY_DOCTYPE}` ({", ".join(f"`{c}`" for c in columns)})
+        VALUES {placeholders}
+        ON DUPLICATE KEY UPDATE
+            {additions},
+            `reg_no` = VALUES(`reg_no`),
+            `first_seen` = LEAST(`first_seen`, VALUES(`first_seen`)),
+            `last_seen` = GREATEST(`last_seen`, VALUES(`last_seen`)),
+            `max_speed` = GREATEST(`max_speed`, VALUES(`max_speed`)),
+            `working_hours` = GREATEST(`working_hours`, VALUES(`working_hours`)),
+            `modified` = VALUES(`modified`)
+        """,
+        values,
+    )
+
+
+def rebuild_daily_summaries(from_date, to_date=None):
+    """
+    Recompute Vehicle Daily Summary from the raw points still in Vehicle
+    Tracking System, one vehicle-day at a time. Each day starts without a
+    previous point, so the interval before a vehicle's first point is lost.
+    """
+    day = getdate(from_date)
+    to_date = getdate(to_date or from_date)
+    rebuilt = 0
+
+    while day <= to_date:
+        bounds = {"start": get_datetime(day), "end": get_datetime(add_days(day, 1))}
+        vehicles = frappe.db.sql_list(
+            """
+            SELECT DISTINCT vehicle_name FROM `tabVehicle Tracking System`
+            WHERE event_time >= %(start)s AND event_time < %(end)s AND IFNULL(vehicle_name, '') != ''
+            """,
+            bounds,
+        )
+
+        frappe.db.delete(SUMMARY_DOCTYPE, {"summary_date": day})
+        for vehicle in vehicles:
+            points = frappe.db.sql(
+                f"""
+                SELECT {", ".join(POINT_FIELDS)}
+                FROM `tabVehicle Tracking System`
+                WHERE vehicle_name = %(vehicle)s AND event_time >= %(start)s AND event_time < %(end)s
+                ORDER BY event_time
+                """,
+                {"vehicle": vehicle, **bounds},
+                as_dict=True,
+            )
+            upsert_daily_summaries([
+                {"vehicle": vehicle, "reg_no": points[-1].reg_no, "summary_date": summary_date, **totals}
+                for summary_date, totals in fold_points(points).items()
+            ])
+        frappe.db.commit()
+
+        rebuilt += len(vehicles)
+        day = add_days(day, 1)
+
+    return rebuilt
+
+
+@frappe.whitelist()
+def enqueue_rebuild_daily_summaries(from_date, to_date=None):
+    """Rebuild Vehicle Daily Summary for a date range in the background."""
+    frappe.only_for("System Manager")
+    frappe.enqueue(
+        "tracker_erpgulf.tracker_erpgulf.daily_summary.rebuild_daily_summaries",
+        queue="long",
+        timeout=3600,
+        from_date=from_date,
+        to_date=to_date,
+    )
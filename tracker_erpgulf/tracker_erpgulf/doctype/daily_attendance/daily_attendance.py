@@ -0,0 +1,18 @@
+# Copyright (c) 2025, ERPGulf and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class DailyAttendance(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_unique(
+		"Daily Attendance",
+		["employee", "attendance_date"],
+		constraint_name="unique_employee_date",
+	)
+	frappe.db.add_index("Daily Attendance", ["attendance_date", "department"])
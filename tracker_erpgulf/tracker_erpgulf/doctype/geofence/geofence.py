@@ -0,0 +1,38 @@
+# Copyright (c) 2025, ERPGulf and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import flt
+
+from tracker_erpgulf.tracker_erpgulf.geofence import circle_bbox, clear_geofence_index, parse_vertices
+
+
+class Geofence(Document):
+	def validate(self):
+		if self.fence_type == "Circle":
+			if flt(self.radius) <= 0:
+				frappe.throw(_("Radius must be greater than zero"))
+			bbox = circle_bbox(flt(self.center_latitude), flt(self.center_longitude), flt(self.radius))
+		else:
+			try:
+				vertices = parse_vertices(self.coordinates)
+			except (TypeError, ValueError):
+				frappe.throw(_("Coordinates must be a JSON list of [latitude, longitude] pairs"))
+			if len(vertices) < 3:
+				frappe.throw(_("A polygon needs at least three vertices"))
+			lats = [lat for lat, lng in vertices]
+			lngs = [lng for lat, lng in vertices]
+			bbox = (min(lats), min(lngs), max(lats), max(lngs))
+
+		self.min_latitude, self.min_longitude, self.max_latitude, self.max_longitude = bbox
+
+	def on_update(self):
+		clear_geofence_index()
+
+	def after_rename(self, old, new, merge=False):
+		clear_geofence_index()
+
+	def on_trash(self):
+		clear_geofence_index()
@@ -0,0 +1,14 @@
+# Copyright (c) 2025, ERPGulf and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class GeofenceEvent(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Geofence Event", ["vehicle", "event_time"])
+	frappe.db.add_index("Geofence Event", ["geofence", "event_time"])
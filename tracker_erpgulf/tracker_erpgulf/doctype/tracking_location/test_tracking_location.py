@@ -0,0 +1,86 @@
+# Copyright (c) 2025, ERPGulf and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import get_datetime
+
+from tracker_erpgulf.tracker_erpgulf import locations
+from tracker_erpgulf.tracker_erpgulf.normalizer import location_id
+from tracker_erpgulf.tracker_erpgulf.vehicle import get_nearest_locations
+
+REG_NO = "_TEST-LOC-1"
+DAY = "2025-10-17"
+ADDRESSES = ["_Test Doha", "_Test Lusail", "_Test Wakra"]
+
+
+def tracking_rows(addresses):
+	return [
+		{
+			"reg_no": REG_NO, "event_time": f"{DAY} 10:{minute:02d}:00",
+			"location": location_id(address), "nearest_location": address,
+		}
+		for minute, address in enumerate(addresses)
+	]
+
+
+def collapse_repeats(rows):
+	"""The Python loop get_nearest_locations used before the LAG query."""
+	cleaned = []
+	last_location = None
+	for row in rows:
+		if row["nearest_location"] != last_location:
+			cleaned.append({
+				"location": row["nearest_location"],
+				"time": get_datetime(row["event_time"]).strftime("%H:%M:%S"),
+			})
+		last_location = row["nearest_location"]
+	return cleaned
+
+
+class TestTrackingLocation(FrappeTestCase):
+	def setUp(self):
+		locations._known.clear()
+
+	def tearDown(self):
+		frappe.db.rollback()
+		frappe.db.delete("Tracking Location", {"address": ["in", ADDRESSES]})
+		frappe.db.delete("Vehicle Tracking System", {"reg_no": REG_NO})
+		frappe.db.commit()
+		locations._known.clear()
+
+	def test_each_unseen_address_is_written_once(self):
+		rows = tracking_rows(["_Test Doha", "_Test Doha", "_Test Lusail", None])
+		locations.intern_locations(rows)
+
+		self.assertEqual(frappe.db.count("Tracking Location", {"address": ["in", ADDRESSES]}), 2)
+		self.assertEqual(frappe.db.get_value("Tracking Location", location_id("_Test Doha"), "address"), "_Test Doha")
+
+		# Known once committed: a repeat does not touch the database
+		frappe.db.commit()
+		with patch.object(frappe.db, "sql") as sql:
+			locations.intern_locations(tracking_rows(["_Test Lusail", "_Test Doha"]))
+		sql.assert_not_called()
+
+		# A rolled back write is not remembered, so it is written again
+		locations.intern_locations(tracking_rows(["_Test Wakra"]))
+		frappe.db.rollback()
+		self.assertNotIn(location_id("_Test Wakra"), locations._known)
+		locations.intern_locations(tracking_rows(["_Test Wakra"]))
+		self.assertTrue(frappe.db.exists("Tracking Location", location_id("_Test Wakra")))
+
+	def test_nearest_locations_collapse_repeats_like_before(self):
+		rows = tracking_rows([
+			None, "_Test Doha", "_Test Doha", "_Test Lusail", None, None, "_Test Lusail", "_Test Lusail", "_Test Doha",
+		])
+		for row in rows:
+			frappe.get_doc({"doctype": "Vehicle Tracking System", **row}).insert(ignore_permissions=True, ignore_links=True)
+		locations.intern_locations(rows)
+
+		self.assertEqual(get_nearest_locations(REG_NO, DAY), collapse_repeats(rows))
+		self.assertEqual(
+			[point["location"] for point in get_nearest_locations(REG_NO, DAY)],
+			["_Test Doha", "_Test Lusail", None, "_Test Lusail", "_Test Doha"],
+		)
@@ -0,0 +1,18 @@
+# Copyright (c) 2025, ERPGulf and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class VehicleDailySummary(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_unique(
+		"Vehicle Daily Summary",
+		["vehicle", "summary_date"],
+		constraint_name="unique_vehicle_date",
+	)
+	frappe.db.add_index("Vehicle Daily Summary", ["summary_date"])
@@ -0,0 +1,84 @@
+# Copyright (c) 2025, ERPGulf and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from tracker_erpgulf.tracker_erpgulf.doctype.vehicle_device_profile.vehicle_device_profile import (
+	PROFILE_HASH_KEY,
+	sync_device_profiles,
+)
+
+VEHICLE = "_Test Profile Vehicle"
+
+
+def tracking_row(chassis_number="CH-1"):
+	return {
+		"vehicle_name": VEHICLE, "reg_no": "_TEST-1", "speed": 10,
+		"chassis_number": chassis_number, "device_model": "GT06", "tank_size": "80",
+	}
+
+
+class TestVehicleDeviceProfile(FrappeTestCase):
+	def setUp(self):
+		frappe.cache().delete_value(PROFILE_HASH_KEY)
+
+	def tearDown(self):
+		frappe.db.rollback()
+		frappe.db.delete("Vehicle Device Profile", {"name": VEHICLE})
+		frappe.db.commit()
+		frappe.cache().delete_value(PROFILE_HASH_KEY)
+
+	def known_hash(self):
+		return (frappe.cache().get_value(PROFILE_HASH_KEY) or {}).get(VEHICLE)
+
+	def test_static_fields_move_to_the_profile(self):
+		row = tracking_row()
+		sync_device_profiles([row])
+
+		self.assertNotIn("chassis_number", row)
+		self.assertEqual(row["speed"], 10)
+		self.assertEqual(frappe.db.get_value("Vehicle Device Profile", VEHICLE, "chassis_number"), "CH-1")
+
+		# The hash is only cached once the profile write is committed
+		self.assertIsNone(self.known_hash())
+		frappe.db.commit()
+		self.assertIsNotNone(self.known_hash())
+
+	def test_unchanged_profile_is_not_rewritten(self):
+		sync_device_profiles([tracking_row()])
+		frappe.db.commit()
+		modified = frappe.db.get_value("Vehicle Device Profile", VEHICLE, "modified")
+
+		sync_device_profiles([tracking_row()])
+		self.assertEqual(frappe.db.get_value("Vehicle Device Profile", VEHICLE, "modified"), modified)
+
+		sync_device_profiles([tracking_row("CH-2")])
+		self.assertEqual(frappe.db.get_value("Vehicle Device Profile", VEHICLE, "chassis_number"), "CH-2")
+
+	def test_rolled_back_profile_is_retried(self):
+		sync_device_profiles([tracking_row()])
+		frappe.db.rollback()
+
+		self.assertIsNone(self.known_hash())
+		self.assertFalse(frappe.db.exists("Vehicle Device Profile", VEHICLE))
+
+		sync_device_profiles([tracking_row()])
+		frappe.db.commit()
+		self.assertTrue(frappe.db.exists("Vehicle Device Profile", VEHICLE))
+
+	def test_numeric_placeholders_are_cast(self):
+		row = dict(tracking_row(), tank_size="")
+		sync_device_profiles([row])
+		self.assertEqual(frappe.db.get_value("Vehicle Device Profile", VEHICLE, "tank_size"), 0)
+
+	def test_failed_write_is_logged_without_failing_the_poll(self):
+		errors = frappe.db.count("Error Log", {"method": "Vehicle Device Profile Sync Failed"})
+		row = dict(tracking_row(), expiry_date="not a date")
+
+		sync_device_profiles([row])
+
+		self.assertNotIn("expiry_date", row)
+		self.assertEqual(frappe.db.count("Error Log", {"method": "Vehicle Device Profile Sync Failed"}), errors + 1)
+		frappe.db.commit()
+		self.assertIsNone(self.known_hash())
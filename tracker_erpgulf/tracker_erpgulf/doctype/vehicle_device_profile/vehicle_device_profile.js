@@ -0,0 +1,8 @@
+// Copyright (c) 2025, ERPGulf and contributors
+// For license information, please see license.txt
+
+// frappe.ui.form.on("Vehicle Device Profile", {
+// 	refresh(frm) {
+
+// 	},
+// });
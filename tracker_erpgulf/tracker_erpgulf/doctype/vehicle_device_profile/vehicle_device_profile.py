@@ -0,0 +1,99 @@
+# Copyright (c) 2025, ERPGulf and contributors
+# For license information, please see license.txt
+
+import hashlib
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import now
+
+from tracker_erpgulf.tracker_erpgulf.ingest import cast_values, column_casts
+
+
+# Reported with every snapshot but almost never changing, so kept here
+# instead of on each `Vehicle Tracking System` row
+STATIC_FIELDS = (
+	"chassis_number", "device_model", "gps_sim_no", "tank_size", "made_in",
+	"onboard_date", "expiry_date", "licence_type", "fcode", "org_id",
+)
+PROFILE_HASH_KEY = "vehicle_device_profile_hashes"
+
+
+class VehicleDeviceProfile(Document):
+	pass
+
+
+def profile_hash(row):
+	values = "\x1f".join(str(row.get(field)) for field in STATIC_FIELDS)
+	return hashlib.blake2b(values.encode(), digest_size=8).hexdigest()
+
+
+def sync_device_profiles(rows):
+	"""
+	Move the static attributes out of normalized tracking rows (in place) and
+	write a vehicle's Device Profile only when they differ from what was last
+	written. Known hashes are kept in the site cache, so an unchanged fleet
+	costs one cache read per batch. They are cached only once the transaction
+	commits, so a rolled back profile write is retried on the next poll. A
+	failed write is logged and never fails the poll.
+	"""
+	known = frappe.cache().get_value(PROFILE_HASH_KEY) or {}
+	changed = {}
+
+	for row in rows:
+		static = {field: row.pop(field, None) for field in STATIC_FIELDS}
+		vehicle = row.get("vehicle_name")
+		if not vehicle:
+			continue
+		digest = profile_hash(static)
+		if known.get(vehicle) != digest:
+			changed[vehicle] = dict(static, reg_no=row.get("reg_no"), profile_hash=digest)
+
+	if not changed:
+		return
+
+	frappe.db.savepoint("vehicle_device_profile")
+	try:
+		upsert_device_profiles(changed)
+	except Exception as e:
+		frappe.db.rollback(save_point="vehicle_device_profile")
+		frappe.log_error(
+			message=f"{e}\n\n{frappe.as_json(changed)}",
+			title="Vehicle Device Profile Sync Failed"
+		)
+		return
+
+	hashes = {vehicle: profile["profile_hash"] for vehicle, profile in changed.items()}
+	frappe.db.after_commit.add(lambda: remember_profile_hashes(hashes))
+
+
+def remember_profile_hashes(hashes):
+	known = frappe.cache().get_value(PROFILE_HASH_KEY) or {}
+	known.update(hashes)
+	frappe.cache().set_value(PROFILE_HASH_KEY, known)
+
+
+def upsert_device_profiles(profiles):
+	"""Write {vehicle: attributes} with one INSERT ... ON DUPLICATE KEY UPDATE."""
+	timestamp = now()
+	user = frappe.session.user
+	fields = ("reg_no", "profile_hash") + STATIC_FIELDS
+	columns = ("name", "vehicle", "owner", "modified_by", "creation", "modified", "docstatus", "last_changed") + fields
+	casts = column_casts("Vehicle Device Profile", fields)
+
+	values = []
+	for vehicle, profile in profiles.items():
+		values.extend([vehicle, vehicle, user, user, timestamp, timestamp, 0, timestamp])
+		values.extend(cast_values([profile.get(field) for field in fields], casts))
+
+	placeholders = ", ".join(["(" + ", ".join(["%s"] * len(columns)) + ")"] * len(profiles))
+	updates = ", ".join(f"`{field}` = VALUES(`{field}`)" for field in fields + ("last_changed", "modified", "modified_by"))
+
+	frappe.db.sql(
+		f"""
+		INSERT INTO `tabVehicle Device Profile` ({", ".join(f"`{c}`" for c in columns)})
+		VALUES {placeholders}
+		ON DUPLICATE KEY UPDATE {updates}
+		""",
+		values,
+	)
@@ -0,0 +1,49 @@
+# Copyright (c) 2025, ERPGulf and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import now
+
+
+LIVE_STATE_FIELDS = (
+	"reg_no", "driver", "last_comm", "last_seen", "event_time", "position", "status",
+	"ignition_status", "speed", "ac", "kms", "today_workinghours",
+	"latitude", "longitude", "nearest_location", "gmap",
+)
+
+
+class VehicleLiveState(Document):
+	pass
+
+
+def upsert_live_states(rows):
+	"""
+	Write the latest tracking row of each vehicle into `tabVehicle Live State`
+	with one INSERT ... ON DUPLICATE KEY UPDATE. Rows are field dicts as built
+	for `Vehicle Tracking System`; later rows for the same vehicle win.
+	"""
+	latest = {row["vehicle_name"]: row for row in rows if row.get("vehicle_name")}
+	if not latest:
+		return
+
+	timestamp = now()
+	user = frappe.session.user
+	columns = ("name", "vehicle", "owner", "modified_by", "creation", "modified", "docstatus") + LIVE_STATE_FIELDS
+
+	values = []
+	for vehicle, row in latest.items():
+		values.extend([vehicle, vehicle, user, user, timestamp, timestamp, 0])
+		values.extend(row.get(field) for field in LIVE_STATE_FIELDS)
+
+	placeholders = ", ".join(["(" + ", ".join(["%s"] * len(columns)) + ")"] * len(latest))
+	updates = ", ".join(f"`{field}` = VALUES(`{field}`)" for field in LIVE_STATE_FIELDS + ("modified", "modified_by"))
+
+	frappe.db.sql(
+		f"""
+		INSERT INTO `tabVehicle Live State` ({", ".join(f"`{c}`" for c in columns)})
+		VALUES {placeholders}
+		ON DUPLICATE KEY UPDATE {updates}
+		""",
+		values,
+	)
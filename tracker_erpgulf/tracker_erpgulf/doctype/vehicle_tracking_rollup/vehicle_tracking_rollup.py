@@ -0,0 +1,17 @@
+# Copyright (c) 2025, ERPGulf and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class VehicleTrackingRollup(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_unique(
+		"Vehicle Tracking Rollup",
+		["vehicle", "bucket_start", "bucket_minutes"],
+		constraint_name="unique_vehicle_bucket",
+	)
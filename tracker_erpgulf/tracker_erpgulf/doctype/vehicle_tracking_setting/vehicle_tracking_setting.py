@@ -1,9 +1,15 @@
 # Copyright (c) 2025, ERPGulf and contributors
 # For license information, please see license.txt
 
-# import frappe
+import frappe
+from frappe import _
 from frappe.model.document import Document
 
 
 class VehicleTrackingSetting(Document):
-	pass
+	def validate(self):
+		seen = set()
+		for account in self.provider_accounts:
+			if account.account_name in seen:
+				frappe.throw(_("Row {0}: Account Name {1} is used more than once").format(account.idx, account.account_name))
+			seen.add(account.account_name)
@@ -1,9 +1,16 @@
 # Copyright (c) 2025, ERPGulf and contributors
 # For license information, please see license.txt
 
-# import frappe
+import frappe
 from frappe.model.document import Document
 
 
 class VehicleTrackingSystem(Document):
 	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Vehicle Tracking System", ["reg_no", "event_time"])
+	frappe.db.add_index("Vehicle Tracking System", ["vehicle_name", "event_time"])
+	# Retention pages through old points in event time order
+	frappe.db.add_index("Vehicle Tracking System", ["event_time"])
@@ -0,0 +1,13 @@
+# Copyright (c) 2025, ERPGulf and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class VehicleTrip(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Vehicle Trip", ["vehicle", "start_time"])
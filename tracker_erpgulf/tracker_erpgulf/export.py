@@ -0,0 +1,183 @@
+"""
+Raw tracking point exports for audits.
+
+Points are read in keyset pages ordered by (vehicle, event time, name), each
+page through an unbuffered cursor, and written straight to a CSV or NDJSON
+file, so worker memory stays bounded whatever the range. The export runs as a
+background job and the requesting user is notified when the file is ready.
+"""
+
+import csv
+import json
+import os
+
+import frappe
+from frappe.desk.doctype.notification_log.notification_log import enqueue_create_notification
+from frappe.utils import cint, getdate, now_datetime
+
+from tracker_erpgulf.tracker_erpgulf.retention import iter_archived_rows
+
+
+EXPORT_FIELDS = (
+    "name", "vehicle_name", "reg_no", "event_time", "last_comm", "position", "status",
+    "ignition_status", "speed", "is_over_speed", "kms", "today_workinghours", "ac",
+    "latitude", "longitude", "nearest_location", "gmap",
+)
+PAGE_SIZE = 5000
+FORMATS = {"CSV": "csv", "NDJSON": "ndjson"}
+MAX_RANGE_DAYS = 366
+
+
+def iter_raw_points(from_date, to_date, vehicle=None, page_size=PAGE_SIZE):
+    """
+    Yield raw points between two dates (inclusive) in (vehicle, event_time, name)
+    order. Each page resumes after the last key of the previous one, so every
+    page is an index range scan however deep the export is, unlike OFFSET.
+
+    Rows are streamed off an unbuffered cursor: the caller must not use the
+    database while iterating. Points without a vehicle are not exported.
+    """
+    values = {"start": f"{getdate(from_date)} 00:00:00", "end": f"{getdate(to_date)} 23:59:59", "limit": page_size}
+    conditions = ["t.event_time BETWEEN %(start)s AND %(end)s", "t.vehicle_name IS NOT NULL"]
+    if vehicle:
+        conditions.append("t.vehicle_name = %(vehicle)s")
+        values["vehicle"] = vehicle
+
+    last = None
+    while True:
+        keyset = ""
+        if last:
+            keyset = """
+                AND (t.vehicle_name > %(last_vehicle)s
+                    OR (t.vehicle_name = %(last_vehicle)s AND (t.event_time > %(last_time)s
+                        OR (t.event_time = %(last_time)s AND t.name > %(last_name)s))))
+            """
+            values.update(last_vehicle=last.vehicle_name, last_time=last.event_time, last_name=last.name)
+
+        count = 0
+        with frappe.db.unbuffered_cursor():
+            for row in frappe.db.sql(
+                f"""
+                SELECT {", ".join(_select(field) for field in EXPORT_FIELDS)}
+                FROM `tabVehicle Tracking System` t
+                LEFT JOIN `tabTracking Location` loc ON loc.name = t.location
+                WHERE {" AND ".join(conditions)} {keyset}
+                ORDER BY t.vehicle_name, t.event_time, t.name
+                LIMIT %(limit)s
+                """,
+                values,
+                as_dict=True,
+                as_iterator=True,
+            ):
+                count += 1
+                last = row
+                yield row
+
+        if count < page_size:
+            return
+
+
+def _select(field):
+    # Addresses are interned in Tracking Location; exports carry the text
+    if field == "nearest_location":
+        return "loc.address AS nearest_location"
+    return f"t.`{field}`"
+
+
+def iter_export_rows(from_date, to_date, vehicle=None):
+    """Archived points (days already moved out by retention) first, then the table."""
+    for row in iter_archived_rows(from_date, to_date, vehicle=vehicle):
+        yield {field: row.get(field) for field in EXPORT_FIELDS}
+    yield from iter_raw_points(from_date, to_date, vehicle=vehicle)
+
+
+def write_rows(rows, path, file_format):
+    """Stream `rows` to `path`; returns the number of rows written."""
+    written = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if file_format == "CSV":
+            writer = csv.DictWriter(f, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                written += 1
+        else:
+            for row in rows:
+                f.write(json.dumps(row, default=str, separators=(",", ":")))
+                f.write("\n")
+                written += 1
+    return written
+
+
+@frappe.whitelist()
+def export_raw_points(from_date, to_date, vehicle=None, file_format="CSV"):
+    """Queue a raw point export; the user is notified with a link to the file."""
+    frappe.has_permission("Vehicle Tracking System", "export", throw=True)
+    if file_format not in FORMATS:
+        frappe.throw(f"Unsupported format: {file_format}")
+    if getdate(from_date) > getdate(to_date):
+        frappe.throw("From Date must be before To Date")
+    if (getdate(to_date) - getdate(from_date)).days > MAX_RANGE_DAYS:
+        frappe.throw(f"Exports are limited to {MAX_RANGE_DAYS} days at a time")
+
+    frappe.enqueue(
+        "tracker_erpgulf.tracker_erpgulf.export.run_export",
+        queue="long",
+        timeout=4 * 3600,
+        from_date=from_date,
+        to_date=to_date,
+        vehicle=vehicle,
+        file_format=file_format,
+        user=frappe.session.user,
+    )
+    return {"queued": True}
+
+
+def run_export(from_date, to_date, vehicle=None, file_format="CSV", user=None):
+    """Background job: write the export into a private File and notify `user`."""
+    user = user or frappe.session.user
+    file_name = "vehicle-tracking-{}-{}-{}{}.{}".format(
+        getdate(from_date), getdate(to_date), now_datetime().strftime("%H%M%S"),
+        f"-{frappe.scrub(vehicle)}" if vehicle else "", FORMATS[file_format],
+    )
+    path = frappe.get_site_path("private", "files", file_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    try:
+        rows = write_rows(iter_export_rows(from_date, to_date, vehicle), path, file_format)
+        file_doc = frappe.get_doc({
+            "doctype": "File",
+            "file_name": file_name,
+            "file_url": f"/private/files/{file_name}",
+            "is_private": 1,
+            "file_size": os.path.getsize(path),
+            "owner": user,
+        }).insert(ignore_permissions=True)
+    except Exception:
+        if os.path.exists(path):
+            os.remove(path)
+        frappe.log_error(message=frappe.get_traceback(), title="Vehicle Tracking Export Failed")
+        notify(user, f"Vehicle tracking export {from_date} to {to_date} failed")
+        return
+
+    frappe.db.commit()
+    notify(
+        user,
+        f"Vehicle tracking export ready: {cint(rows)} points, {from_date} to {to_date}",
+        file_doc,
+    )
+
+
+def notify(user, subject, file_doc=None):
+    enqueue_create_notification(user, {
+        "type": "Alert",
+        "document_type": "File" if file_doc else None,
+        "document_name": file_doc.name if file_doc else None,
+        "subject": subject,
+        "email_content": f'<a href="{file_doc.file_url}">{file_doc.file_name}</a>' if file_doc else subject,
+    })
+    frappe.publish_realtime(
+        "vehicle_tracking_export",
+        {"subject": subject, "file_url": file_doc.file_url if file_doc else None},
+        user=user,
+    )
@@ -0,0 +1,57 @@
+import hashlib
+import time
+
+import frappe
+
+
+FINGERPRINT_KEY = "vehicle_tracking_fingerprints"
+
+# Fields whose change makes a snapshot worth keeping
+MEANINGFUL_FIELDS = (
+    "last_seen", "latitude", "longitude", "position", "status",
+    "speed", "ac", "ignition_status"
+)
+
+
+def fingerprint(row):
+    values = "\x1f".join(str(row.get(field)) for field in MEANINGFUL_FIELDS)
+    return hashlib.blake2b(values.encode(), digest_size=8).hexdigest()
+
+
+def filter_changed(rows, heartbeat_minutes):
+    """
+    Drop rows whose meaningful fields match the last snapshot written for the
+    same vehicle, unless `heartbeat_minutes` have passed since that snapshot.
+    Returns (rows to write, number skipped). Fingerprints are recorded by
+    `record_fingerprints` once the kept rows are written.
+    """
+    seen = frappe.cache().get_value(FINGERPRINT_KEY) or {}
+    now = time.time()
+    heartbeat = heartbeat_minutes * 60
+    kept = []
+
+    for row in rows:
+        digest = fingerprint(row)
+        previous = seen.get(row["vehicle_name"])
+        if previous and previous[0] == digest and now - previous[1] < heartbeat:
+            continue
+        kept.append(row)
+
+    return kept, len(rows) - len(kept)
+
+
+def record_fingerprints(rows):
+    """
+    Remember the snapshots of written rows once the transaction commits, so a
+    rolled back write never suppresses the identical snapshots that follow.
+    """
+    now = time.time()
+    fingerprints = {row["vehicle_name"]: (fingerprint(row), now) for row in rows if row.get("vehicle_name")}
+    if fingerprints:
+        frappe.db.after_commit.add(lambda: remember(fingerprints))
+
+
+def remember(fingerprints):
+    seen = frappe.cache().get_value(FINGERPRINT_KEY) or {}
+    seen.update(fingerprints)
+    frappe.cache().set_value(FINGERPRINT_KEY, seen)
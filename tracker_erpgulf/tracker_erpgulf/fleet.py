@@ -0,0 +1,90 @@
+import frappe
+from frappe.utils import cint, now
+
+
+FLEET_INDEX_KEY = "vehicle_tracking_fleet_index"
+
+
+def resolve_vehicles(entries):
+    """
+    Return a {license_plate: Vehicle name} map covering every entry in the payload.
+    Plates are served from the cached fleet index; the ones it does not know are
+    looked up with a single query, and those still missing are created in one
+    batched INSERT IGNORE so overlapping polls cannot create duplicate Vehicles.
+    New Vehicles are committed with the tracking rows that reference them, and
+    only added to the cached index once that commit happens.
+    """
+    plates = {entry.get("vehicleId") for entry in entries if entry.get("vehicleId")}
+    index = frappe.cache().get_value(FLEET_INDEX_KEY) or {}
+
+    unknown = [plate for plate in plates if plate not in index]
+    if unknown:
+        for vehicle in frappe.get_all(
+            "Vehicle",
+            filters={"license_plate": ["in", unknown]},
+            fields=["name", "license_plate"]
+        ):
+            index[vehicle.license_plate] = vehicle.name
+
+        not_found = set(unknown) - set(index)
+        missing = [entry for entry in entries if entry.get("vehicleId") in not_found]
+        frappe.cache().set_value(FLEET_INDEX_KEY, index)
+
+        created = create_missing_vehicles(missing)
+        if created:
+            frappe.db.after_commit.add(lambda: remember_vehicles(created))
+        index = {**index, **created}
+
+    return {plate: index[plate] for plate in plates}
+
+
+def remember_vehicles(vehicles):
+    index = frappe.cache().get_value(FLEET_INDEX_KEY) or {}
+    index.update(vehicles)
+    frappe.cache().set_value(FLEET_INDEX_KEY, index)
+
+
+def create_missing_vehicles(entries):
+    """
+    Create Vehicles for the given payload entries in one multi-row INSERT IGNORE.
+    Vehicles are named after their license plate, so a concurrent poll inserting
+    the same plate is silently ignored instead of producing a second Vehicle.
+    """
+    docs = {}
+    timestamp = now()
+
+    for entry in entries:
+        plate = entry.get("vehicleId")
+        if plate in docs:
+            continue
+        doc = frappe.new_doc("Vehicle")
+        doc.update({
+            "vehicle_name": plate,
+            "license_plate": plate,
+            "make": entry.get("vehicleMake") or "Unknown",
+            "model": entry.get("vehicleModel") or "Unknown",
+            "last_odometer": cint(entry.get("odoDistance")),
+            "uom": "Meter"  # Make sure this UOM exists in your system
+        })
+        doc.name = plate
+        doc.owner = doc.modified_by = frappe.session.user
+        doc.creation = doc.modified = timestamp
+        docs[plate] = doc.get_valid_dict(convert_dates_to_str=True)
+
+    if not docs:
+        return {}
+
+    fields = list(next(iter(docs.values())).keys())
+    frappe.db.bulk_insert(
+        "Vehicle",
+        fields,
+        [[d.get(f) for f in fields] for d in docs.values()],
+        ignore_duplicates=True
+    )
+
+    return {plate: plate for plate in docs}
+
+
+def invalidate_fleet_index(doc=None, method=None, *args, **kwargs):
+    """Vehicle doc event: drop the cached plate index on insert, update, rename or delete."""
+    frappe.cache().delete_value(FLEET_INDEX_KEY)
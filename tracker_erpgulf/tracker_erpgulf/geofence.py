@@ -0,0 +1,207 @@
+import json
+import math
+
+import frappe
+from frappe.utils import now
+
+
+GEOFENCE_INDEX_KEY = "vehicle_tracking_geofence_index"
+CELL_SIZE = 0.01  # degrees, about 1.1 km
+MAX_CELLS_PER_FENCE = 2500  # bigger fences skip the grid and are only bbox-checked
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEGREE = 111320.0
+
+
+class GeofenceIndex:
+    """
+    Uniform grid over the enabled geofences.
+
+    Every fence is registered in the grid cells its bounding box overlaps, so a
+    point only meets the few fences near it. Candidates are then filtered by
+    bounding box before the exact polygon or circle test.
+    """
+
+    def __init__(self, fences, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.fences = fences
+        self.names = frozenset(fence["name"] for fence in fences)
+        self.grid = {}
+        self.large = []
+
+        for position, fence in enumerate(fences):
+            min_lat, min_lng, max_lat, max_lng = fence["bbox"]
+            x0, y0 = self.cell(min_lat, min_lng)
+            x1, y1 = self.cell(max_lat, max_lng)
+            if (x1 - x0 + 1) * (y1 - y0 + 1) > MAX_CELLS_PER_FENCE:
+                self.large.append(position)
+                continue
+            for x in range(x0, x1 + 1):
+                for y in range(y0, y1 + 1):
+                    self.grid.setdefault((x, y), []).append(position)
+
+    def __len__(self):
+        return len(self.fences)
+
+    def cell(self, lat, lng):
+        return math.floor(lng / self.cell_size), math.floor(lat / self.cell_size)
+
+    def lookup(self, lat, lng):
+        """Names of the fences containing the point."""
+        candidates = self.grid.get(self.cell(lat, lng), [])
+        if self.large:
+            candidates = candidates + self.large
+
+        inside = set()
+        for position in candidates:
+            fence = self.fences[position]
+            min_lat, min_lng, max_lat, max_lng = fence["bbox"]
+            if not (min_lat <= lat <= max_lat and min_lng <= lng <= max_lng):
+                continue
+            if fence["type"] == "Circle":
+                center_lat, center_lng, radius = fence["shape"]
+                if distance_m(lat, lng, center_lat, center_lng) <= radius:
+                    inside.add(fence["name"])
+            elif point_in_polygon(lat, lng, fence["shape"]):
+                inside.add(fence["name"])
+        return inside
+
+
+def point_in_polygon(lat, lng, vertices):
+    """Ray casting on [(lat, lng), ...]; points on an edge may fall either way."""
+    inside = False
+    j = len(vertices) - 1
+    for i in range(len(vertices)):
+        lat_i, lng_i = vertices[i]
+        lat_j, lng_j = vertices[j]
+        if (lat_i > lat) != (lat_j > lat):
+            crossing = lng_i + (lat - lat_i) * (lng_j - lng_i) / (lat_j - lat_i)
+            if lng < crossing:
+                inside = not inside
+        j = i
+    return inside
+
+
+def distance_m(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(min(a, 1.0)))
+
+
+def parse_vertices(coordinates):
+    """Polygon vertices from the Geofence `coordinates` JSON, as (lat, lng) tuples."""
+    vertices = json.loads(coordinates) if isinstance(coordinates, str) else coordinates
+    vertices = [(float(lat), float(lng)) for lat, lng in vertices or []]
+    if vertices and vertices[0] == vertices[-1]:
+        vertices.pop()
+    return vertices
+
+
+def circle_bbox(lat, lng, radius):
+    dlat = radius / METERS_PER_DEGREE
+    dlng = radius / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+    return lat - dlat, lng - dlng, lat + dlat, lng + dlng
+
+
+def build_geofence_index():
+    fences = []
+    for fence in frappe.get_all(
+        "Geofence",
+        filters={"enabled": 1},
+        fields=[
+            "name", "fence_type", "coordinates", "center_latitude", "center_longitude", "radius",
+            "min_latitude", "min_longitude", "max_latitude", "max_longitude",
+        ],
+    ):
+        bbox = (fence.min_latitude, fence.min_longitude, fence.max_latitude, fence.max_longitude)
+        if fence.fence_type == "Circle":
+            shape = (fence.center_latitude, fence.center_longitude, fence.radius)
+        else:
+            try:
+                shape = parse_vertices(fence.coordinates)
+            except (TypeError, ValueError):
+                continue
+            if len(shape) < 3:
+                continue
+        fences.append({"name": fence.name, "type": fence.fence_type, "bbox": bbox, "shape": shape})
+
+    return GeofenceIndex(fences)
+
+
+def get_geofence_index():
+    return frappe.cache().get_value(GEOFENCE_INDEX_KEY, generator=build_geofence_index)
+
+
+def clear_geofence_index():
+    frappe.cache().delete_value(GEOFENCE_INDEX_KEY)
+
+
+def record_geofence_events(rows):
+    """
+    Check freshly written tracking rows against every geofence and record the
+    enter and exit transitions as `Geofence Event`s. Current membership is kept
+    on `Vehicle Live State` and only written for vehicles whose set changed.
+    """
+    index = get_geofence_index()
+    if not index:
+        return
+
+    by_vehicle = {}
+    for row in rows:
+        position = _coordinates(row)
+        if row.get("vehicle_name") and position:
+            by_vehicle.setdefault(row["vehicle_name"], []).append((row, position))
+    if not by_vehicle:
+        return
+
+    current = dict(frappe.db.sql(
+        "SELECT vehicle, geofences FROM `tabVehicle Live State` WHERE vehicle IN %s",
+        (tuple(by_vehicle),),
+    ))
+
+    events = []
+    changed = {}
+    for vehicle, points in by_vehicle.items():
+        before = {name for name in (current.get(vehicle) or "").split("\n") if name}
+        inside = before & index.names
+        for row, (lat, lng) in sorted(points, key=lambda point: point[0].get("event_time") or ""):
+            now_inside = index.lookup(lat, lng)
+            transitions = [(g, "Enter") for g in now_inside - inside] + [(g, "Exit") for g in inside - now_inside]
+            for geofence, event_type in transitions:
+                events.append((vehicle, row.get("reg_no"), geofence, event_type, row.get("event_time"), lat, lng))
+            inside = now_inside
+        if inside != before:
+            changed[vehicle] = "\n".join(sorted(inside))
+
+    if events:
+        timestamp = now()
+        user = frappe.session.user
+        frappe.db.bulk_insert(
+            "Geofence Event",
+            [
+                "name", "owner", "modified_by", "creation", "modified", "docstatus",
+                "vehicle", "reg_no", "geofence", "event_type", "event_time", "latitude", "longitude",
+            ],
+            [[frappe.generate_hash(length=10), user, user, timestamp, timestamp, 0, *event] for event in events],
+        )
+
+    if changed:
+        cases = " ".join(["WHEN %s THEN %s"] * len(changed))
+        params = [value for pair in changed.items() for value in pair]
+        frappe.db.sql(
+            f"""
+            UPDATE `tabVehicle Live State`
+            SET geofences = CASE vehicle {cases} END
+            WHERE vehicle IN ({", ".join(["%s"] * len(changed))})
+            """,
+            params + list(changed),
+        )
+
+
+def _coordinates(row):
+    try:
+        lat, lng = float(row.get("latitude")), float(row.get("longitude"))
+    except (TypeError, ValueError):
+        return None
+    if not (math.isfinite(lat) and math.isfinite(lng)) or (not lat and not lng):
+        return None
+    return lat, lng
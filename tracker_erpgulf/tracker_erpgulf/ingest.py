@@ -0,0 +1,144 @@
+import time
+
+import frappe
+from frappe.utils import cint, flt, now
+
+from tracker_erpgulf.tracker_erpgulf.daily_summary import update_daily_summaries
+from tracker_erpgulf.tracker_erpgulf.doctype.vehicle_live_state.vehicle_live_state import upsert_live_states
+from tracker_erpgulf.tracker_erpgulf.fingerprint import record_fingerprints
+from tracker_erpgulf.tracker_erpgulf.geofence import record_geofence_events
+from tracker_erpgulf.tracker_erpgulf.locations import intern_locations
+from tracker_erpgulf.tracker_erpgulf.stream import batched
+from tracker_erpgulf.tracker_erpgulf.telemetry import untimed
+from tracker_erpgulf.tracker_erpgulf.vehicle import invalidate_route_timelines
+
+
+TRACKING_DOCTYPE = "Vehicle Tracking System"
+NUMERIC_CASTS = {"Int": cint, "Check": cint, "Float": flt, "Currency": flt, "Percent": flt}
+
+
+def insert_tracking_rows(rows, chunk_size=500, telemetry=None):
+    """
+    Write normalized tracking rows with multi-row INSERTs, committing once per chunk.
+    `rows` may be any iterable, so a streamed payload is never fully materialized.
+    If a chunk fails as a whole, its rows are retried one by one so a single bad
+    entry does not drop the rest of the poll.
+    """
+    timer = telemetry.timer if telemetry is not None else untimed
+    started = time.monotonic()
+    inserted = []
+    failed = 0
+
+    for chunk in batched(rows, chunk_size):
+        names = [frappe.generate_hash(length=10) for _ in chunk]
+
+        with timer("write"):
+            try:
+                fields, values = _to_bulk_values(chunk, names)
+                frappe.db.bulk_insert(TRACKING_DOCTYPE, fields, values, chunk_size=chunk_size)
+                after_write(chunk)
+                frappe.db.commit()
+                inserted.extend(names)
+            except Exception:
+                frappe.db.rollback()
+                chunk_inserted, written, chunk_failed = _insert_one_by_one(chunk)
+                after_write(written)
+                frappe.db.commit()
+                inserted.extend(chunk_inserted)
+                failed += chunk_failed
+
+    return _result(inserted, failed, started)
+
+
+def insert_tracking_rows_per_row(rows, telemetry=None):
+    """
+    Legacy path: one full ORM insert per row, single commit at the end.
+    """
+    timer = telemetry.timer if telemetry is not None else untimed
+    started = time.monotonic()
+    inserted, written, failed = _insert_one_by_one(rows, timer)
+    with timer("write"):
+        after_write(written)
+        frappe.db.commit()
+    return _result(inserted, failed, started)
+
+
+def after_write(rows):
+    """
+    Derived state maintained in the same transaction as the snapshot rows.
+    Daily summaries read the previous live state, so they go first.
+    """
+    intern_locations(rows)
+    update_daily_summaries(rows)
+    upsert_live_states(rows)
+    record_geofence_events(rows)
+    record_fingerprints(rows)
+    invalidate_route_timelines(rows)
+
+
+def _insert_one_by_one(rows, timer=untimed):
+    inserted = []
+    written = []
+    failed = 0
+
+    for row in rows:
+        with timer("write"):
+            frappe.db.savepoint("vehicle_tracking_row")
+            try:
+                doc = frappe.get_doc({"doctype": TRACKING_DOCTYPE, **row})
+                # The Tracking Location is interned after the write, in after_write
+                doc.flags.ignore_links = True
+                doc.insert(ignore_permissions=True)
+                inserted.append(doc.name)
+                written.append(row)
+            except Exception as e:
+                frappe.db.rollback(save_point="vehicle_tracking_row")
+                failed += 1
+                frappe.log_error(
+                    message=f"{e}\n\n{frappe.as_json(row)}",
+                    title="Vehicle Tracking Row Insert Failed"
+                )
+
+    return inserted, written, failed
+
+
+def _to_bulk_values(rows, names):
+    timestamp = now()
+    user = frappe.session.user
+    # Normalized rows also carry values kept elsewhere (nearest_location for
+    # Vehicle Live State, vehicle_type); only real columns go into the INSERT
+    valid_columns = set(frappe.get_meta(TRACKING_DOCTYPE).get_valid_columns())
+    fields = [field for field in rows[0] if field in valid_columns]
+    columns = ["name", "owner", "modified_by", "creation", "modified", "docstatus"] + fields
+    casts = column_casts(TRACKING_DOCTYPE, fields)
+
+    values = [
+        [name, user, user, timestamp, timestamp, 0] + cast_values([row.get(f) for f in fields], casts)
+        for name, row in zip(names, rows)
+    ]
+    return columns, values
+
+
+def column_casts(doctype, fields):
+    """
+    The cast doc.insert() would apply to each of `fields`, for raw INSERTs:
+    provider placeholders such as "" or "-" in numeric columns become 0
+    instead of failing the statement under strict mode. None for no cast.
+    """
+    meta = frappe.get_meta(doctype)
+    return [NUMERIC_CASTS.get(df.fieldtype) if (df := meta.get_field(field)) else None for field in fields]
+
+
+def cast_values(values, casts):
+    return [value if cast is None or value is None else cast(value) for value, cast in zip(values, casts)]
+
+
+def _result(inserted, failed, started):
+    duration = time.monotonic() - started
+    total = len(inserted) + failed
+    return {
+        "inserted": inserted,
+        "failed": failed,
+        "duration": round(duration, 3),
+        "rows_per_sec": round(total / duration, 1) if duration else total,
+    }
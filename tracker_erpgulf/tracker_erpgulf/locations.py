@@ -0,0 +1,53 @@
+"""
+Interned provider addresses.
+
+Every distinct `nearest_location` text is stored once in `Tracking Location`,
+named by a short hash of the text, and tracking points store only that id.
+The id is derived from the text (the normalizer sets it), so ingestion never
+looks it up; addresses this process has not seen are written with INSERT IGNORE.
+"""
+
+import frappe
+from frappe.utils import now
+
+
+LOCATION_DOCTYPE = "Tracking Location"
+KNOWN_LIMIT = 100_000  # ids remembered per worker process before starting over
+
+_known = set()
+
+
+def intern_locations(rows):
+    """
+    Make sure the Tracking Location of every written row exists. Ids are only
+    remembered once the transaction commits, so a rolled back chunk is retried.
+    """
+    new = {}
+    for row in rows:
+        name = row.get("location")
+        if name and name not in _known:
+            new[name] = row.get("nearest_location")
+
+    if not new:
+        return
+
+    timestamp = now()
+    user = frappe.session.user
+    values = []
+    for name, address in new.items():
+        values.extend([name, user, user, timestamp, timestamp, 0, address])
+
+    frappe.db.sql(
+        f"""
+        INSERT IGNORE INTO `tab{LOCATION_DOCTYPE}` (name, owner, modified_by, creation, modified, docstatus, address)
+        VALUES {", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(new))}
+        """,
+        values,
+    )
+    frappe.db.after_commit.add(lambda: remember(new))
+
+
+def remember(names):
+    if len(_known) + len(names) > KNOWN_LIMIT:
+        _known.clear()
+    _known.update(names)
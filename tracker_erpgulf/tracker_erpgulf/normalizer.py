@@ -0,0 +1,280 @@
+"""
+Declarative mapping from Vamosys entries to `Vehicle Tracking System` rows.
+
+FIELD_SPEC lists every target field once: where it comes from, how it is
+converted and what it defaults to. `compile_normalizer` turns the spec into a
+single generated function, so per entry there is no spec interpretation left,
+only dict lookups and the converters. This module does not import frappe and
+can be used by ingestion, replays, tests and benchmarks alike.
+"""
+
+import hashlib
+import json
+import re
+from collections import namedtuple
+from datetime import datetime, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+
+# Position mapping: use P, M, S codes
+POSITION_MAP = {
+    "P": "P - Parked Vehicle",
+    "M": "M - Moving Vehicle",
+    "S": "S - Stopped Vehicle"
+}
+DEFAULT_POSITION = "P - Parked Vehicle"
+
+TRUE_AC = frozenset([True, "true", "True", 1, "1"])
+YES_FLAGS = frozenset(["Y", "YES", "y", "yes"])
+TRUTHY_STRINGS = frozenset(["yes", "y", "true", "1"])
+
+USED_KEYS = frozenset([
+    "vehicleId", "regNo", "driverName", "communicatingPortNo", "safetyParking",
+    "driverMobile", "timeZone", "odoDistance", "lat", "lng", "deviceModel",
+    "vehicleTypeLabel", "expiryDate", "forwardOrBackward", "expiryDays",
+    "error", "distanceCovered", "chassisNumber", "speed", "routeName",
+    "altitude", "tankSize", "deviceVolt", "gpsSimNo", "fuelLitre",
+    "todayWorkingHours", "fuelLitres", "temperature", "vehicleType",
+    "overSpeedLimit", "ignitionStatus", "status", "oprName", "alert",
+    "fuelSensorType", "deviceId", "tripName", "shortName", "licenceType",
+    "direction", "vehicleModel", "engineStatus", "calibrateMode", "vehicleMode",
+    "address", "rigMode", "orgId", "color", "sensorBasedVehicleMode",
+    "ac", "vehicleBusy", "live", "position", "expired", "parkedTime",
+    "movingTime", "idleTime", "dateSec", "lastSeen", "lastComunicationTime",
+    "onboardDate", "rowId", "latitude", "longitude", "date", "isOverSpeed", "insideGeoFence",
+    "powerStatus", "deviceStatus", "cameraEnabled", "fcode", "vehicleName", "expiryStatus",
+    "madeIn",
+])
+
+_DAY_FIRST_DATETIME = re.compile(r"(\d{2})-(\d{2})-(\d{4}) (\d{2}:\d{2}:\d{2})$")
+
+
+# Converters. Each takes the raw value (or the whole entry, see `Field.entry`)
+# and must not raise on bad input.
+
+def in_set(values, yes, no):
+    def convert(value):
+        try:
+            return yes if value in values else no
+        except TypeError:  # unhashable
+            return no
+    return convert
+
+
+def str_in_set(values, yes, no):
+    return lambda value: yes if str(value).lower() in values else no
+
+
+def position(value):
+    return POSITION_MAP.get(str(value or "").upper(), DEFAULT_POSITION)
+
+
+def live(value):
+    return "YES" if isinstance(value, str) and value.lower() == "yes" else "NO"
+
+
+def on_off(value):
+    return "ON" if value else "OFF"
+
+
+@lru_cache(maxsize=4096)
+def day_first_date(value):
+    """'31-12-2025' -> '2025-12-31'; these repeat across polls, so results are cached."""
+    try:
+        return datetime.strptime(value, "%d-%m-%Y").strftime("%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+
+
+def last_seen(value):
+    """'31-12-2025 23:59:59' -> '2025-12-31 23:59:59'; epoch milliseconds are read as UTC."""
+    if not value:
+        return None
+    if isinstance(value, str):
+        match = _DAY_FIRST_DATETIME.match(value)
+        if match:
+            day, month, year, time = match.groups()
+            return f"{year}-{month}-{day} {time}"
+        try:
+            return datetime.strptime(value, "%d-%m-%Y %H:%M:%S").strftime("%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            pass
+    try:
+        return datetime.fromtimestamp(int(value) / 1000, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+
+def epoch_ms_in(tz):
+    """Epoch milliseconds -> naive datetime string in `tz`."""
+    def convert(value):
+        try:
+            seconds = int(value) / 1000
+            return datetime.fromtimestamp(seconds, tz=tz).strftime("%Y-%m-%d %H:%M:%S")
+        except (TypeError, ValueError, OverflowError, OSError):
+            return None
+    return convert
+
+
+def json_list(value):
+    return json.dumps(value if value is not None else [])
+
+
+def gmap(entry):
+    lat, lng = entry.get("lat"), entry.get("lng")
+    return f"https://www.google.com/maps?q={lat},{lng}" if lat and lng else None
+
+
+def location_id(address):
+    """Tracking Location name of an address: LEFT(SHA2(address, 256), 16) in SQL."""
+    if not address:
+        return None
+    return hashlib.sha256(str(address).encode("utf-8")).hexdigest()[:16]
+
+
+def more_details(entry):
+    """Keys of the entry that have no column of their own, as compact JSON."""
+    return json.dumps({k: v for k, v in entry.items() if k not in USED_KEYS}, separators=(",", ":"))
+
+
+# target: row field; sources: entry keys, first truthy wins (empty means the
+# vehicle_name argument); convert: a converter name from get_converters; default: used
+# when the result is falsy; fallback: another target used when the result is
+# falsy; entry: the converter receives the whole entry.
+Field = namedtuple("Field", "target sources convert default fallback entry", defaults=((), None, None, None, False))
+
+FIELD_SPEC = (
+    Field("date", ("date",)),
+    Field("last_comm", ("lastSeen",), "last_seen"),
+    Field("event_time", ("date",), "event_time", fallback="last_comm"),
+    Field("vehicle_name", ()),
+    Field("onboard_date", ("onboardDate",), "day_first_date"),
+    Field("reg_no", ("regNo",)),
+    Field("last_seen", ("lastComunicationTime",)),
+    Field("driver", ("driverName",)),
+    Field("communicating_port_no", ("communicatingPortNo",)),
+    Field("safety_parking", ("safetyParking",)),
+    Field("driver_mobile", ("driverMobile",)),
+    Field("time_zone", ("timeZone",)),
+    Field("kms", ("odoDistance",)),
+    Field("live", ("live",), "live"),
+    Field("latitude", ("lat", "latitude")),
+    Field("longitude", ("lng", "longitude")),
+    Field("device_model", ("deviceModel",)),
+    Field("vehicle_type_label", ("vehicleTypeLabel",)),
+    Field("vehilce_type", ("vehicleTypeLabel",)),
+    Field("expiry_date", ("expiryDate",), "day_first_date"),
+    Field("parked_time", ("parkedTime",)),
+    Field("expired", ("expired",), "truthy_string"),
+    Field("moving_time", ("movingTime",)),
+    Field("forward_or_backward", ("forwardOrBackward",)),
+    Field("expiry_days", ("expiryDays",)),
+    Field("idle_time", ("idleTime",)),
+    Field("date_sec", ("dateSec",)),
+    Field("error", ("error",), default="-"),
+    Field("distance_covered", ("distanceCovered",)),
+    Field("chassis_number", ("chassisNumber",)),
+    Field("speed", ("speed",)),
+    Field("route_name", ("routeName",)),
+    Field("altitude", ("altitude",), default="-"),
+    Field("expirystatus", ("expiryStatus",), "truthy_string"),
+    Field("device_status", ("deviceStatus",)),
+    Field("tank_size", ("tankSize",)),
+    Field("made_in", ("madeIn",)),
+    Field("device_volt", ("deviceVolt",)),
+    Field("position", ("position", "color"), "position"),
+    Field("gps_sim_no", ("gpsSimNo",)),
+    Field("fuel_litre", ("fuelLitre",)),
+    Field("camera_enabled", ("cameraEnabled",), "on_off"),
+    Field("veh_battery", ("powerStatus",)),
+    Field("insidegeofence", ("insideGeoFence",)),
+    Field("sensor_based_vehicle_mode", ("sensorBasedVehicleMode",), "json_list"),
+    Field("ac", ("ac",), "ac"),
+    Field("vehicle_busy", ("vehicleBusy",), "yes_flag"),
+    Field("today_workinghours", ("todayWorkingHours",)),
+    Field("fuel_ltrs", ("fuelLitres", "fuelLitre")),
+    Field("celsius", ("temperature",)),
+    Field("vehicle_type", ("vehicleType",)),
+    Field("over_speed_limit", ("overSpeedLimit",)),
+    Field("ignition_status", ("ignitionStatus",)),
+    Field("status", ("status",)),
+    Field("oprname", ("oprName",)),
+    Field("alert", ("alert",)),
+    Field("fuel_sensor_type", ("fuelSensorType",)),
+    Field("device_id", ("deviceId",)),
+    Field("trip_name", ("tripName",)),
+    Field("short_name", ("shortName",)),
+    Field("licence_type", ("licenceType",)),
+    Field("direction", ("direction", "forwardOrBackward")),
+    Field("vehicle_model", ("vehicleModel",)),
+    Field("engine_status", ("engineStatus",)),
+    Field("is_over_speed", ("isOverSpeed",), "yes_flag"),
+    Field("calibrate_mode", ("calibrateMode",)),
+    Field("vehicle_mode", ("vehicleMode",)),
+    Field("nearest_location", ("address",)),
+    Field("location", ("address",), "location_id"),
+    Field("gmap", convert="gmap", entry=True),
+    Field("fcode", ("fcode",)),
+    Field("rig_mode", ("rigMode",)),
+    Field("org_id", ("orgId",)),
+    Field("color", ("color",)),
+    Field("more_details", convert="more_details", entry=True),
+)
+
+
+def get_converters(tz):
+    return {
+        "last_seen": last_seen,
+        "event_time": epoch_ms_in(tz),
+        "day_first_date": day_first_date,
+        "live": live,
+        "truthy_string": str_in_set(TRUTHY_STRINGS, "YES", "NO"),
+        "position": position,
+        "on_off": on_off,
+        "json_list": json_list,
+        "ac": in_set(TRUE_AC, "ON", "OFF"),
+        "yes_flag": in_set(YES_FLAGS, "YES", "NO"),
+        "gmap": gmap,
+        "location_id": location_id,
+        "more_details": more_details,
+    }
+
+
+def compile_normalizer(tz="UTC", spec=FIELD_SPEC):
+    """
+    Generate `normalize(entry, vehicle_name) -> row dict` from the spec.
+    `tz` is the zone event times are converted to (a name or tzinfo).
+    """
+    tz = ZoneInfo(tz) if isinstance(tz, str) else tz
+    converters = get_converters(tz)
+    namespace = {}
+    lines = ["def normalize(entry, vehicle_name):", "    get = entry.get"]
+    local = {}
+
+    for position_, field in enumerate(spec):
+        name = f"v{position_}"
+        local[field.target] = name
+
+        if field.entry:
+            expression = "entry"
+        elif not field.sources:
+            expression = "vehicle_name"
+        else:
+            expression = " or ".join(f"get({source!r})" for source in field.sources)
+            if len(field.sources) > 1:
+                expression = f"({expression})"
+
+        if field.convert:
+            namespace[f"convert_{name}"] = converters[field.convert]
+            expression = f"convert_{name}({expression})"
+        if field.fallback:
+            expression = f"{expression} or {local[field.fallback]}"
+        if field.default is not None:
+            expression = f"{expression} or {field.default!r}"
+
+        lines.append(f"    {name} = {expression}")
+
+    lines.append("    return {" + ", ".join(f"{field.target!r}: {local[field.target]}" for field in spec) + "}")
+    exec(compile("\n".join(lines), "<vehicle tracking normalizer>", "exec"), namespace)
+    return namespace["normalize"]
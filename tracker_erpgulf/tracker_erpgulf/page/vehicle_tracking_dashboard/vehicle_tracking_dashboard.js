@@ -10,8 +10,31 @@ frappe.pages['vehicle-tracking-dashboard'].on_page_load = function(wrapper) {
 class VehicleTrackingDashboard {
     constructor(page) {
         this.page = page;
+        this.charts = {};
         this.make_form();
         this.load_dashboard_data();
+        this.subscribe();
+    }
+
+    subscribe() {
+        // Ingestion pushes the vehicles that changed in each poll plus fresh counters
+        // to the Vehicle Live State room; joining it needs read permission
+        frappe.realtime.doctype_subscribe("Vehicle Live State");
+        frappe.realtime.on("vehicle_tracking_dashboard_update", (delta) => this.apply_delta(delta));
+        // Deltas sent while disconnected are lost, so rejoin and start over from a full load
+        const manager = frappe.realtime.socket && frappe.realtime.socket.io;
+        manager && manager.on("reconnect", () => {
+            frappe.realtime.doctype_subscribe("Vehicle Live State");
+            this.load_dashboard_data();
+        });
+    }
+
+    apply_delta(delta) {
+        if (!this.data || !delta) return;
+        Object.assign(this.data, delta.counters || {});
+        this.update_cards(this.data);
+        this.update_charts(this.data);
+        this.update_list(delta.vehicles || []);
     }
 
     make_form() {
@@ -32,6 +55,7 @@ class VehicleTrackingDashboard {
             callback: (r) => {
                 if (!r.message) return;
                 const data = r.message;
+                this.data = data;
                 this.render_cards(data);
                 this.render_charts(data);
                 this.render_list(data.vehicle_list || []);
@@ -39,18 +63,22 @@ class VehicleTrackingDashboard {
         });
     }
 
-    render_cards(data) {
-        const metrics = [
-            { label: 'Moving', value: data.moving },
-            { label: 'Stopped', value: data.stopped },
-            { label: 'Parked', value: data.parked },
-            { label: 'AC ON', value: data.ac_on },
-            { label: 'AC OFF', value: data.ac_off },
-            { label: 'Most Run Today', value: data.most_run || '-' },
-            { label: 'Vehicles Not Run Today', value: data.not_run_today },
-            { label: 'Avg Duration Today', value: data.avg_duration },
-            { label: 'Avg Distance Today', value: data.avg_distance + ' km' }
+    get_metrics(data) {
+        return [
+            { key: 'moving', label: 'Moving', value: data.moving },
+            { key: 'stopped', label: 'Stopped', value: data.stopped },
+            { key: 'parked', label: 'Parked', value: data.parked },
+            { key: 'ac_on', label: 'AC ON', value: data.ac_on },
+            { key: 'ac_off', label: 'AC OFF', value: data.ac_off },
+            { key: 'most_run', label: 'Most Run Today', value: data.most_run || '-' },
+            { key: 'not_run_today', label: 'Vehicles Not Run Today', value: data.not_run_today },
+            { key: 'avg_duration', label: 'Avg Duration Today', value: data.avg_duration },
+            { key: 'avg_distance', label: 'Avg Distance Today', value: data.avg_distance + ' km' }
         ];
+    }
+
+    render_cards(data) {
+        const metrics = this.get_metrics(data);
 
         let cardHtml = '';
         for (let i = 0; i < metrics.length; i += 3) {
@@ -60,7 +88,7 @@ class VehicleTrackingDashboard {
                 cardHtml += `
                     <div style="flex:1; background:#f8f9fa; padding:20px; border-radius:8px; text-align:center; box-shadow:0 0 5px rgba(0,0,0,0.1);">
                         <h5 style="color:#6c757d;">${m.label}</h5>
-                        <div style="font-size:22px; font-weight:bold;">${m.value}</div>
+                        <div class="metric-value" data-metric="${m.key}" style="font-size:22px; font-weight:bold;">${m.value}</div>
                     </div>`;
             }
             cardHtml += `</div>`;
@@ -68,6 +96,13 @@ class VehicleTrackingDashboard {
         this.form.get_field("summary_cards").html(cardHtml);
     }
 
+    update_cards(data) {
+        const $cards = this.form.get_field("summary_cards").$wrapper;
+        for (const m of this.get_metrics(data)) {
+            $cards.find(`.metric-value[data-metric="${m.key}"]`).text(m.value);
+        }
+    }
+
     render_charts(data) {
         const chart_html = `
             <div style="display:flex; gap:20px; justify-content:center; flex-wrap:wrap;">
@@ -86,7 +121,7 @@ class VehicleTrackingDashboard {
         if (typeof Chart === "undefined") {
             const script = document.createElement("script");
             script.src = "https://cdn.jsdelivr.net/npm/chart.js";
-            script.onload = () => this.draw_charts(data);
+            script.onload = () => this.draw_charts(this.data);
             document.head.appendChild(script);
         } else {
             this.draw_charts(data);
@@ -94,7 +129,7 @@ class VehicleTrackingDashboard {
     }
 
     draw_charts(data) {
-        new Chart(document.getElementById("vehicleStatusChart").getContext("2d"), {
+        this.charts.status = new Chart(document.getElementById("vehicleStatusChart").getContext("2d"), {
             type: "pie",
             data: {
                 labels: ["Moving", "Stopped", "Parked"],
@@ -103,7 +138,7 @@ class VehicleTrackingDashboard {
             options: { responsive: true, plugins: { legend: { position: "bottom" }, title: { display: true, text: "Vehicle Status Distribution" } } }
         });
 
-        new Chart(document.getElementById("acStatusChart").getContext("2d"), {
+        this.charts.ac = new Chart(document.getElementById("acStatusChart").getContext("2d"), {
             type: "pie",
             data: {
                 labels: ["AC ON", "AC OFF"],
@@ -112,30 +147,31 @@ class VehicleTrackingDashboard {
             options: { responsive: true, plugins: { legend: { position: "bottom" }, title: { display: true, text: "AC Status" } } }
         });
 
-        new Chart(document.getElementById("distanceChart").getContext("2d"), {
+        this.charts.distance = new Chart(document.getElementById("distanceChart").getContext("2d"), {
             type: "bar",
             data: { labels: data.distance_chart.labels, datasets: [{ label: "Distance (km)", data: data.distance_chart.values, backgroundColor: "#007bff" }] },
             options: { responsive: true, plugins: { legend: { display: false }, title: { display: true, text: "Top 5 Vehicles by Distance Today" } }, scales: { y: { beginAtZero: true } } }
         });
     }
 
+    update_charts(data) {
+        // Charts may still be waiting for Chart.js; they are drawn from this.data then
+        if (!this.charts.status) return;
+
+        this.charts.status.data.datasets[0].data = [data.moving, data.stopped, data.parked];
+        this.charts.ac.data.datasets[0].data = [data.ac_on, data.ac_off];
+        this.charts.distance.data.labels = data.distance_chart.labels;
+        this.charts.distance.data.datasets[0].data = data.distance_chart.values;
+        Object.values(this.charts).forEach(chart => chart.update("none"));
+    }
+
     render_list(vehicle_list) {
         if (!vehicle_list.length) {
             this.form.get_field("vehicle_list").html("<p>No vehicle data available.</p>");
             return;
         }
 
-        const rows = vehicle_list.map(v => `
-            <tr>
-                <td>${v.vehicle_name || '-'}</td>
-                <td>${v.reg_no || '-'}</td>
-                <td>${v.position || '-'}</td>
-                <td>${v.last_comm || '-'}</td>
-                <td>${v.today_workinghours || '00:00:00'}</td>
-                <td>${v.kms || 0} km</td>
-                <td>${v.ac || '-'}</td>
-            </tr>
-        `).join("");
+        const rows = vehicle_list.map(v => this.row_html(v)).join("");
 
         const table_html = `
             <table class="table table-bordered table-striped">
@@ -154,4 +190,35 @@ class VehicleTrackingDashboard {
             </table>`;
         this.form.get_field("vehicle_list").html(table_html);
     }
+
+    row_html(v) {
+        return `
+            <tr data-vehicle="${frappe.utils.escape_html(v.vehicle_name || '')}">
+                <td>${v.vehicle_name || '-'}</td>
+                <td>${v.reg_no || '-'}</td>
+                <td>${v.position || '-'}</td>
+                <td>${v.last_comm || '-'}</td>
+                <td>${v.today_workinghours || '00:00:00'}</td>
+                <td>${v.kms || 0} km</td>
+                <td>${v.ac || '-'}</td>
+            </tr>
+        `;
+    }
+
+    update_list(vehicles) {
+        if (!vehicles.length) return;
+
+        const $tbody = this.form.get_field("vehicle_list").$wrapper.find("tbody");
+        if (!$tbody.length) {
+            // The list was empty; draw it with the vehicles we now have
+            this.render_list(vehicles);
+            return;
+        }
+
+        // Changed vehicles move to the top, like the server's last_comm ordering
+        for (const v of vehicles.slice().reverse()) {
+            $tbody.find("tr").filter((_, tr) => tr.dataset.vehicle === (v.vehicle_name || "")).remove();
+            $tbody.prepend(this.row_html(v));
+        }
+    }
 }
@@ -0,0 +1,112 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tracker_erpgulf.tracker_erpgulf.stream import batched, iter_vehicle_entries
+
+
+STREAM_CHUNK_BYTES = 64 * 1024
+QUEUE_BATCHES = 8  # parsed batches buffered between the fetchers and the writer
+
+
+class _Stopped(Exception):
+    pass
+
+
+def fetch_concurrently(jobs, batch_size, max_workers=4):
+    """
+    Fetch and parse several provider accounts in a bounded thread pool and yield
+    their messages in the calling thread, as they arrive:
+
+    - (account, "response", (status_code, body)) once per account; body is only
+      read for non-200 responses, which end that account
+    - (account, "batch", [entries]) for each parsed batch
+    - (account, "error", exception) on a transport or payload error
+    - (account, "done", stats) last, always; stats holds the seconds spent
+      waiting for the response headers ("fetch") and streaming and parsing the
+      body ("parse", excluding time spent waiting on the writer), and the
+      decoded body size ("bytes")
+
+    `jobs` are (account, client, params) tuples. Threads only do HTTP and JSON
+    parsing; every database write stays with the consumer, which acts as the
+    single writer. The queue is bounded, so fetchers wait while the writer
+    catches up and memory stays flat.
+    """
+    out = queue.Queue(maxsize=QUEUE_BATCHES)
+    stop = threading.Event()
+    pending = len(jobs)
+    if not pending:
+        return
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, pending)), thread_name_prefix="vehicle-tracking-poll")
+    try:
+        for account, client, params in jobs:
+            pool.submit(_fetch_account, account, client, params, batch_size, out, stop)
+
+        while pending:
+            message = out.get()
+            if message[1] == "done":
+                pending -= 1
+            yield message
+    finally:
+        # Unblock fetchers if the consumer stopped early
+        stop.set()
+        while True:
+            try:
+                out.get_nowait()
+            except queue.Empty:
+                break
+        pool.shutdown(wait=True)
+
+
+def _fetch_account(account, client, params, batch_size, out, stop):
+    response = None
+    stats = {"fetch": 0.0, "parse": 0.0, "bytes": 0}
+    try:
+        started = time.perf_counter()
+        response = client.request(params)
+        stats["fetch"] = time.perf_counter() - started
+        if response.status_code != 200:
+            _put(out, (account, "response", (response.status_code, response.text)), stop)
+            return
+
+        _put(out, (account, "response", (200, None)), stop)
+        chunks = _counted(response.iter_content(chunk_size=STREAM_CHUNK_BYTES), stats)
+        started = time.perf_counter()
+        for batch in batched(iter_vehicle_entries(chunks), batch_size):
+            stats["parse"] += time.perf_counter() - started
+            _put(out, (account, "batch", batch), stop)
+            started = time.perf_counter()
+        stats["parse"] += time.perf_counter() - started
+    except _Stopped:
+        return
+    except Exception as e:
+        _put_quietly(out, (account, "error", e), stop)
+    finally:
+        if response is not None:
+            response.close()
+        _put_quietly(out, (account, "done", stats), stop)
+
+
+def _counted(chunks, stats):
+    for chunk in chunks:
+        stats["bytes"] += len(chunk)
+        yield chunk
+
+
+def _put(out, message, stop):
+    while not stop.is_set():
+        try:
+            out.put(message, timeout=0.5)
+            return
+        except queue.Full:
+            continue
+    raise _Stopped
+
+
+def _put_quietly(out, message, stop):
+    try:
+        _put(out, message, stop)
+    except _Stopped:
+        pass
@@ -0,0 +1,147 @@
+import threading
+import time
+
+import frappe
+import requests
+from frappe.utils import cint, flt
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the provider while its circuit breaker is open."""
+
+
+def get_session(retries=3, backoff=0.5, pool_size=10):
+    """
+    Return the pooled `requests.Session` for the current site, creating it once
+    per worker process. Retries use bounded exponential backoff on connection
+    errors and on 429/5xx responses; gzip is negotiated on every request.
+    """
+    key = (getattr(frappe.local, "site", None), retries, backoff, pool_size)
+
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            retry = Retry(
+                total=retries,
+                connect=retries,
+                read=retries,
+                status=retries,
+                backoff_factor=backoff,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=frozenset(["GET"]),
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({"Accept-Encoding": "gzip, deflate", "Accept": "application/json"})
+            _sessions[key] = session
+
+    return session
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker kept in the site cache so every worker sees it.
+    After `threshold` failures the circuit opens for `cooldown` seconds; the first
+    call after that is let through as a trial and closes the circuit on success.
+    """
+
+    def __init__(self, name, threshold=5, cooldown=300):
+        self.key = f"vehicle_tracking_breaker:{name}"
+        self.threshold = threshold
+        self.cooldown = cooldown
+
+    def state(self):
+        return frappe.cache().get_value(self.key) or {"failures": 0, "open_until": 0}
+
+    def check(self):
+        state = self.state()
+        if state["open_until"] > time.time():
+            raise CircuitOpenError(
+                f"Provider circuit open after {state['failures']} failures, "
+                f"retrying in {int(state['open_until'] - time.time())}s"
+            )
+
+    def record_success(self):
+        frappe.cache().delete_value(self.key)
+
+    def record_failure(self):
+        state = self.state()
+        state["failures"] += 1
+        if self.threshold and state["failures"] >= self.threshold:
+            state["open_until"] = time.time() + self.cooldown
+        frappe.cache().set_value(self.key, state)
+
+
+class ProviderClient:
+    """HTTP client for the tracking provider: pooled, time-bounded, retried and breaker-guarded."""
+
+    def __init__(
+        self,
+        base_url,
+        connect_timeout=5,
+        read_timeout=30,
+        retries=3,
+        backoff=0.5,
+        breaker_threshold=5,
+        breaker_cooldown=300,
+        name="default",
+    ):
+        self.base_url = base_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = get_session(retries=retries, backoff=backoff)
+        self.breaker = CircuitBreaker(name, threshold=breaker_threshold, cooldown=breaker_cooldown)
+
+    @classmethod
+    def from_settings(cls, settings, base_url=None, name="default"):
+        return cls(
+            base_url or settings.base_url,
+            connect_timeout=flt(settings.connect_timeout) or 5,
+            read_timeout=flt(settings.read_timeout) or 30,
+            retries=cint(settings.max_retries) or 3,
+            backoff=flt(settings.retry_backoff) or 0.5,
+            breaker_threshold=cint(settings.breaker_threshold) or 5,
+            breaker_cooldown=cint(settings.breaker_cooldown) or 300,
+            name=name,
+        )
+
+    def fetch(self, params):
+        """
+        GET the provider URL with `stream=True` and return the response.
+        Raises `CircuitOpenError` without touching the network while the breaker
+        is open; transport errors and non-200 responses count as failures.
+        """
+        self.breaker.check()
+
+        try:
+            response = self.request(params)
+        except requests.RequestException:
+            self.breaker.record_failure()
+            raise
+
+        self.record(response.status_code)
+        return response
+
+    def request(self, params):
+        """
+        The bare streamed GET, without the breaker. Makes no frappe calls, so it
+        is safe to run in a worker thread while the caller handles the breaker.
+        """
+        return self.session.get(self.base_url, params=params, timeout=self.timeout, stream=True)
+
+    def record(self, status_code):
+        if status_code == 200:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
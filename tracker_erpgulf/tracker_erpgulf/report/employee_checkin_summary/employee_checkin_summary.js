@@ -12,12 +12,14 @@ frappe.query_reports["Employee Checkin Summary"] = {
             fieldname: "from_date",
             label: "From Date",
             fieldtype: "Date",
+            default: frappe.datetime.add_days(frappe.datetime.get_today(), -30),
             reqd: 0
         },
         {
             fieldname: "to_date",
             label: "To Date",
             fieldtype: "Date",
+            default: frappe.datetime.get_today(),
             reqd: 0
         },
         {
@@ -26,6 +28,13 @@ frappe.query_reports["Employee Checkin Summary"] = {
             fieldtype: "Link",
             options: "Employee",
             reqd: 0
+        },
+        {
+            fieldname: "department",
+            label: "Department",
+            fieldtype: "Link",
+            options: "Department",
+            reqd: 0
         }
     ]
 };
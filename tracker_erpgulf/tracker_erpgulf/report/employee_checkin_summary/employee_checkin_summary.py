@@ -9,7 +9,11 @@
 # 	return columns, data
 import frappe
 from frappe import _
-from datetime import datetime
+from frappe.utils import add_days, getdate, nowdate
+
+CHART_LIMIT = 20
+DEFAULT_RANGE_DAYS = 30
+
 
 def execute(filters=None):
     filters = filters or {}
@@ -34,64 +38,58 @@ def get_columns():
     ]
 
 
-def get_data(filters):
-    sql = """
-        SELECT 
-            ec.employee,
-            ec.employee_name,
-            ec.device_id,
-            ec.log_type,
-            ec.time,
-            ec.name
-        FROM `tabEmployee Checkin` ec
-        ORDER BY ec.employee, ec.time
-    """
-
-    raw = frappe.db.sql(sql, as_dict=True)
-
-    data = []
-    employee_logs = {}
+def get_conditions(filters):
+    to_date = getdate(filters.get("to_date") or nowdate())
+    from_date = getdate(filters.get("from_date") or add_days(to_date, -DEFAULT_RANGE_DAYS))
 
-    # Group by employee & date
-    for row in raw:
-        key = (row.employee, row.time.date())
+    conditions = ["attendance_date BETWEEN %(from_date)s AND %(to_date)s"]
+    values = {"from_date": from_date, "to_date": to_date}
 
-        if key not in employee_logs:
-            employee_logs[key] = {"IN": None, "OUT": None, "meta": row}
+    if filters.get("employee"):
+        conditions.append("employee = %(employee)s")
+        values["employee"] = filters["employee"]
 
-        employee_logs[key][row.log_type] = row.time
+    if filters.get("department"):
+        conditions.append("department = %(department)s")
+        values["department"] = filters["department"]
 
-    for (employee, log_date), logs in employee_logs.items():
-        emp_doc = frappe.db.get_value("Employee", employee, ["department"], as_dict=True)
+    return " AND ".join(conditions), values
 
-        check_in = logs["IN"]
-        check_out = logs["OUT"]
 
-        working_hours = ""
-        status = ""
-
-        if check_in and check_out:
-            diff = check_out - check_in
-            working_hours = round(diff.total_seconds() / 3600, 2)
-            status = "Present"
-
-        data.append({
-            "employee": employee,
-            "employee_name": logs["meta"].employee_name,
-            "device_id": logs["meta"].device_id,
-            "check_in": check_in,
-            "check_out": check_out,
-            "working_hours": working_hours,
-            "status": status,
-            "department": emp_doc.department if emp_doc else "",
-        })
-
-    return data
+def get_data(filters):
+    # Daily Attendance holds one precomputed row per employee-day
+    conditions, values = get_conditions(filters)
+
+    rows = frappe.db.sql(
+        f"""
+        SELECT
+            employee, employee_name, device_id, department, status,
+            first_in AS check_in, last_out AS check_out, working_hours
+        FROM `tabDaily Attendance`
+        WHERE {conditions}
+        ORDER BY employee, attendance_date
+        """,
+        values,
+        as_dict=True,
+    )
+
+    for row in rows:
+        row.department = row.department or ""
+        if row.status != "Present":
+            row.working_hours = ""
+
+    return rows
 
 
 def get_chart(data):
-    labels = [d["employee"] for d in data]
-    hours = [d["working_hours"] or 0 for d in data]
+    # Total hours per employee over the range, top CHART_LIMIT only
+    totals = {}
+    for d in data:
+        totals[d["employee"]] = totals.get(d["employee"], 0) + (d["working_hours"] or 0)
+
+    top = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:CHART_LIMIT]
+    labels = [employee for employee, hours in top]
+    hours = [round(hours, 2) for employee, hours in top]
 
     return {
         "data": {
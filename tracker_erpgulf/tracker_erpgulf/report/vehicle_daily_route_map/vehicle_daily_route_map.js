@@ -26,9 +26,11 @@ frappe.query_reports["Vehicle Daily Route Map"] = {
     onload(report) {
         console.log("🔥 Report Loaded (Vehicle Daily Route Map)");
 
-        function render_map(locations) {
-            console.log("📍 Cleaned Locations (with time):", locations);
+        let map = null;
+        let overlays = [];
+        let current_zoom = null;
 
+        function get_map() {
             const mapDivId = "vehicle-route-map";
             let mapDiv = document.getElementById(mapDivId);
 
@@ -39,89 +41,98 @@ frappe.query_reports["Vehicle Daily Route Map"] = {
                 mapDiv.style.width = "100%";
                 mapDiv.style.marginTop = "20px";
                 report.page.wrapper.append(mapDiv);
-            } else {
-                mapDiv.innerHTML = "";
+                map = null;
             }
 
-            const map = new google.maps.Map(mapDiv, {
-                center: { lat: 25.3, lng: 51.5 },
-                zoom: 12
-            });
+            if (!map) {
+                map = new google.maps.Map(mapDiv, {
+                    center: { lat: 25.3, lng: 51.5 },
+                    zoom: 12
+                });
 
-            const geocoder = new google.maps.Geocoder();
-            const path = [];
-            const bounds = new google.maps.LatLngBounds();
-            let index = 0;
-
-            function geocodeNext() {
-                if (index >= locations.length) {
-                    if (path.length > 1) {
-                        new google.maps.Polyline({
-                            path,
-                            geodesic: true,
-                            strokeColor: "#FF0000",
-                            strokeOpacity: 1.0,
-                            strokeWeight: 6
-                        }).setMap(map);
-
-                        map.fitBounds(bounds);
+                // Ask for a finer or coarser track when the zoom level changes
+                map.addListener("idle", function () {
+                    const zoom = map.getZoom();
+                    if (current_zoom !== null && zoom !== current_zoom) {
+                        current_zoom = zoom;
+                        fetch_route({ zoom }, false);
                     }
-                    return;
-                }
+                });
+            }
 
-                let loc = locations[index];
-                console.log("📍 Geocoding:", loc);
-
-                geocoder.geocode({ address: loc.location }, function (results, status) {
-                    if (status === "OK" && results[0]) {
-                        let pos = results[0].geometry.location;
-
-                        // ⭐ TITLE = location + time
-                        let markerLabel = `${loc.location} (${loc.time})`;
-
-                        new google.maps.Marker({
-                            position: pos,
-                            map,
-                            title: markerLabel,
-                            label: {
-                                text: loc.time,
-                                color: "black",
-                                fontSize: "12px",
-                                fontWeight: "bold"
-                            }
-                        });
+            return map;
+        }
 
-                        path.push({ lat: pos.lat(), lng: pos.lng() });
-                        bounds.extend(pos);
-                    } else {
-                        console.warn("❌ Geocode Failed:", loc, status);
-                    }
+        function render_map(route, fit) {
+            const map = get_map();
+            overlays.forEach((overlay) => overlay.setMap(null));
+            overlays = [];
+
+            const bounds = new google.maps.LatLngBounds();
+
+            (route.days || []).forEach(function (day) {
+                const path = day.points.map(([lat, lng]) => ({ lat, lng }));
+                path.forEach((point) => bounds.extend(point));
+
+                if (path.length > 1) {
+                    overlays.push(new google.maps.Polyline({
+                        path,
+                        geodesic: true,
+                        strokeColor: "#FF0000",
+                        strokeOpacity: 1.0,
+                        strokeWeight: 6,
+                        map
+                    }));
+                }
 
-                    index++;
-                    geocodeNext();
+                // ⭐ Stops: TITLE = date + time
+                day.stops.forEach(function ([lat, lng, time]) {
+                    overlays.push(new google.maps.Marker({
+                        position: { lat, lng },
+                        map,
+                        title: `${day.date} ${time}`,
+                        label: {
+                            text: time,
+                            color: "black",
+                            fontSize: "12px",
+                            fontWeight: "bold"
+                        }
+                    }));
                 });
-            }
+            });
 
-            geocodeNext();
+            if (fit && !bounds.isEmpty()) {
+                map.fitBounds(bounds);
+            }
         }
 
-        report.refresh = function () {
-            let vehicle = report.get_filter_value("vehicle");
-            let date = report.get_filter_value("route_date");
-
-            console.log("🚗 (REFRESH) Vehicle:", vehicle);
-            console.log("📅 (REFRESH) Date:", date);
+        function fetch_route(args, fit) {
+            const vehicle = report.get_filter_value("vehicle");
+            const date = report.get_filter_value("route_date");
 
             if (!vehicle || !date) return;
 
             frappe.call({
-                method: "tracker_erpgulf.tracker_erpgulf.vehicle.get_nearest_locations",
-                args: { vehicle, route_date: date },
+                method: "tracker_erpgulf.tracker_erpgulf.route.get_route",
+                args: Object.assign({ vehicle, route_date: date }, args),
                 callback: function (r) {
-                    console.log("📌 Python Returned:", r.message);
-                    render_map(r.message || []);
+                    const route = r.message || {};
+                    if (fit) {
+                        current_zoom = null;
+                    }
+                    render_map(route, fit);
+                    if (fit) {
+                        google.maps.event.addListenerOnce(get_map(), "idle", function () {
+                            current_zoom = get_map().getZoom();
+                        });
+                    }
                 }
             });
+        }
+
+        report.refresh = function () {
+            // First draw with a point budget, then refine per zoom level
+            fetch_route({ max_points: 500 }, true);
         };
 
         window.initVehicleRouteMap = function () {
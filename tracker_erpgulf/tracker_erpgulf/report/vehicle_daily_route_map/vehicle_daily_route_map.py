@@ -10,8 +10,9 @@
 
 import frappe
 from frappe import _
-from frappe.utils import getdate
-from pypika.functions import Date     # <-- IMPORTANT FIX
+
+from tracker_erpgulf.tracker_erpgulf.retention import get_archived_rows
+from tracker_erpgulf.tracker_erpgulf.vehicle import get_day_bounds
 
 
 def execute(filters=None):
@@ -53,22 +54,39 @@ def get_data(filters):
     if not vehicle or not route_date:
         return []
 
+    day_start, day_end = get_day_bounds(route_date)
     tracking = frappe.qb.DocType("Vehicle Tracking System")
+    location = frappe.qb.DocType("Tracking Location")
 
     rows = (
         frappe.qb.from_(tracking)
+        .left_join(location).on(location.name == tracking.location)
         .select(
             tracking.reg_no,
-            tracking.date.as_("event_time"),
+            tracking.event_time,
             tracking.latitude,
             tracking.longitude,
             tracking.speed,
             tracking.vehicle_mode,
-            tracking.nearest_location,
+            location.address.as_("nearest_location"),
         )
         .where(tracking.reg_no == vehicle)
-        .where(Date(tracking.date) == getdate(route_date))   # <-- FIXED
-        .orderby(tracking.date)
+        .where(tracking.event_time[day_start:day_end])
+        .orderby(tracking.event_time)
     ).run(as_dict=True)
 
-    return rows
+    # Days older than the retention window are read from the daily archive
+    archived = [
+        frappe._dict({
+            "reg_no": row.reg_no,
+            "event_time": row.event_time,
+            "latitude": row.latitude,
+            "longitude": row.longitude,
+            "speed": row.speed,
+            "vehicle_mode": row.vehicle_mode,
+            "nearest_location": row.nearest_location,
+        })
+        for row in get_archived_rows(route_date, route_date, vehicle=vehicle, vehicle_field="reg_no")
+    ]
+
+    return archived + rows
@@ -0,0 +1,25 @@
+frappe.query_reports["Vehicle Tracking Poll Performance"] = {
+    "filters": [
+        {
+            fieldname: "from_date",
+            label: "From Date",
+            fieldtype: "Date",
+            default: frappe.datetime.add_days(frappe.datetime.get_today(), -1),
+            reqd: 1
+        },
+        {
+            fieldname: "to_date",
+            label: "To Date",
+            fieldtype: "Date",
+            default: frappe.datetime.get_today(),
+            reqd: 1
+        },
+        {
+            fieldname: "interval",
+            label: "Interval",
+            fieldtype: "Select",
+            options: "Hour\nDay",
+            default: "Hour"
+        }
+    ]
+};
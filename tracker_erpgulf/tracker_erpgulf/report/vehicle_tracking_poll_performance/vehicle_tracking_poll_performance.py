@@ -0,0 +1,115 @@
+import math
+
+import frappe
+from frappe.utils import add_days, flt, getdate, nowdate
+
+MAX_RANGE_DAYS = 31
+
+
+def execute(filters=None):
+    filters = filters or {}
+
+    columns = get_columns()
+    data = get_data(filters)
+    chart = get_chart(data, get_cadence())
+
+    return columns, data, None, chart
+
+
+def get_columns():
+    return [
+        {"label": "Period", "fieldname": "period", "fieldtype": "Data", "width": 150},
+        {"label": "Polls", "fieldname": "polls", "fieldtype": "Int", "width": 80},
+        {"label": "Errors", "fieldname": "errors", "fieldtype": "Int", "width": 80},
+        {"label": "Skipped", "fieldname": "skipped", "fieldtype": "Int", "width": 80},
+        {"label": "p50 (s)", "fieldname": "p50", "fieldtype": "Float", "precision": 2, "width": 100},
+        {"label": "p95 (s)", "fieldname": "p95", "fieldtype": "Float", "precision": 2, "width": 100},
+        {"label": "Max (s)", "fieldname": "max", "fieldtype": "Float", "precision": 2, "width": 100},
+        {"label": "Avg Received", "fieldname": "received", "fieldtype": "Int", "width": 120},
+        {"label": "Avg Fetch (s)", "fieldname": "fetch_time", "fieldtype": "Float", "precision": 2, "width": 110},
+        {"label": "Avg Parse (s)", "fieldname": "parse_time", "fieldtype": "Float", "precision": 2, "width": 110},
+        {"label": "Avg Normalize (s)", "fieldname": "normalize_time", "fieldtype": "Float", "precision": 2, "width": 130},
+        {"label": "Avg Resolve (s)", "fieldname": "resolve_time", "fieldtype": "Float", "precision": 2, "width": 120},
+        {"label": "Avg Write (s)", "fieldname": "write_time", "fieldtype": "Float", "precision": 2, "width": 110},
+    ]
+
+
+def get_data(filters):
+    to_date = getdate(filters.get("to_date") or nowdate())
+    from_date = max(getdate(filters.get("from_date") or to_date), add_days(to_date, -MAX_RANGE_DAYS))
+    period_format = "%Y-%m-%d" if filters.get("interval") == "Day" else "%Y-%m-%d %H:00"
+
+    logs = frappe.db.sql(
+        """
+        SELECT poll_time, status, duration, received,
+            fetch_time, parse_time, normalize_time, resolve_time, write_time
+        FROM `tabVehicle Tracking Poll Log`
+        WHERE poll_time >= %(from_date)s AND poll_time < %(to_date)s
+        ORDER BY poll_time
+        """,
+        {"from_date": from_date, "to_date": add_days(to_date, 1)},
+        as_dict=True,
+    )
+
+    periods = {}
+    for log in logs:
+        periods.setdefault(log.poll_time.strftime(period_format), []).append(log)
+
+    return [summarize(period, rows) for period, rows in periods.items()]
+
+
+def summarize(period, rows):
+    # Skipped polls (no account due) did no work, so they are kept out of the timings
+    skipped = sum(row.status == "Skipped" for row in rows)
+    rows = [row for row in rows if row.status != "Skipped"]
+    durations = sorted(flt(row.duration) for row in rows)
+    count = len(rows) or 1
+
+    summary = {
+        "period": period,
+        "polls": len(rows),
+        "errors": sum(row.status == "Error" for row in rows),
+        "skipped": skipped,
+        "p50": percentile(durations, 0.5),
+        "p95": percentile(durations, 0.95),
+        "max": durations[-1] if durations else 0,
+        "received": sum(row.received or 0 for row in rows) / count,
+    }
+    for stage in ("fetch_time", "parse_time", "normalize_time", "resolve_time", "write_time"):
+        summary[stage] = sum(flt(row[stage]) for row in rows) / count
+    return summary
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of sorted `values`."""
+    if not values:
+        return 0
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+def get_cadence():
+    """Seconds between polls: the shortest configured frequency, at least the one-minute tick."""
+    settings = frappe.get_single("Vehicle Tracking Setting")
+    frequencies = [flt(settings.frequency)] + [
+        flt(account.frequency) for account in settings.get("provider_accounts") or []
+        if account.enabled and flt(account.frequency)
+    ]
+    return max(min(frequencies) * 60, 60)
+
+
+def get_chart(data, cadence):
+    if not data:
+        return None
+
+    return {
+        "data": {
+            "labels": [row["period"] for row in data],
+            "datasets": [
+                {"name": "p50 (s)", "values": [round(row["p50"], 2) for row in data]},
+                {"name": "p95 (s)", "values": [round(row["p95"], 2) for row in data]},
+                {"name": "Poll interval (s)", "values": [cadence] * len(data)},
+            ],
+        },
+        "type": "line",
+        "lineOptions": {"hideDots": 1},
+    }
@@ -3,6 +3,14 @@
 
 frappe.query_reports["Vehicle Tracking Report"] = {
     "filters": [
+        {
+            fieldname: "mode",
+            label: __("Mode"),
+            fieldtype: "Select",
+            options: "Summary\nRaw Points",
+            default: "Summary",
+            reqd: 1
+        },
         {
             fieldname: "vehicle",
             label: __("Vehicle"),
@@ -24,5 +32,60 @@ frappe.query_reports["Vehicle Tracking Report"] = {
             default: frappe.datetime.get_today(),
             reqd: 0
         }
-    ]
+    ],
+
+    formatter(value, row, column, data, default_formatter) {
+        value = default_formatter(value, row, column, data);
+        // In summary mode the point count drills down to that vehicle-day's raw points
+        if (column.fieldname === "points" && data && data.summary_date) {
+            value = `<a class="vehicle-day-points" data-vehicle="${encodeURIComponent(data.vehicle_name)}"
+                data-date="${data.summary_date}">${value}</a>`;
+        }
+        return value;
+    },
+
+    onload(report) {
+        report.page.add_inner_button(__("Export Raw Points"), () => {
+            const filters = report.get_values();
+            const dialog = new frappe.ui.Dialog({
+                title: __("Export Raw Points"),
+                fields: [
+                    { fieldname: "file_format", label: __("Format"), fieldtype: "Select", options: "CSV\nNDJSON", default: "CSV" }
+                ],
+                primary_action_label: __("Export"),
+                primary_action: ({ file_format }) => {
+                    dialog.hide();
+                    frappe.call({
+                        method: "tracker_erpgulf.tracker_erpgulf.export.export_raw_points",
+                        args: {
+                            from_date: filters.from_date || frappe.datetime.get_today(),
+                            to_date: filters.to_date || frappe.datetime.get_today(),
+                            vehicle: filters.vehicle,
+                            file_format
+                        },
+                        callback: () => frappe.show_alert({
+                            message: __("Export queued. You will be notified when the file is ready."),
+                            indicator: "blue"
+                        })
+                    });
+                }
+            });
+            dialog.show();
+        });
+
+        frappe.realtime.on("vehicle_tracking_export", (data) => {
+            const link = data.file_url ? ` <a href="${data.file_url}">${__("Download")}</a>` : "";
+            frappe.show_alert({ message: frappe.utils.escape_html(data.subject) + link, indicator: data.file_url ? "green" : "red" }, 15);
+        });
+
+        $(report.page.wrapper).on("click", ".vehicle-day-points", function () {
+            const day = $(this).attr("data-date");
+            frappe.query_report.set_filter_value({
+                mode: "Raw Points",
+                vehicle: decodeURIComponent($(this).attr("data-vehicle")),
+                from_date: day,
+                to_date: day
+            });
+        });
+    }
 };
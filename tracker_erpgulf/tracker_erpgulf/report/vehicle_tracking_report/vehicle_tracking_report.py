@@ -1,34 +1,48 @@
 import frappe
 from frappe.utils import getdate
 
+from tracker_erpgulf.tracker_erpgulf.retention import get_archived_rows
+
+# expiry_date is not on archived points; like live ones, they read it from the device profile
+ARCHIVE_FIELDS = [
+    "vehicle_name", "reg_no", "position", "last_comm", "today_workinghours", "kms",
+    "ac", "speed", "status", "gmap", "is_over_speed"
+]
+
 def execute(filters=None):
     """
     Vehicle Tracking Report
     Supports filtering by vehicle and date range.
-    Includes: speed, status, position, expiry_date, gmap, is_over_speed
+    Summary mode reads one Vehicle Daily Summary row per vehicle-day; Raw
+    Points mode returns every point, with speed, status, position,
+    expiry_date, gmap and is_over_speed.
     """
     filters = filters or {}
     vehicle = filters.get("vehicle")
     from_date = filters.get("from_date") or getdate()
     to_date = filters.get("to_date") or getdate()
 
-    # Build SQL query
+    if filters.get("mode") == "Summary":
+        return get_summary_columns(), get_summary_data(vehicle, from_date, to_date)
+
+    # Build SQL query; expiry_date is a static attribute kept on the device profile
     query = """
         SELECT
-            vehicle_name,
-            reg_no,
-            position,
-            last_comm,
-            today_workinghours,
-            kms,
-            ac AS ac_status,
-            speed,
-            status,
-            expiry_date,
-            gmap,
-            is_over_speed
-        FROM `tabVehicle Tracking System`
-        WHERE last_comm BETWEEN %(from_date)s AND %(to_date)s
+            t.vehicle_name,
+            t.reg_no,
+            t.position,
+            t.last_comm,
+            t.today_workinghours,
+            t.kms,
+            t.ac AS ac_status,
+            t.speed,
+            t.status,
+            p.expiry_date,
+            t.gmap,
+            t.is_over_speed
+        FROM `tabVehicle Tracking System` t
+        LEFT JOIN `tabVehicle Device Profile` p ON p.name = t.vehicle_name
+        WHERE t.event_time BETWEEN %(from_date)s AND %(to_date)s
     """
 
     query_filters = {
@@ -37,12 +51,22 @@ def execute(filters=None):
     }
 
     if vehicle:
-        query += " AND vehicle_name = %(vehicle)s"
+        query += " AND t.vehicle_name = %(vehicle)s"
         query_filters["vehicle"] = vehicle
 
+    query += " ORDER BY t.event_time"
+
     # Execute query
     data = frappe.db.sql(query, query_filters, as_dict=True)
 
+    # Points older than the retention window live in the daily archives
+    archived = get_archived_rows(from_date, to_date, vehicle=vehicle, fields=ARCHIVE_FIELDS)
+    expiry_dates = get_expiry_dates({row.vehicle_name for row in archived if row.vehicle_name})
+    for row in archived:
+        row["ac_status"] = row.pop("ac")
+        row["expiry_date"] = expiry_dates.get(row.vehicle_name)
+    data = archived + data
+
     # Define report columns
     columns = [
         {"fieldname": "vehicle_name", "label": "Vehicle", "fieldtype": "Data", "width": 150},
@@ -60,3 +84,55 @@ def execute(filters=None):
     ]
 
     return columns, data
+
+
+def get_expiry_dates(vehicles):
+    if not vehicles:
+        return {}
+    return dict(frappe.get_all(
+        "Vehicle Device Profile",
+        filters={"name": ["in", list(vehicles)]},
+        fields=["name", "expiry_date"],
+        as_list=True,
+    ))
+
+
+def get_summary_data(vehicle, from_date, to_date):
+    conditions = "summary_date BETWEEN %(from_date)s AND %(to_date)s"
+    values = {"from_date": from_date, "to_date": to_date}
+    if vehicle:
+        conditions += " AND vehicle = %(vehicle)s"
+        values["vehicle"] = vehicle
+
+    return frappe.db.sql(
+        f"""
+        SELECT
+            vehicle AS vehicle_name, reg_no, summary_date, first_seen, last_seen,
+            distance, working_hours, moving_time, idle_time, parked_time,
+            max_speed, over_speed_count, ac_on_time, points
+        FROM `tabVehicle Daily Summary`
+        WHERE {conditions}
+        ORDER BY summary_date, vehicle
+        """,
+        values,
+        as_dict=True,
+    )
+
+
+def get_summary_columns():
+    return [
+        {"fieldname": "vehicle_name", "label": "Vehicle", "fieldtype": "Link", "options": "Vehicle", "width": 150},
+        {"fieldname": "reg_no", "label": "Reg No", "fieldtype": "Data", "width": 120},
+        {"fieldname": "summary_date", "label": "Date", "fieldtype": "Date", "width": 110},
+        {"fieldname": "first_seen", "label": "First Seen", "fieldtype": "Datetime", "width": 160},
+        {"fieldname": "last_seen", "label": "Last Seen", "fieldtype": "Datetime", "width": 160},
+        {"fieldname": "distance", "label": "Distance (km)", "fieldtype": "Float", "width": 120},
+        {"fieldname": "working_hours", "label": "Working Hours", "fieldtype": "Float", "width": 120},
+        {"fieldname": "moving_time", "label": "Moving", "fieldtype": "Duration", "width": 120},
+        {"fieldname": "idle_time", "label": "Idle", "fieldtype": "Duration", "width": 120},
+        {"fieldname": "parked_time", "label": "Parked", "fieldtype": "Duration", "width": 120},
+        {"fieldname": "max_speed", "label": "Max Speed", "fieldtype": "Int", "width": 100},
+        {"fieldname": "over_speed_count", "label": "Over Speed Count", "fieldtype": "Int", "width": 120},
+        {"fieldname": "ac_on_time", "label": "AC On", "fieldtype": "Duration", "width": 120},
+        {"fieldname": "points", "label": "Points", "fieldtype": "Int", "width": 100},
+    ]
@@ -0,0 +1,286 @@
+import glob
+import gzip
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+
+import frappe
+from frappe.utils import add_days, cint, flt, get_datetime, getdate, now, nowdate
+
+
+ARCHIVE_DIR = "tracking_archive"
+PENDING_SUFFIX = ".pending"
+RETENTION_JOB_ID = "vehicle_tracking_retention"
+JOB_TIME_BUDGET = 50 * 60  # stop before JOB_TIMEOUT and resume on the next run
+JOB_TIMEOUT = 60 * 60
+
+
+def enqueue_retention():
+    """Daily scheduler entry point."""
+    settings = frappe.get_single("Vehicle Tracking Setting")
+    if not settings.enable_retention:
+        return
+
+    frappe.enqueue(
+        "tracker_erpgulf.tracker_erpgulf.retention.run_retention",
+        queue="long",
+        timeout=JOB_TIMEOUT,
+        job_id=RETENTION_JOB_ID,
+        deduplicate=True,
+    )
+
+
+def run_retention():
+    """
+    Move raw tracking points older than the retention window out of the table.
+
+    Works in small primary-key chunks ordered by time, committing after each one,
+    so the table is never locked for longer than a single chunk. For each chunk
+    the points are appended to per-day gzip NDJSON archives (when enabled), folded
+    into per-vehicle time-bucket rollups and deleted. Expired rollups are purged
+    the same way.
+
+    A chunk's archive lines are staged in pending files and only appended to
+    the day archives once its delete has committed, so a failed chunk never
+    leaves rows both archived and in the table.
+    """
+    settings = frappe.get_single("Vehicle Tracking Setting")
+    raw_days = cint(settings.raw_retention_days)
+    if not raw_days:
+        return
+
+    chunk_size = cint(settings.retention_chunk_size) or 5000
+    bucket_minutes = cint(settings.rollup_bucket_minutes) or 15
+    cutoff = get_datetime(add_days(nowdate(), -raw_days))
+    started = time.monotonic()
+    moved = 0
+    recover_pending_archives()
+
+    # Points are purged by event time; the few without one, by creation
+    for condition, order, rollup in (
+        ("t.event_time < %(cutoff)s", "t.event_time, t.name", True),
+        ("t.event_time IS NULL AND t.creation < %(cutoff)s", "t.creation, t.name", False),
+    ):
+        while time.monotonic() - started < JOB_TIME_BUDGET:
+            rows = frappe.db.sql(
+                f"""
+                SELECT t.*, loc.address AS nearest_location
+                FROM `tabVehicle Tracking System` t
+                LEFT JOIN `tabTracking Location` loc ON loc.name = t.location
+                WHERE {condition}
+                ORDER BY {order}
+                LIMIT %(limit)s
+                """,
+                {"cutoff": cutoff, "limit": chunk_size},
+                as_dict=True,
+            )
+            if not rows:
+                break
+
+            pending = write_pending_archives(rows) if settings.archive_raw_points else []
+            if rollup:
+                upsert_rollups(rows, bucket_minutes)
+            frappe.db.delete("Vehicle Tracking System", {"name": ["in", [row.name for row in rows]]})
+            frappe.db.commit()
+            finalize_pending_archives(pending)
+            moved += len(rows)
+
+    rollup_days = cint(settings.rollup_retention_days)
+    if rollup_days:
+        purge_rollups(get_datetime(add_days(nowdate(), -rollup_days)), chunk_size)
+
+    return moved
+
+
+def upsert_rollups(rows, bucket_minutes):
+    """
+    Fold raw points into `Vehicle Tracking Rollup` buckets. Buckets can span
+    chunks, so each one is merged into any existing row with ON DUPLICATE KEY.
+    """
+    buckets = {}
+
+    for row in rows:
+        if not row.vehicle_name or not row.event_time:
+            continue
+        bucket_start = floor_to_bucket(row.event_time, bucket_minutes)
+        bucket = buckets.get((row.vehicle_name, bucket_start))
+        speed = cint(row.speed)
+
+        if bucket is None:
+            bucket = buckets[(row.vehicle_name, bucket_start)] = {
+                "vehicle": row.vehicle_name,
+                "reg_no": row.reg_no,
+                "bucket_start": bucket_start,
+                "points": 0,
+                "moving_points": 0,
+                "over_speed_points": 0,
+                "speed_total": 0,
+                "max_speed": speed,
+                "kms_start": row.kms,
+                "first_latitude": row.latitude,
+                "first_longitude": row.longitude,
+            }
+
+        bucket["points"] += 1
+        bucket["moving_points"] += row.position == "M - Moving Vehicle"
+        bucket["over_speed_points"] += row.is_over_speed == "YES"
+        bucket["speed_total"] += speed
+        bucket["max_speed"] = max(bucket["max_speed"], speed)
+        bucket["kms_end"] = row.kms
+        bucket["last_latitude"] = row.latitude
+        bucket["last_longitude"] = row.longitude
+
+    if not buckets:
+        return
+
+    timestamp = now()
+    user = frappe.session.user
+    fields = (
+        "vehicle", "reg_no", "bucket_start", "points", "moving_points", "over_speed_points",
+        "speed_total", "max_speed", "kms_start", "kms_end",
+        "first_latitude", "first_longitude", "last_latitude", "last_longitude",
+    )
+    columns = ("name", "owner", "modified_by", "creation", "modified", "docstatus", "bucket_minutes", "avg_speed") + fields
+
+    values = []
+    for bucket in buckets.values():
+        values.extend([frappe.generate_hash(length=10), user, user, timestamp, timestamp, 0, bucket_minutes])
+        values.append(flt(bucket["speed_total"] / bucket["points"], 2))
+        values.extend(bucket.get(field) for field in fields)
+
+    placeholders = ", ".join(["(" + ", ".join(["%s"] * len(columns)) + ")"] * len(buckets))
+
+    # Assignments run left to right, so avg_speed sees the merged totals
+    frappe.db.sql(
+        f"""
+        INSERT INTO `tabVehicle Tracking Rollup` ({", ".join(f"`{c}`" for c in columns)})
+        VALUES {placeholders}
+        ON DUPLICATE KEY UPDATE
+            `speed_total` = `speed_total` + VALUES(`speed_total`),
+            `points` = `points` + VALUES(`points`),
+            `moving_points` = `moving_points` + VALUES(`moving_points`),
+            `over_speed_points` = `over_speed_points` + VALUES(`over_speed_points`),
+            `avg_speed` = ROUND(`speed_total` / `points`, 2),
+            `max_speed` = GREATEST(`max_speed`, VALUES(`max_speed`)),
+            `kms_end` = VALUES(`kms_end`),
+            `last_latitude` = VALUES(`last_latitude`),
+            `last_longitude` = VALUES(`last_longitude`),
+            `modified` = VALUES(`modified`)
+        """,
+        values,
+    )
+
+
+def purge_rollups(cutoff, chunk_size):
+    while True:
+        names = frappe.db.sql_list(
+            """
+            SELECT name FROM `tabVehicle Tracking Rollup`
+            WHERE bucket_start < %s
+            LIMIT %s
+            """,
+            (cutoff, chunk_size),
+        )
+        if not names:
+            break
+        frappe.db.delete("Vehicle Tracking Rollup", {"name": ["in", names]})
+        frappe.db.commit()
+
+
+def floor_to_bucket(value, bucket_minutes):
+    value = get_datetime(value)
+    minutes = (value.hour * 60 + value.minute) // bucket_minutes * bucket_minutes
+    return datetime.combine(value.date(), datetime.min.time()) + timedelta(minutes=minutes)
+
+
+def get_archive_path(day):
+    day = getdate(day)
+    return frappe.get_site_path("private", ARCHIVE_DIR, str(day.year), f"{day.isoformat()}.ndjson.gz")
+
+
+def write_pending_archives(rows):
+    """
+    Write raw rows to one pending gzip file per day next to that day's
+    archive (the creation day for rows without an event time). Returns the
+    pending paths, for `finalize_pending_archives`.
+    """
+    by_day = {}
+    for row in rows:
+        by_day.setdefault(getdate(row.event_time or row.creation), []).append(row)
+
+    pending = []
+    for day, day_rows in by_day.items():
+        path = f"{get_archive_path(day)}.{frappe.generate_hash(length=8)}{PENDING_SUFFIX}"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(path, "wt", encoding="utf-8") as archive:
+            for row in day_rows:
+                archive.write(json.dumps(row, default=str, separators=(",", ":")))
+                archive.write("\n")
+        pending.append(path)
+    return pending
+
+
+def finalize_pending_archives(pending):
+    """
+    Append committed pending files to their day archives. Each pending file is
+    a complete gzip member, which readers see as part of one continuous stream.
+    """
+    for path in pending:
+        archive_path = path[:-len(PENDING_SUFFIX)].rsplit(".", 1)[0]
+        with open(path, "rb") as member, open(archive_path, "ab") as archive:
+            shutil.copyfileobj(member, archive)
+        os.remove(path)
+
+
+def recover_pending_archives():
+    """
+    Settle pending files left by an interrupted run: finalize those whose rows
+    were deleted (the chunk committed) and discard those whose rows are still
+    in the table (it rolled back and will be archived again).
+    """
+    for path in glob.glob(frappe.get_site_path("private", ARCHIVE_DIR, "*", f"*{PENDING_SUFFIX}")):
+        with gzip.open(path, "rt", encoding="utf-8") as archive:
+            names = [json.loads(line)["name"] for line in archive]
+
+        if names and frappe.db.count("Vehicle Tracking System", {"name": ["in", names]}):
+            os.remove(path)
+        else:
+            finalize_pending_archives([path])
+
+
+def iter_archived_rows(from_date, to_date, vehicle=None, vehicle_field="vehicle_name"):
+    """
+    Yield archived raw rows between two dates (inclusive), optionally for one
+    vehicle, one day file at a time. A row archived twice (a run interrupted
+    while finalizing) is yielded once.
+    """
+    day = getdate(from_date)
+    to_date = getdate(to_date)
+
+    while day <= to_date:
+        path = get_archive_path(day)
+        if os.path.exists(path):
+            seen = set()
+            with gzip.open(path, "rt", encoding="utf-8") as archive:
+                for line in archive:
+                    row = frappe._dict(json.loads(line))
+                    if vehicle and row.get(vehicle_field) != vehicle:
+                        continue
+                    if row.get("name") in seen:
+                        continue
+                    seen.add(row.get("name"))
+                    yield row
+        day = add_days(day, 1)
+
+
+def get_archived_rows(from_date, to_date, vehicle=None, vehicle_field="vehicle_name", fields=None):
+    """
+    Archived rows for [from_date, to_date]. Only purged points are archived, so
+    these never overlap what is still in `tabVehicle Tracking System`.
+    """
+    rows = iter_archived_rows(from_date, to_date, vehicle, vehicle_field)
+    if fields:
+        return [frappe._dict({field: row.get(field) for field in fields}) for row in rows]
+    return list(rows)
@@ -0,0 +1,206 @@
+import numpy as np
+
+import frappe
+from frappe.utils import add_days, cint, date_diff, flt, get_datetime, getdate, nowdate
+
+from tracker_erpgulf.tracker_erpgulf.retention import get_archived_rows
+from tracker_erpgulf.tracker_erpgulf.trips import _runs, _to_float
+from tracker_erpgulf.tracker_erpgulf.vehicle import get_day_bounds
+
+
+ROUTE_CACHE_PREFIX = "vehicle_route"
+TODAY_CACHE_TTL = 60  # today's track keeps growing
+PAST_CACHE_TTL = 24 * 60 * 60
+METERS_PER_DEGREE = 111320.0
+EQUATOR_METERS_PER_PIXEL = 156543.03392  # web mercator, zoom 0
+TOLERANCE_PIXELS = 2
+DEFAULT_MAX_POINTS = 500
+MAX_DAYS = 31
+
+
+def tolerance_for_zoom(zoom, latitude=0):
+    """Ground distance in meters covered by TOLERANCE_PIXELS at a map zoom level."""
+    meters_per_pixel = EQUATOR_METERS_PER_PIXEL * np.cos(np.radians(latitude)) / 2 ** flt(zoom)
+    return TOLERANCE_PIXELS * meters_per_pixel
+
+
+def to_local_meters(lat, lng):
+    """Project lat/lng onto a flat plane around the track; accurate enough at city scale."""
+    lat0 = np.radians(np.mean(lat))
+    x = (lng - np.mean(lng)) * METERS_PER_DEGREE * np.cos(lat0)
+    y = (lat - np.mean(lat)) * METERS_PER_DEGREE
+    return x, y
+
+
+def dp_importance(x, y):
+    """
+    Douglas-Peucker significance of every point.
+
+    A point is kept by Douglas-Peucker at tolerance `t` exactly when its
+    importance is greater than `t`, so one pass serves every tolerance and
+    point budget. Each point's importance is capped by its parent split, which
+    keeps the simplifications nested. Endpoints are infinite.
+    """
+    n = len(x)
+    importance = np.zeros(n)
+    if n == 0:
+        return importance
+    importance[0] = importance[-1] = np.inf
+
+    stack = [(0, n - 1, np.inf)]
+    while stack:
+        first, last, cap = stack.pop()
+        if last - first < 2:
+            continue
+
+        dx, dy = x[last] - x[first], y[last] - y[first]
+        px, py = x[first + 1:last] - x[first], y[first + 1:last] - y[first]
+        length = np.hypot(dx, dy)
+        if length:
+            distances = np.abs(px * dy - py * dx) / length
+        else:
+            distances = np.hypot(px, py)
+
+        offset = int(np.argmax(distances))
+        split = first + 1 + offset
+        value = min(float(distances[offset]), cap)
+        importance[split] = value
+
+        stack.append((first, split, value))
+        stack.append((split, last, value))
+
+    return importance
+
+
+def stop_mask(speed, moving_speed):
+    """The first and last point of every run of stationary points."""
+    stopped = speed < moving_speed
+    mask = np.zeros(len(speed), dtype=bool)
+    if not len(speed):
+        return mask
+
+    starts, ends = _runs(stopped)
+    stop_runs = stopped[starts]
+    mask[starts[stop_runs]] = True
+    mask[ends[stop_runs] - 1] = True
+    return mask
+
+
+def simplify_track(lat, lng, speed, tolerance=None, max_points=None, moving_speed=5.0):
+    """
+    Indices of the points to draw, in order.
+
+    With `tolerance` (meters) points within that distance of the simplified line
+    are dropped; with `max_points` the most significant points are kept up to
+    that budget. Stop boundaries are always kept, even beyond the budget.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lng = np.asarray(lng, dtype=np.float64)
+    speed = np.nan_to_num(np.asarray(speed, dtype=np.float64))
+    if len(lat) < 3:
+        return np.arange(len(lat))
+
+    importance = dp_importance(*to_local_meters(lat, lng))
+    keep = stop_mask(speed, moving_speed)
+
+    if max_points and len(lat) > max_points:
+        keep[np.argsort(-importance, kind="stable")[:max_points]] = True
+    elif max_points:
+        keep[:] = True
+    if tolerance is not None:
+        keep |= importance > tolerance
+
+    keep[0] = keep[-1] = True
+    return np.flatnonzero(keep)
+
+
+def load_day_points(vehicle, day):
+    """Time-ordered (event_time, lat, lng, speed) of one vehicle-day, live and archived."""
+    day_start, day_end = get_day_bounds(day)
+    tracking = frappe.qb.DocType("Vehicle Tracking System")
+
+    rows = (
+        frappe.qb.from_(tracking)
+        .select(tracking.event_time, tracking.latitude, tracking.longitude, tracking.speed)
+        .where(tracking.reg_no == vehicle)
+        .where(tracking.event_time[day_start:day_end])
+        .orderby(tracking.event_time)
+    ).run()
+
+    archived = [
+        (get_datetime(row.event_time), row.latitude, row.longitude, row.speed)
+        for row in get_archived_rows(day, day, vehicle=vehicle, vehicle_field="reg_no")
+    ]
+
+    times, coordinates = [], []
+    for event_time, lat, lng, speed in archived + list(rows):
+        lat, lng = _to_float(lat), _to_float(lng)
+        if not lat or not lng or np.isnan(lat) or np.isnan(lng):
+            continue
+        times.append(event_time)
+        coordinates.append((lat, lng, _to_float(speed)))
+
+    return times, np.array(coordinates, dtype=np.float64).reshape(-1, 3)
+
+
+def get_day_route(vehicle, day, zoom=None, max_points=None):
+    """Simplified track of one vehicle-day, cached per vehicle, day and tolerance."""
+    day = getdate(day)
+    if not zoom and not cint(max_points):
+        max_points = DEFAULT_MAX_POINTS
+    cache_key = f"{ROUTE_CACHE_PREFIX}:{vehicle}:{day}:{flt(zoom, 1) if zoom else ''}:{cint(max_points) or ''}"
+    route = frappe.cache().get_value(cache_key)
+    if route is not None:
+        return route
+
+    times, coordinates = load_day_points(vehicle, day)
+    lat, lng, speed = coordinates.T
+    speed = np.nan_to_num(speed)
+    moving_speed = flt(frappe.db.get_single_value("Vehicle Tracking Setting", "trip_moving_speed")) or 5
+
+    tolerance = tolerance_for_zoom(zoom, np.mean(lat)) if zoom and len(lat) else None
+    indices = simplify_track(lat, lng, speed, tolerance, cint(max_points) or None, moving_speed)
+    stops = stop_mask(speed, moving_speed)
+
+    route = {
+        "date": str(day),
+        "total_points": len(times),
+        "points": [
+            [round(float(lat[i]), 6), round(float(lng[i]), 6), times[i].strftime("%H:%M:%S"), int(speed[i])]
+            for i in indices
+        ],
+        "stops": [
+            [round(float(lat[i]), 6), round(float(lng[i]), 6), times[i].strftime("%H:%M:%S")]
+            for i in np.flatnonzero(stops)
+        ],
+    }
+
+    ttl = TODAY_CACHE_TTL if day >= getdate(nowdate()) else PAST_CACHE_TTL
+    frappe.cache().set_value(cache_key, route, expires_in_sec=ttl)
+    return route
+
+
+@frappe.whitelist()
+def get_route(vehicle, route_date, to_date=None, zoom=None, max_points=None):
+    """
+    Simplified route of a vehicle for a day or a date range, for map drawing.
+
+    Pass `zoom` to simplify to what is visible at that map zoom level, or
+    `max_points` to cap the number of points per day. Each point is
+    [lat, lng, "HH:MM:SS", speed]; stops are the start and end of every
+    stationary period.
+    """
+    frappe.has_permission("Vehicle Tracking System", throw=True)
+
+    to_date = getdate(to_date or route_date)
+    days = date_diff(to_date, route_date) + 1
+    if days < 1 or days > MAX_DAYS:
+        frappe.throw(f"Select a date range of 1 to {MAX_DAYS} days")
+
+    return {
+        "vehicle": vehicle,
+        "days": [
+            get_day_route(vehicle, add_days(route_date, offset), zoom, max_points)
+            for offset in range(days)
+        ],
+    }
@@ -1,26 +1,125 @@
 import frappe
-from datetime import datetime, timezone
+from frappe.utils import flt, now
+from frappe.utils.background_jobs import get_queue, get_queues_timeout
+from redis.exceptions import LockError
+
 from tracker_erpgulf.tracker_erpgulf.tracker import create_vehicle_tracking
+
+
+INGESTION_QUEUE = "vehicle_tracking"  # dedicated worker queue, see README
+FALLBACK_QUEUE = "long"
+INGESTION_JOB_ID = "vehicle_tracking_ingestion"
+LOCK_KEY = "vehicle_tracking_ingestion_lock"
+LOCK_LEASE = 10 * 60  # seconds; a crashed worker frees the lock after this
+TICK_KEY = "vehicle_tracking_next_tick"
+TICK_SLACK = 5  # seconds, so a one-minute frequency is not skipped by cron jitter
+STATUS_KEY = "vehicle_tracking_ingestion_status"
+COUNTERS = ("ticks", "enqueued", "coalesced", "lock_contention", "lease_lost", "runs")
+
+
 def scheduled_vehicle_tracking(force_run=False):
+    """
+    Cron tick: enqueue one ingestion run when the shortest configured frequency
+    (settings or any provider account) has elapsed.
+
+    The slot is claimed atomically with SET NX EX, so concurrent schedulers
+    cannot both pass. If a run is still queued or in progress the tick is
+    coalesced into it instead of queuing another one.
+    """
     try:
         settings = frappe.get_single("Vehicle Tracking Setting")
-        frequency_minutes = float(settings.frequency)
-
-        cache_key = "vehicle_tracking_last_run"
-        last_run_str = frappe.cache().get_value(cache_key)
-        now = datetime.now(timezone.utc)
+        frequencies = [flt(settings.frequency)] + [
+            flt(account.frequency) for account in settings.get("provider_accounts") or []
+            if account.enabled and flt(account.frequency)
+        ]
+        interval = max(int(min(frequencies) * 60) - TICK_SLACK, 1)
+        _incr("ticks")
 
-        last_run = None
-        if last_run_str:
-            try:
-                last_run = datetime.fromisoformat(last_run_str)
-            except Exception:
-                last_run = None
+        claimed = frappe.cache().set(_key(TICK_KEY), now(), ex=interval, nx=True)
+        if not claimed and not force_run:
+            return
 
-        if not last_run or (now - last_run).total_seconds() >= frequency_minutes * 60:
-            create_vehicle_tracking()
-            frappe.cache().set_value(cache_key, now.isoformat())
-       
+        job = frappe.enqueue(
+            "tracker_erpgulf.tracker_erpgulf.schedule.run_ingestion",
+            queue=get_ingestion_queue(),
+            timeout=LOCK_LEASE,
+            job_id=INGESTION_JOB_ID,
+            deduplicate=True,
+        )
+        _incr("enqueued" if job else "coalesced")
 
     except Exception as e:
-        frappe.log_error(f"Scheduler Exception: {str(e)}", "Vehicle Tracker Error")
\ No newline at end of file
+        frappe.log_error(f"Scheduler Exception: {str(e)}", "Vehicle Tracker Error")
+
+
+@frappe.whitelist()
+def trigger_vehicle_tracking():
+    """
+    Queue an ingestion run now, skipping the tick gate but sharing the
+    scheduler's job id and lock, so it never overlaps a running poll.
+    """
+    frappe.only_for("System Manager")
+    scheduled_vehicle_tracking(force_run=True)
+    return {"queued": True}
+
+
+def get_ingestion_queue():
+    """The dedicated queue when a worker is configured for it, else the long queue."""
+    return INGESTION_QUEUE if INGESTION_QUEUE in get_queues_timeout() else FALLBACK_QUEUE
+
+
+def run_ingestion():
+    """Background job: poll the provider while holding the ingestion lock."""
+    lock = frappe.cache().lock(_key(LOCK_KEY), timeout=LOCK_LEASE)
+    if not lock.acquire(blocking=False):
+        _incr("lock_contention")
+        return
+
+    started = now()
+    try:
+        _incr("runs")
+        result = dict(create_vehicle_tracking() or {})
+        if isinstance(result.get("inserted_records"), list):
+            result["inserted_records"] = len(result["inserted_records"])
+        _set_status(last_started=started, last_finished=now(), last_result=result)
+    finally:
+        try:
+            lock.release()
+        except LockError:
+            # The run outlived its lease and another worker may have taken over
+            _incr("lease_lost")
+
+
+@frappe.whitelist()
+def get_ingestion_status():
+    """Queue depth, lock state and counters of the ingestion worker."""
+    frappe.only_for("System Manager")
+
+    queue_name = get_ingestion_queue()
+    queue = get_queue(queue_name)
+    cache = frappe.cache()
+
+    return {
+        "queue": queue_name,
+        "queue_depth": queue.count,
+        "running": queue.started_job_registry.count,
+        "lock_held": bool(cache.exists(_key(LOCK_KEY))),
+        "lock_ttl": cache.ttl(_key(LOCK_KEY)),
+        "next_tick_in": cache.ttl(_key(TICK_KEY)),
+        "counters": {name: int(cache.get(_key(f"{STATUS_KEY}:{name}")) or 0) for name in COUNTERS},
+        **(cache.get_value(STATUS_KEY) or {}),
+    }
+
+
+def _key(name):
+    return frappe.cache().make_key(name)
+
+
+def _incr(counter):
+    frappe.cache().incr(_key(f"{STATUS_KEY}:{counter}"))
+
+
+def _set_status(**values):
+    status = frappe.cache().get_value(STATUS_KEY) or {}
+    status.update(values)
+    frappe.cache().set_value(STATUS_KEY, status)
@@ -0,0 +1,151 @@
+import codecs
+import json
+from itertools import islice
+
+
+class ProviderPayloadError(Exception):
+    """
+    Raised when the provider body is not a JSON list of vehicle entries.
+    `kind` is one of "empty", "invalid_json" or "unexpected".
+    """
+
+    def __init__(self, kind, message, data=None):
+        super().__init__(message)
+        self.kind = kind
+        self.data = data
+
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+class _Buffer:
+    """Text window over a stream of byte chunks, trimmed as items are consumed."""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def fill(self):
+        """Append the next chunk; return False once the stream is exhausted."""
+        if self.exhausted:
+            return False
+        for chunk in self.chunks:
+            if not chunk:
+                continue
+            if self.pos > 65536:
+                self.text = self.text[self.pos:]
+                self.pos = 0
+            self.text += self.utf8.decode(chunk) if isinstance(chunk, bytes) else chunk
+            return True
+        self.text += self.utf8.decode(b"", final=True)
+        self.exhausted = True
+        return False
+
+    def skip(self, chars=_WHITESPACE):
+        """Advance past `chars`; return the next significant character or None at EOF."""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in chars:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return None
+
+    def rest(self):
+        while self.fill():
+            pass
+        return self.text[self.pos:]
+
+
+def iter_vehicle_entries(chunks):
+    """
+    Parse a Vamosys JSON array incrementally from an iterable of byte chunks.
+
+    The opening of the body is validated eagerly, so an empty body or a non-list
+    payload raises `ProviderPayloadError` before anything is written. Entries are
+    then yielded one at a time while only the current window of text is kept in
+    memory; malformed JSON further down raises during iteration.
+    """
+    buffer = _Buffer(chunks)
+    first = buffer.skip()
+
+    if first is None:
+        raise ProviderPayloadError("empty", "Empty response from Vamosys API")
+
+    if first != "[":
+        text = buffer.rest()
+        try:
+            data = json.loads(text)
+        except ValueError:
+            raise ProviderPayloadError("invalid_json", f"Invalid JSON: {text}")
+        raise ProviderPayloadError(
+            "unexpected", f"Unexpected response type: {type(data)} - {data}", data=data
+        )
+
+    buffer.pos += 1
+    return _iter_items(buffer)
+
+
+def _iter_items(buffer):
+    expect_item = True
+    first_item = True
+
+    while True:
+        char = buffer.skip()
+
+        if char is None:
+            raise ProviderPayloadError("invalid_json", "Invalid JSON: body ended inside the vehicle list")
+
+        if char == "]":
+            if expect_item and not first_item:
+                raise ProviderPayloadError("invalid_json", "Invalid JSON: trailing ',' in the vehicle list")
+            buffer.pos += 1
+            if buffer.skip() is not None:
+                raise ProviderPayloadError(
+                    "invalid_json", f"Invalid JSON: trailing data {buffer.rest()[:200]}"
+                )
+            return
+
+        if char == ",":
+            if expect_item:
+                raise ProviderPayloadError("invalid_json", "Invalid JSON: unexpected ','")
+            buffer.pos += 1
+            expect_item = True
+            continue
+
+        if not expect_item:
+            raise ProviderPayloadError(
+                "invalid_json", f"Invalid JSON: expected ',' near {buffer.text[buffer.pos:buffer.pos + 200]}"
+            )
+
+        item, end = _decode_item(buffer)
+        buffer.pos = end
+        expect_item = first_item = False
+        yield item
+
+
+def _decode_item(buffer):
+    # An item only counts as complete once a following character is buffered,
+    # otherwise a number split across two chunks would be decoded short.
+    while True:
+        try:
+            item, end = _decoder.raw_decode(buffer.text, buffer.pos)
+            if end < len(buffer.text) or buffer.exhausted:
+                return item, end
+        except json.JSONDecodeError as e:
+            if buffer.exhausted:
+                raise ProviderPayloadError(
+                    "invalid_json", f"Invalid JSON: {e.msg} near {buffer.text[buffer.pos:buffer.pos + 200]}"
+                )
+        buffer.fill()
+
+
+def batched(iterable, size):
+    """Yield lists of up to `size` items from `iterable`."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
@@ -0,0 +1,113 @@
+"""
+Per-poll telemetry: stage timings, counts and payload size of one ingestion
+run, saved as a `Vehicle Tracking Poll Log`.
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import time
+from contextlib import contextmanager, nullcontext
+
+import frappe
+from frappe.utils import cint, now
+
+
+STAGES = ("fetch", "parse", "normalize", "resolve", "write")
+POLL_STATUSES = {"success": "Success", "skipped": "Skipped"}
+PROFILE_LINES = 40
+
+
+class PollTelemetry:
+    """
+    Collects timings while a poll runs. Timers are exclusive: time spent in a
+    timer nested inside another (normalization inside the write of the rows it
+    feeds, for example) is only counted for the inner stage.
+
+    Fetch and parse happen per account in parallel threads, so the slowest
+    account is recorded; the other stages run in the writer and are summed.
+    Writer time outside the named stages is not attributed to any of them.
+    """
+
+    def __init__(self, enabled=True, profile=False):
+        self.enabled = enabled
+        self.timings = dict.fromkeys(STAGES, 0.0)
+        self.payload_bytes = 0
+        self.provider_status = {}
+        self.poll_time = now()
+        self.started = time.perf_counter()
+        self._nested = []
+        self.profiler = None
+        if enabled and profile:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(enabled=bool(settings.enable_poll_log), profile=bool(settings.profile_polls))
+
+    @contextmanager
+    def timer(self, stage):
+        started = time.perf_counter()
+        self._nested.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.timings[stage] += elapsed - self._nested.pop()
+            if self._nested:
+                self._nested[-1] += elapsed
+
+    def add_fetch_stats(self, stats):
+        """The stats of a fetch thread's "done" message."""
+        for stage in ("fetch", "parse"):
+            self.timings[stage] = max(self.timings[stage], stats.get(stage, 0.0))
+        self.payload_bytes += stats.get("bytes", 0)
+
+    def save(self, result):
+        """Insert the poll log for `result` (the poll's return value). Never raises."""
+        profile = self._stop_profiler()
+        if not self.enabled:
+            return
+
+        try:
+            accounts = result.get("accounts") or {}
+            inserted = result.get("inserted_records")
+            frappe.get_doc({
+                "doctype": "Vehicle Tracking Poll Log",
+                "poll_time": self.poll_time,
+                "status": POLL_STATUSES.get(result.get("status"), "Error"),
+                "duration": time.perf_counter() - self.started,
+                "accounts": len(accounts) or len(self.provider_status),
+                "provider_status": self.format_provider_status(),
+                "payload_bytes": self.payload_bytes,
+                "received": result.get("received", 0),
+                "inserted": len(inserted) if isinstance(inserted, list) else cint(result.get("inserted")),
+                "skipped": result.get("skipped", 0),
+                "failed": result.get("failed", 0),
+                **{f"{stage}_time": seconds for stage, seconds in self.timings.items()},
+                "message": result.get("error") or result.get("message"),
+                "account_results": json.dumps(accounts, indent=1, default=str) if accounts else None,
+                "profile": profile,
+            }).insert(ignore_permissions=True)
+        except Exception:
+            frappe.log_error(message=frappe.get_traceback(), title="Vehicle Tracking Poll Log Failed")
+
+    def format_provider_status(self):
+        if len(self.provider_status) == 1:
+            return str(next(iter(self.provider_status.values())))
+        return ", ".join(f"{account}: {status}" for account, status in self.provider_status.items())
+
+    def _stop_profiler(self):
+        if self.profiler is None:
+            return None
+        self.profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_LINES)
+        self.profiler = None
+        return out.getvalue()
+
+
+def untimed(stage):
+    return nullcontext()
@@ -0,0 +1,55 @@
+# Copyright (c) 2025, ERPGulf and Contributors
+# See license.txt
+
+from datetime import date
+
+from frappe.tests.utils import FrappeTestCase
+
+from tracker_erpgulf.tracker_erpgulf.daily_summary import fold_points
+
+MOVING, STOPPED, PARKED = "M - Moving Vehicle", "S - Stopped Vehicle", "P - Parked Vehicle"
+
+
+def point(time, position=PARKED, kms=100, speed=0, ac="OFF", over_speed="NO", working_ms=0):
+	return {
+		"event_time": time, "position": position, "kms": kms, "speed": speed, "ac": ac,
+		"is_over_speed": over_speed, "today_workinghours": working_ms,
+	}
+
+
+class TestDailySummary(FrappeTestCase):
+	def test_intervals_are_attributed_to_the_previous_state(self):
+		totals = fold_points([
+			point("2025-10-17 10:00:00", MOVING, kms=100, speed=40, ac="ON"),
+			point("2025-10-17 10:01:00", MOVING, kms=101.5, speed=110, over_speed="YES", working_ms=3_600_000),
+			point("2025-10-17 10:02:00", STOPPED, kms=102),
+			point("2025-10-17 10:04:00", PARKED, kms=102),
+		])[date(2025, 10, 17)]
+
+		self.assertEqual(totals["points"], 4)
+		self.assertEqual(totals["moving_time"], 120)
+		self.assertEqual(totals["idle_time"], 120)
+		self.assertEqual(totals["parked_time"], 0)
+		self.assertEqual(totals["ac_on_time"], 60)
+		self.assertAlmostEqual(totals["distance"], 2)
+		self.assertEqual(totals["max_speed"], 110)
+		self.assertEqual(totals["over_speed_count"], 1)
+		self.assertEqual(totals["working_hours"], 1)
+
+	def test_continues_from_previous_point_across_midnight(self):
+		previous = point("2025-10-16 23:58:00", MOVING, kms=100)
+		totals = fold_points([point("2025-10-17 00:01:00", MOVING, kms=103)], previous)
+
+		self.assertEqual(list(totals), [date(2025, 10, 17)])
+		self.assertEqual(totals[date(2025, 10, 17)]["moving_time"], 60)
+		self.assertEqual(totals[date(2025, 10, 17)]["distance"], 3)
+
+	def test_long_gaps_and_stale_points_close_no_interval(self):
+		totals = fold_points([
+			point("2025-10-17 08:00:00", MOVING),
+			point("2025-10-17 10:00:00", MOVING),
+			point("2025-10-17 09:59:00", MOVING),
+		])[date(2025, 10, 17)]
+
+		self.assertEqual(totals["points"], 3)
+		self.assertEqual(totals["moving_time"], 0)
@@ -0,0 +1,38 @@
+# Copyright (c) 2025, ERPGulf and Contributors
+# See license.txt
+
+import csv
+import json
+import os
+import tempfile
+
+from frappe.tests.utils import FrappeTestCase
+
+from tracker_erpgulf.tracker_erpgulf.export import EXPORT_FIELDS, write_rows
+
+
+class TestExport(FrappeTestCase):
+	def setUp(self):
+		self.rows = [
+			{"name": "a1", "vehicle_name": "QA-1", "event_time": "2025-10-17 10:00:00", "speed": 40},
+			{"name": "a2", "vehicle_name": "QA-1", "event_time": "2025-10-17 10:01:00", "speed": 0, "extra": 1},
+		]
+		handle, self.path = tempfile.mkstemp()
+		os.close(handle)
+
+	def tearDown(self):
+		os.remove(self.path)
+
+	def test_csv(self):
+		self.assertEqual(write_rows(iter(self.rows), self.path, "CSV"), 2)
+
+		with open(self.path, newline="") as f:
+			reader = csv.DictReader(f)
+			self.assertEqual(tuple(reader.fieldnames), EXPORT_FIELDS)
+			self.assertEqual([row["speed"] for row in reader], ["40", "0"])
+
+	def test_ndjson(self):
+		self.assertEqual(write_rows(iter(self.rows), self.path, "NDJSON"), 2)
+
+		with open(self.path) as f:
+			self.assertEqual([json.loads(line)["name"] for line in f], ["a1", "a2"])
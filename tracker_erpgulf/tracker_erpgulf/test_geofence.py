@@ -0,0 +1,44 @@
+# Copyright (c) 2025, ERPGulf and Contributors
+# See license.txt
+
+from frappe.tests.utils import FrappeTestCase
+
+from tracker_erpgulf.tracker_erpgulf.geofence import GeofenceIndex, circle_bbox, point_in_polygon
+
+SQUARE = [(25.0, 51.0), (25.0, 51.1), (25.1, 51.1), (25.1, 51.0)]
+
+
+def polygon(name, vertices):
+	lats = [lat for lat, lng in vertices]
+	lngs = [lng for lat, lng in vertices]
+	return {"name": name, "type": "Polygon", "bbox": (min(lats), min(lngs), max(lats), max(lngs)), "shape": vertices}
+
+
+def circle(name, lat, lng, radius):
+	return {"name": name, "type": "Circle", "bbox": circle_bbox(lat, lng, radius), "shape": (lat, lng, radius)}
+
+
+class TestGeofence(FrappeTestCase):
+	def test_point_in_polygon(self):
+		self.assertTrue(point_in_polygon(25.05, 51.05, SQUARE))
+		self.assertFalse(point_in_polygon(25.15, 51.05, SQUARE))
+
+	def test_concave_polygon(self):
+		# U shape open to the north
+		u_shape = [(25.0, 51.0), (25.0, 51.3), (25.3, 51.3), (25.3, 51.2), (25.1, 51.2), (25.1, 51.1), (25.3, 51.1), (25.3, 51.0)]
+		self.assertTrue(point_in_polygon(25.2, 51.05, u_shape))
+		self.assertFalse(point_in_polygon(25.2, 51.15, u_shape))
+
+	def test_index_lookup(self):
+		index = GeofenceIndex([
+			polygon("Yard", SQUARE),
+			circle("Depot", 25.3, 51.5, 500),
+			polygon("Country", [(24.0, 50.0), (24.0, 52.0), (26.5, 52.0), (26.5, 50.0)]),
+		])
+
+		self.assertEqual(index.lookup(25.05, 51.05), {"Yard", "Country"})
+		self.assertEqual(index.lookup(25.301, 51.501), {"Depot", "Country"})
+		self.assertEqual(index.lookup(25.31, 51.51), {"Country"})
+		self.assertEqual(index.lookup(30.0, 51.0), set())
+		# The country-sized fence is kept out of the grid
+		self.assertEqual(len(index.large), 1)
@@ -0,0 +1,49 @@
+# Copyright (c) 2025, ERPGulf and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from tracker_erpgulf.benchmarks.synthetic import SyntheticFleet
+from tracker_erpgulf.tracker_erpgulf.ingest import TRACKING_DOCTYPE, insert_tracking_rows
+from tracker_erpgulf.tracker_erpgulf.normalizer import compile_normalizer
+
+PREFIX = "_Test Ingest"
+
+
+class TestIngest(FrappeTestCase):
+	def tearDown(self):
+		frappe.db.delete(TRACKING_DOCTYPE, {"vehicle_name": ["like", f"{PREFIX}%"]})
+		frappe.db.delete("Vehicle Live State", {"vehicle": ["like", f"{PREFIX}%"]})
+		frappe.db.delete("Vehicle Daily Summary", {"vehicle": ["like", f"{PREFIX}%"]})
+		frappe.db.commit()
+
+	def test_bulk_path_writes_a_chunk_without_falling_back(self):
+		normalize = compile_normalizer("Asia/Qatar")
+		rows = [normalize(entry, entry["vehicleId"]) for entry in SyntheticFleet(3, prefix=PREFIX).snapshot()]
+		# vehicle_type and nearest_location are normalized but are not columns
+		self.assertIn("vehicle_type", rows[0])
+		errors = frappe.db.count("Error Log")
+
+		with patch("tracker_erpgulf.tracker_erpgulf.ingest._insert_one_by_one") as fallback:
+			result = insert_tracking_rows(rows)
+
+		fallback.assert_not_called()
+		self.assertEqual(result["failed"], 0)
+		self.assertEqual(len(result["inserted"]), 3)
+		self.assertEqual(frappe.db.count(TRACKING_DOCTYPE, {"name": ["in", result["inserted"]]}), 3)
+		self.assertEqual(frappe.db.count("Error Log"), errors)
+
+	def test_numeric_placeholders_do_not_fail_the_chunk(self):
+		normalize = compile_normalizer("Asia/Qatar")
+		rows = [normalize(entry, entry["vehicleId"]) for entry in SyntheticFleet(2, prefix=PREFIX).snapshot()]
+		for row in rows:
+			row.update(speed="", kms="-", latitude="")
+
+		with patch("tracker_erpgulf.tracker_erpgulf.ingest._insert_one_by_one") as fallback:
+			result = insert_tracking_rows(rows)
+
+		fallback.assert_not_called()
+		self.assertEqual(frappe.db.get_value(TRACKING_DOCTYPE, result["inserted"][0], "speed"), 0)
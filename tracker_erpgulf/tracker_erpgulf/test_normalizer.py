@@ -0,0 +1,78 @@
+# Copyright (c) 2025, ERPGulf and Contributors
+# See license.txt
+
+import json
+
+from frappe.tests.utils import FrappeTestCase
+
+from tracker_erpgulf.tracker_erpgulf.normalizer import FIELD_SPEC, compile_normalizer
+
+
+class TestNormalizer(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.normalize = staticmethod(compile_normalizer("Asia/Qatar"))
+
+	def test_every_spec_field_is_returned(self):
+		row = self.normalize({"vehicleId": "QA-1"}, "QA-1")
+		self.assertEqual(list(row), [field.target for field in FIELD_SPEC])
+
+	def test_conversions(self):
+		row = self.normalize(
+			{
+				"vehicleId": "QA-1",
+				"position": "m",
+				"ac": "true",
+				"isOverSpeed": "Y",
+				"live": "Yes",
+				"expired": True,
+				"cameraEnabled": 1,
+				"lastSeen": "17-10-2025 10:11:12",
+				"date": 1760000000000,
+				"onboardDate": "01-02-2024",
+				"lat": 25.1,
+				"lng": 51.2,
+				"forwardOrBackward": "F",
+				"gpsSignal": 4,
+			},
+			"Truck 1",
+		)
+
+		self.assertEqual(row["vehicle_name"], "Truck 1")
+		self.assertEqual(row["position"], "M - Moving Vehicle")
+		self.assertEqual(row["ac"], "ON")
+		self.assertEqual(row["is_over_speed"], "YES")
+		self.assertEqual(row["live"], "YES")
+		self.assertEqual(row["expired"], "YES")
+		self.assertEqual(row["camera_enabled"], "ON")
+		self.assertEqual(row["last_comm"], "2025-10-17 10:11:12")
+		self.assertEqual(row["event_time"], "2025-10-09 11:53:20")
+		self.assertEqual(row["onboard_date"], "2024-02-01")
+		self.assertEqual(row["gmap"], "https://www.google.com/maps?q=25.1,51.2")
+		self.assertEqual(row["direction"], "F")
+		self.assertEqual(json.loads(row["more_details"]), {"gpsSignal": 4})
+
+	def test_bad_values_do_not_raise(self):
+		row = self.normalize(
+			{"vehicleId": "QA-1", "lastSeen": "garbage", "onboardDate": "2024/02/01", "ac": [1], "live": None},
+			"QA-1",
+		)
+
+		self.assertIsNone(row["last_comm"])
+		self.assertIsNone(row["event_time"])
+		self.assertIsNone(row["onboard_date"])
+		self.assertEqual(row["ac"], "OFF")
+		self.assertEqual(row["live"], "NO")
+		self.assertEqual(row["position"], "P - Parked Vehicle")
+		self.assertEqual(row["error"], "-")
+
+	def test_location_is_interned_by_address(self):
+		first = self.normalize({"vehicleId": "QA-1", "address": "Salwa Road, Doha"}, "QA-1")
+		second = self.normalize({"vehicleId": "QA-2", "address": "Salwa Road, Doha"}, "QA-2")
+		empty = self.normalize({"vehicleId": "QA-3", "address": ""}, "QA-3")
+
+		self.assertEqual(first["nearest_location"], "Salwa Road, Doha")
+		self.assertEqual(len(first["location"]), 16)
+		self.assertEqual(first["location"], second["location"])
+		self.assertIsNone(empty["location"])
@@ -0,0 +1,78 @@
+# Copyright (c) 2025, ERPGulf and Contributors
+# See license.txt
+
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from tracker_erpgulf.tracker_erpgulf.poller import fetch_concurrently
+from tracker_erpgulf.tracker_erpgulf.provider import ProviderClient
+from tracker_erpgulf.tracker_erpgulf.stream import ProviderPayloadError
+from tracker_erpgulf.tracker_erpgulf.test_provider import StubProvider
+
+
+class TestPoller(FrappeTestCase):
+	def setUp(self):
+		self.servers = []
+
+	def tearDown(self):
+		for server in self.servers:
+			server.shutdown()
+			server.server_close()
+
+	def account(self, name, responses):
+		server = ThreadingHTTPServer(("127.0.0.1", 0), StubProvider)
+		server.responses = responses
+		server.hits = 0
+		server.gzipped = False
+		threading.Thread(target=server.serve_forever, daemon=True).start()
+		self.servers.append(server)
+
+		url = f"http://127.0.0.1:{server.server_address[1]}/vehicles"
+		client = ProviderClient(url, retries=0, backoff=0, name=frappe.generate_hash(length=8))
+		return name, client, {}
+
+	def test_accounts_are_fetched_concurrently(self):
+		payload = json.dumps([{"vehicleId": f"QA-{i}"} for i in range(5)]).encode()
+		jobs = [self.account(f"account-{i}", [(200, payload, 0.5)]) for i in range(3)]
+
+		started = time.monotonic()
+		messages = list(fetch_concurrently(jobs, batch_size=2, max_workers=3))
+		elapsed = time.monotonic() - started
+
+		self.assertLess(elapsed, 1.2)
+		for account, _client, _params in jobs:
+			batches = [m[2] for m in messages if m[0] == account and m[1] == "batch"]
+			self.assertEqual(sum(len(batch) for batch in batches), 5)
+			done = [m[2] for m in messages if m[0] == account and m[1] == "done"]
+			self.assertEqual(len(done), 1)
+			self.assertEqual(done[0]["bytes"], len(payload))
+
+	def test_errors_are_reported_per_account(self):
+		jobs = [
+			self.account("good", [(200, b'[{"vehicleId": "QA-1"}]', 0)]),
+			self.account("bad_json", [(200, b"{not json", 0)]),
+			self.account("down", [(500, b"boom", 0)]),
+		]
+
+		messages = list(fetch_concurrently(jobs, batch_size=10))
+		by_account = {}
+		for account, kind, payload in messages:
+			by_account.setdefault(account, []).append((kind, payload))
+
+		self.assertIn(("batch", [{"vehicleId": "QA-1"}]), by_account["good"])
+		errors = [payload for kind, payload in by_account["bad_json"] if kind == "error"]
+		self.assertIsInstance(errors[0], ProviderPayloadError)
+		self.assertIn(("response", (500, "boom")), by_account["down"])
+
+	def test_consumer_can_stop_early(self):
+		payload = json.dumps([{"vehicleId": f"QA-{i}"} for i in range(100)]).encode()
+		jobs = [self.account("big", [(200, payload, 0)])]
+
+		for account, kind, _payload in fetch_concurrently(jobs, batch_size=1):
+			if kind == "batch":
+				break
@@ -0,0 +1,91 @@
+# Copyright (c) 2025, ERPGulf and Contributors
+# See license.txt
+
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import frappe
+import requests
+from frappe.tests.utils import FrappeTestCase
+
+from tracker_erpgulf.tracker_erpgulf.provider import CircuitOpenError, ProviderClient
+
+
+class StubProvider(BaseHTTPRequestHandler):
+	"""Replays `server.responses` in order: (status, body, delay) tuples."""
+
+	def do_GET(self):
+		self.server.hits += 1
+		status, body, delay = self.server.responses.pop(0) if self.server.responses else (200, b"[]", 0)
+		time.sleep(delay)
+
+		if "gzip" in self.headers.get("Accept-Encoding", ""):
+			body = gzip.compress(body)
+			self.server.gzipped = True
+
+		self.send_response(status)
+		self.send_header("Content-Type", "application/json")
+		self.send_header("Content-Length", str(len(body)))
+		if self.server.gzipped:
+			self.send_header("Content-Encoding", "gzip")
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, *args):
+		pass
+
+
+class TestProviderClient(FrappeTestCase):
+	def setUp(self):
+		self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubProvider)
+		self.server.responses = []
+		self.server.hits = 0
+		self.server.gzipped = False
+		threading.Thread(target=self.server.serve_forever, daemon=True).start()
+		self.url = f"http://127.0.0.1:{self.server.server_address[1]}/vehicles"
+		self.breaker_name = frappe.generate_hash(length=8)
+
+	def tearDown(self):
+		self.server.shutdown()
+		self.server.server_close()
+
+	def client(self, **kwargs):
+		kwargs.setdefault("backoff", 0)
+		return ProviderClient(self.url, name=self.breaker_name, **kwargs)
+
+	def test_gzip_body_is_decoded(self):
+		payload = [{"vehicleId": "QA-1"}]
+		self.server.responses = [(200, json.dumps(payload).encode(), 0)]
+
+		response = self.client().fetch({})
+
+		self.assertTrue(self.server.gzipped)
+		self.assertEqual(response.json(), payload)
+
+	def test_retries_server_errors(self):
+		self.server.responses = [(503, b"", 0), (502, b"", 0), (200, b"[]", 0)]
+
+		response = self.client(retries=3).fetch({})
+
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(self.server.hits, 3)
+
+	def test_read_timeout(self):
+		self.server.responses = [(200, b"[]", 1)] * 2
+
+		with self.assertRaises(requests.RequestException):
+			self.client(read_timeout=0.2, retries=1).fetch({})
+
+	def test_breaker_opens_after_threshold(self):
+		self.server.responses = [(500, b"", 0)] * 4
+		client = self.client(retries=1, breaker_threshold=2)
+
+		client.fetch({})
+		client.fetch({})
+		with self.assertRaises(CircuitOpenError):
+			client.fetch({})
+
+		self.assertEqual(self.server.hits, 4)
@@ -0,0 +1,45 @@
+# Copyright (c) 2025, ERPGulf and Contributors
+# See license.txt
+
+import os
+import shutil
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from tracker_erpgulf.tracker_erpgulf.retention import (
+	finalize_pending_archives,
+	get_archive_path,
+	iter_archived_rows,
+	write_pending_archives,
+)
+
+DAY = "2001-01-01"
+
+
+class TestRetentionArchive(FrappeTestCase):
+	def tearDown(self):
+		if os.path.exists(get_archive_path(DAY)):
+			os.remove(get_archive_path(DAY))
+
+	def rows(self):
+		return [
+			frappe._dict(name=f"_test{i}", vehicle_name="_Test Vehicle", event_time=f"{DAY} 10:0{i}:00")
+			for i in range(3)
+		]
+
+	def test_rows_reach_the_archive_only_when_finalized(self):
+		pending = write_pending_archives(self.rows())
+		self.assertEqual(list(iter_archived_rows(DAY, DAY)), [])
+
+		finalize_pending_archives(pending)
+		self.assertEqual([row.name for row in iter_archived_rows(DAY, DAY)], ["_test0", "_test1", "_test2"])
+		self.assertFalse(any(os.path.exists(path) for path in pending))
+
+	def test_rows_archived_twice_are_read_once(self):
+		pending = write_pending_archives(self.rows())
+		copy = pending[0].replace(".pending", "x.pending")
+		shutil.copy(pending[0], copy)
+		finalize_pending_archives(pending + [copy])
+
+		self.assertEqual(len(list(iter_archived_rows(DAY, DAY))), 3)
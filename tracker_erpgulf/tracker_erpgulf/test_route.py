@@ -0,0 +1,41 @@
+# Copyright (c) 2025, ERPGulf and Contributors
+# See license.txt
+
+import numpy as np
+from frappe.tests.utils import FrappeTestCase
+
+from tracker_erpgulf.tracker_erpgulf.route import dp_importance, simplify_track, tolerance_for_zoom
+
+
+class TestRoute(FrappeTestCase):
+	def test_straight_line_collapses_to_endpoints(self):
+		lat = np.linspace(25.0, 25.1, 100)
+		lng = np.linspace(51.0, 51.1, 100)
+		speed = np.full(100, 40)
+
+		self.assertEqual(list(simplify_track(lat, lng, speed, tolerance=1)), [0, 99])
+
+	def test_importance_is_nested(self):
+		rng = np.random.default_rng(7)
+		x, y = np.cumsum(rng.normal(size=(2, 500)), axis=1)
+		importance = dp_importance(x, y)
+
+		coarse = set(np.flatnonzero(importance > 5))
+		fine = set(np.flatnonzero(importance > 1))
+		self.assertTrue(coarse <= fine)
+
+	def test_point_budget_keeps_stops(self):
+		rng = np.random.default_rng(7)
+		lat = 25.0 + np.cumsum(rng.normal(0, 1e-4, 1000))
+		lng = 51.0 + np.cumsum(rng.normal(0, 1e-4, 1000))
+		speed = np.full(1000, 40)
+		speed[400:450] = 0
+
+		indices = simplify_track(lat, lng, speed, max_points=50)
+
+		self.assertIn(400, indices)
+		self.assertIn(449, indices)
+		self.assertLessEqual(len(indices), 52)
+
+	def test_tolerance_shrinks_with_zoom(self):
+		self.assertGreater(tolerance_for_zoom(10, 25), tolerance_for_zoom(16, 25))
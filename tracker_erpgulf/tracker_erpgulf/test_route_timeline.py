@@ -0,0 +1,107 @@
+# Copyright (c) 2025, ERPGulf and Contributors
+# See license.txt
+
+from itertools import count
+from unittest.mock import Mock, patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, nowdate
+
+from tracker_erpgulf.tracker_erpgulf import vehicle as timelines
+from tracker_erpgulf.tracker_erpgulf.ingest import TRACKING_DOCTYPE, after_write
+from tracker_erpgulf.tracker_erpgulf.locations import intern_locations
+from tracker_erpgulf.tracker_erpgulf.normalizer import location_id
+
+TODAY = nowdate()
+PAST = str(add_days(TODAY, -3))
+EMPTY = str(add_days(TODAY, -2))
+A, B = "_TEST-TL-A", "_TEST-TL-B"
+
+
+def add_points(reg_no, day, addresses):
+	rows = [
+		{
+			"reg_no": reg_no, "event_time": f"{day} 10:{minute:02d}:00",
+			"location": location_id(address), "nearest_location": address,
+		}
+		for minute, address in enumerate(addresses)
+	]
+	for row in rows:
+		frappe.get_doc({"doctype": TRACKING_DOCTYPE, **row}).insert(ignore_permissions=True, ignore_links=True)
+	intern_locations(rows)
+	return rows
+
+
+def locations(timeline):
+	return [point["location"] for point in timeline]
+
+
+class TestRouteTimeline(FrappeTestCase):
+	def setUp(self):
+		self.clear_cache()
+		add_points(A, PAST, ["Doha", "Doha", "Lusail", "Lusail", "Doha"])
+		add_points(A, TODAY, ["Doha", "Wakra"])
+		add_points(B, PAST, ["Wakra", "Wakra"])
+
+	def tearDown(self):
+		frappe.db.rollback()
+		frappe.db.delete(TRACKING_DOCTYPE, {"reg_no": ["like", "_TEST-TL-%"]})
+		frappe.db.commit()
+		self.clear_cache()
+
+	def clear_cache(self):
+		keys = [(vehicle, day) for vehicle in (A, B) for day in (PAST, EMPTY, TODAY)]
+		timelines.forget_timelines(keys)
+
+	def test_fetch_timelines_collapses_repeats_per_vehicle_day(self):
+		fetched = timelines.fetch_timelines([A, B], PAST, TODAY)
+
+		self.assertEqual(locations(fetched[A][PAST]), ["Doha", "Lusail", "Doha"])
+		self.assertEqual([point["time"] for point in fetched[A][PAST]], ["10:00:00", "10:02:00", "10:04:00"])
+		# Every day starts its own run, even when it continues the previous location
+		self.assertEqual(locations(fetched[A][TODAY]), ["Doha", "Wakra"])
+		self.assertEqual(locations(fetched[B][PAST]), ["Wakra"])
+		self.assertNotIn(EMPTY, fetched[A])
+
+	def test_past_days_are_served_from_the_cache(self):
+		first = timelines.get_route_timelines([A, B], PAST, TODAY)
+		self.assertEqual(sorted(first[A]), sorted([PAST, EMPTY, str(add_days(TODAY, -1)), TODAY]))
+
+		with patch.object(timelines, "fetch_timelines", wraps=timelines.fetch_timelines) as fetch:
+			second = timelines.get_route_timelines([A, B], PAST, TODAY)
+
+		self.assertEqual(second, first)
+		# Only days that are empty or not yet settled are read again
+		_, from_date, to_date = fetch.call_args.args
+		self.assertGreater(str(from_date), PAST)
+		self.assertEqual(str(to_date), TODAY)
+
+	def test_empty_past_days_are_not_cached(self):
+		timelines.get_route_timelines([A], EMPTY, EMPTY)
+		self.assertEqual(timelines.get_cached_timelines([(A, EMPTY)]), {})
+
+		add_points(A, EMPTY, ["Late"])
+		self.assertEqual(locations(timelines.get_route_timelines([A], EMPTY, EMPTY)[A][EMPTY]), ["Late"])
+
+	def test_late_points_invalidate_a_cached_day(self):
+		timelines.get_route_timelines([A], PAST, PAST)
+		self.assertIn((A, PAST), timelines.get_cached_timelines([(A, PAST)]))
+
+		after_write(add_points(A, PAST, ["Mesaieed"]))
+		frappe.db.commit()
+
+		self.assertEqual(timelines.get_cached_timelines([(A, PAST)]), {})
+		self.assertEqual(locations(timelines.get_route_timelines([A], PAST, PAST)[A][PAST])[-1], "Mesaieed")
+
+	def test_least_recently_used_days_are_evicted(self):
+		clock = count(1)
+		with patch.object(timelines, "MAX_CACHED_TIMELINES", 2), patch.object(timelines, "time", Mock(time=lambda: next(clock))):
+			timelines.cache_timelines({(A, PAST): [{"location": "Doha"}]})
+			timelines.cache_timelines({(B, PAST): [{"location": "Wakra"}]})
+			# Reading A makes B the least recently used
+			timelines.get_cached_timelines([(A, PAST)])
+			timelines.cache_timelines({(A, EMPTY): [{"location": "Lusail"}]})
+
+		cached = timelines.get_cached_timelines([(A, PAST), (B, PAST), (A, EMPTY)])
+		self.assertEqual(sorted(cached), [(A, EMPTY), (A, PAST)])
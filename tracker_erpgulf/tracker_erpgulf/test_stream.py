@@ -0,0 +1,78 @@
+# Copyright (c) 2025, ERPGulf and Contributors
+# See license.txt
+
+import json
+
+from frappe.tests.utils import FrappeTestCase
+
+from tracker_erpgulf.tracker_erpgulf.stream import ProviderPayloadError, batched, iter_vehicle_entries
+
+PAYLOAD = (
+	'[{"vehicleId": "QA-1", "address": "Al Sadd, \\"Doha\\" \\\\ Qatar ]", "odoDistance": 1234567},'
+	' {"vehicleId": "QA-2", "address": "Lusail \\u00e9 الدوحة", "lat": -25.125},'
+	' {"vehicleId": "QA-3", "sensor": [{"mode": "ON"}], "speed": 0}]'
+).encode("utf-8")
+
+
+def chunked(data, size):
+	return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestStream(FrappeTestCase):
+	def assertPayloadError(self, kind, chunks):
+		with self.assertRaises(ProviderPayloadError) as raised:
+			list(iter_vehicle_entries(chunks))
+		self.assertEqual(raised.exception.kind, kind)
+		return raised.exception
+
+	def test_any_chunk_boundary_parses_the_same(self):
+		# Every split point, including inside strings, escapes, numbers and multi-byte characters
+		expected = json.loads(PAYLOAD)
+		for size in range(1, 24):
+			self.assertEqual(list(iter_vehicle_entries(chunked(PAYLOAD, size))), expected, size)
+		for split in range(1, len(PAYLOAD)):
+			self.assertEqual(list(iter_vehicle_entries([PAYLOAD[:split], PAYLOAD[split:]])), expected, split)
+
+	def test_whitespace_around_items_is_ignored(self):
+		chunks = [b" \n\t[ ", b'{"vehicleId": "QA-1"}\r\n ,', b'\n{"vehicleId": "QA-2"} ', b"]\n  "]
+		self.assertEqual([entry["vehicleId"] for entry in iter_vehicle_entries(chunks)], ["QA-1", "QA-2"])
+		self.assertEqual(list(iter_vehicle_entries([b"[", b" ]"])), [])
+
+	def test_trailing_comma_is_invalid(self):
+		self.assertPayloadError("invalid_json", [b'[{"vehicleId": "QA-1"}, ', b"]"])
+		self.assertPayloadError("invalid_json", [b'[{"vehicleId": "QA-1"},, {"vehicleId": "QA-2"}]'])
+
+	def test_empty_body(self):
+		for chunks in ([], [b""], [b"", b"  \n\t"]):
+			with self.assertRaises(ProviderPayloadError) as raised:
+				iter_vehicle_entries(chunks)
+			self.assertEqual(raised.exception.kind, "empty")
+
+	def test_top_level_non_list_is_unexpected(self):
+		with self.assertRaises(ProviderPayloadError) as raised:
+			iter_vehicle_entries([b'{"error": ', b'"invalid token"}'])
+		self.assertEqual(raised.exception.kind, "unexpected")
+		self.assertEqual(raised.exception.data, {"error": "invalid token"})
+
+	def test_invalid_opening_is_raised_before_iteration(self):
+		with self.assertRaises(ProviderPayloadError) as raised:
+			iter_vehicle_entries([b"<html>Bad Gateway</html>"])
+		self.assertEqual(raised.exception.kind, "invalid_json")
+
+	def test_truncated_or_malformed_json(self):
+		self.assertPayloadError("invalid_json", chunked(PAYLOAD[:-20], 7))
+		self.assertPayloadError("invalid_json", [b'[{"vehicleId": "QA-1"}'])
+		self.assertPayloadError("invalid_json", [b'[{"vehicleId": "QA-1", "address": "Doh'])
+		self.assertPayloadError("invalid_json", [b"[{vehicleId: 1}]"])
+		self.assertPayloadError("invalid_json", [b'[{"vehicleId": "QA-1"} {"vehicleId": "QA-2"}]'])
+		self.assertPayloadError("invalid_json", [b'[{"vehicleId": "QA-1"}] trailing'])
+
+	def test_entries_before_an_error_are_yielded(self):
+		entries = iter_vehicle_entries([b'[{"vehicleId": "QA-1"}, {"vehicleId": '])
+		self.assertEqual(next(entries), {"vehicleId": "QA-1"})
+		with self.assertRaises(ProviderPayloadError):
+			next(entries)
+
+	def test_batched(self):
+		self.assertEqual(list(batched(range(5), 2)), [[0, 1], [2, 3], [4]])
+		self.assertEqual(list(batched([], 2)), [])
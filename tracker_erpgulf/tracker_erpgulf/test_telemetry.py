@@ -0,0 +1,32 @@
+# Copyright (c) 2025, ERPGulf and Contributors
+# See license.txt
+
+import time
+
+from frappe.tests.utils import FrappeTestCase
+
+from tracker_erpgulf.tracker_erpgulf.telemetry import PollTelemetry
+
+
+class TestPollTelemetry(FrappeTestCase):
+	def test_nested_timers_are_exclusive(self):
+		telemetry = PollTelemetry(enabled=False)
+
+		with telemetry.timer("write"):
+			time.sleep(0.02)
+			with telemetry.timer("normalize"):
+				time.sleep(0.05)
+
+		self.assertGreaterEqual(telemetry.timings["normalize"], 0.05)
+		self.assertGreaterEqual(telemetry.timings["write"], 0.02)
+		self.assertLess(telemetry.timings["write"], 0.045)
+
+	def test_fetch_stats_keep_the_slowest_account(self):
+		telemetry = PollTelemetry(enabled=False)
+
+		telemetry.add_fetch_stats({"fetch": 0.3, "parse": 1.0, "bytes": 100})
+		telemetry.add_fetch_stats({"fetch": 0.5, "parse": 0.2, "bytes": 50})
+
+		self.assertEqual(telemetry.timings["fetch"], 0.5)
+		self.assertEqual(telemetry.timings["parse"], 1.0)
+		self.assertEqual(telemetry.payload_bytes, 150)
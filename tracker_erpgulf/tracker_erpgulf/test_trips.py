@@ -0,0 +1,40 @@
+# Copyright (c) 2025, ERPGulf and Contributors
+# See license.txt
+
+from frappe.tests.utils import FrappeTestCase
+
+from tracker_erpgulf.tracker_erpgulf.trips import segment_points
+
+
+def track(speeds, step=60):
+	times = [i * step for i in range(len(speeds))]
+	lat = [25.0 + i * 0.001 * (speed > 0) for i, speed in enumerate(speeds)]
+	lng = [51.0] * len(speeds)
+	return times, lat, lng, speeds
+
+
+class TestTrips(FrappeTestCase):
+	def test_empty_track(self):
+		self.assertEqual(segment_points([], [], [], []), [])
+
+	def test_trip_between_stops(self):
+		segments = segment_points(*track([0] * 10 + [40] * 10 + [0] * 10))
+
+		self.assertEqual([s["segment_type"] for s in segments], ["Stop", "Trip", "Stop"])
+		self.assertEqual([s["points"] for s in segments], [10, 10, 10])
+		# Segments meet end to start
+		self.assertEqual(segments[0]["end"], segments[1]["start"])
+		self.assertEqual(segments[1]["end"], segments[2]["start"])
+		self.assertEqual(segments[1]["max_speed"], 40)
+
+	def test_short_stop_is_folded_into_trip(self):
+		segments = segment_points(*track([40] * 5 + [0] * 2 + [40] * 5), min_stop_seconds=300)
+
+		self.assertEqual(len(segments), 1)
+		self.assertEqual(segments[0]["segment_type"], "Trip")
+		self.assertEqual(segments[0]["points"], 12)
+
+	def test_long_stop_splits_trips(self):
+		segments = segment_points(*track([40] * 5 + [0] * 10 + [40] * 5), min_stop_seconds=300)
+
+		self.assertEqual([s["segment_type"] for s in segments], ["Trip", "Stop", "Trip"])
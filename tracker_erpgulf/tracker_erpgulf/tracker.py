@@ -1,278 +1,245 @@
 import frappe
-import requests
-import json
-from datetime import datetime
-from frappe.utils.data import get_datetime
-from datetime import datetime, timezone
+import time
+from functools import partial
+from frappe.utils import cint, flt, now
+from frappe.utils.data import get_system_timezone
+from tracker_erpgulf.tracker_erpgulf.doctype.vehicle_device_profile.vehicle_device_profile import sync_device_profiles
+from tracker_erpgulf.tracker_erpgulf.fingerprint import filter_changed
+from tracker_erpgulf.tracker_erpgulf.fleet import resolve_vehicles
+from tracker_erpgulf.tracker_erpgulf.ingest import insert_tracking_rows, insert_tracking_rows_per_row
+from tracker_erpgulf.tracker_erpgulf.normalizer import compile_normalizer
+from tracker_erpgulf.tracker_erpgulf.poller import fetch_concurrently
+from tracker_erpgulf.tracker_erpgulf.provider import CircuitOpenError, ProviderClient
+from tracker_erpgulf.tracker_erpgulf.stream import ProviderPayloadError, batched
+from tracker_erpgulf.tracker_erpgulf.telemetry import PollTelemetry, untimed
+from tracker_erpgulf.tracker_erpgulf.vehicle_tracking_dashboard import clear_dashboard_cache, publish_dashboard_delta
 
 
+ACCOUNT_SLACK = 30  # seconds of scheduling latency tolerated per account frequency
+
+_normalizers = {}
+
 
-@frappe.whitelist(allow_guest=True)
 def create_vehicle_tracking():
     """
     Fetch data from Vamosys API and insert/update Vehicle Tracking System docs.
     Position must be P, M, or S. AC is mapped from boolean to On/Off.
+
+    Every due provider account is fetched and parsed concurrently; their rows
+    are written here, by a single writer, as batches arrive. Totals are
+    returned along with a result per account, and recorded with stage timings
+    in a Vehicle Tracking Poll Log.
+
+    Runs the whole poll in the caller, so it is not whitelisted: polls go
+    through `schedule.run_ingestion`, which holds the ingestion lock, and
+    `schedule.trigger_vehicle_tracking` requests one on demand.
     """
+    telemetry = None
     try:
         settings = frappe.get_single("Vehicle Tracking Setting")
-        base_url = settings.base_url          
-        username = settings.username          
-        fcode = settings.get_password("fcode")            
-        # password = settings.get_password("password")  # New
-
-        # # ❌ Block API call if no password
-        # if not password:
-        #     frappe.log_error("Password missing in Vehicle Tracking Setting", "VT Password Validation Error")
-        #     return {"status": "error", "message": "Please set the password in Vehicle Tracking Setting"}
-        url = base_url
-        params = {
-            "providerName": username,
-            "fcode": fcode
-        }
-
-
-        # Position mapping: use P, M, S codes
-        position_map = {
-            "P": "P - Parked Vehicle",
-            "M": "M - Moving Vehicle",
-            "S": "S - Stopped Vehicle"
-        }
-
-        try:
-            response = requests.get(url, params=params)
-        except Exception as e:
-            frappe.log_error(message=str(e), title="Vehicle Tracking API Request Failed")
-            return {"status": "error", "message": "API request failed", "error": str(e)}
-
-        if response.status_code != 200:
-            frappe.log_error(
-                message=f"Status {response.status_code}: {response.text}",
-                title="Vehicle Tracking API Error"
-            )
-            return {"status": "error", "message": f"Failed API request. Status: {response.status_code}"}
-
-        # Safely parse JSON
-        try:
-            if not response.text.strip():
-                frappe.log_error("Empty response from Vamosys API", "Vehicle Tracking API Empty Response")
-                return {"status": "error", "message": "Empty API response"}
-            data = response.json()
-        except requests.exceptions.JSONDecodeError:
-            frappe.log_error(
-                message=f"Invalid JSON: {response.text}",
-                title="Vehicle Tracking API JSON Decode Error"
-            )
-            return {"status": "error", "message": "Invalid JSON response", "response": response.text}
-
-        if not isinstance(data, list):
-            frappe.log_error(
-                message=f"Unexpected response type: {type(data)} - {data}",
-                title="Vehicle Tracking API Unexpected Response"
-            )
-            return {"status": "error", "message": "Unexpected response format from API"}
-
-        created = []
-
-        for entry in data:
-            # Vehicle identifier
-            vehicle_input = entry.get("vehicleId")
-            if not vehicle_input:
+        telemetry = PollTelemetry.from_settings(settings)
+
+        mode = settings.ingestion_mode or "Bulk"
+        chunk_size = cint(settings.bulk_chunk_size) or 500
+        heartbeat = cint(settings.heartbeat_interval) if settings.skip_unchanged else None
+        insert = insert_tracking_rows_per_row if mode == "Per Row" else partial(insert_tracking_rows, chunk_size=chunk_size)
+
+        started = time.monotonic()
+        poll_started = now()
+        results = {}
+        clients = {}
+        jobs = []
+
+        for account in get_provider_accounts(settings):
+            client = ProviderClient.from_settings(settings, base_url=account.base_url, name=account.name)
+            try:
+                client.breaker.check()
+            except CircuitOpenError as e:
+                results[account.name] = {"status": "skipped", "message": str(e)}
                 continue
 
-            # Check if Vehicle exists
-            vehicle_docs = frappe.get_all("Vehicle", filters={"license_plate": vehicle_input}, limit=1)
-            if vehicle_docs:
-                vehicle_name = vehicle_docs[0].name
-            else:
-                # Create new Vehicle
-                vehicle_doc = frappe.get_doc({
-                    "doctype": "Vehicle",
-                    "vehicle_name": entry.get("vehicleId") or vehicle_input,
-                    "license_plate": vehicle_input,
-                    "make": entry.get("vehicleMake") or "Unknown",
-                    "model": entry.get("vehicleModel") or "Unknown" ,
-                    "last_odometer": entry.get("odoDistance") ,
-                    "uom": "Meter"  # Make sure this UOM exists in your system
-                }).insert(ignore_permissions=True)
-                frappe.db.commit()
-                vehicle_name = vehicle_doc.name
-
-            # Map position code
-            position_code = (entry.get("position") or entry.get("color") or "").upper()
-            position_full = position_map.get(position_code, "P - Parked Vehicle")  # Default to Parked
-
-            # Parse last_seen
-            last_seen_raw = entry.get("lastSeen")
-            last_seen_str = None
-            if last_seen_raw:
-                try:
-                    last_seen_dt = datetime.strptime(last_seen_raw, "%d-%m-%Y %H:%M:%S")
-                except:
-                    last_seen_dt = datetime.fromtimestamp(int(last_seen_raw)/1000, tz=timezone.utc)
-                last_seen_str = last_seen_dt.strftime("%Y-%m-%d %H:%M:%S")
-            # Map AC boolean to On/Off
-            ac_value =  "ON" if entry.get("ac") in [True, "true", "True", 1, "1"] else "OFF"
-            last_comm_ms = entry.get("lastComunicationTime")  
-            last_comm_dt = datetime.fromtimestamp(last_comm_ms / 1000, tz=timezone.utc) 
-            last_comm_str = last_comm_dt.strftime("%Y-%m-%d %H:%M:%S")
-            timestamp_ms = entry.get("date")
-            date_str = None
-            if timestamp_ms:
-                dt = datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)  # Convert ms → seconds
-                date_str = dt.strftime("%Y-%m-%d %H:%M:%S")
-
-
-            over_speed_value = "YES" if entry.get("isOverSpeed") in ["Y", "YES", "y", "yes"] else "NO"
-            vehicle_busy_value = "YES" if entry.get("vehicleBusy") in ["Y", "YES", "y", "yes"] else "NO"
-
-            camera_value = "ON" if entry.get("cameraEnabled") else "OFF"
-            live_status = "YES" if entry.get("live", "").lower() == "yes" else "NO"
-            
-
-            def seconds_to_hms(seconds):
-                hours = seconds // 3600
-                minutes = (seconds % 3600) // 60
-                secs = seconds % 60
-                return f"{hours:02d}:{minutes:02d}:{secs:02d}"
-
-            parked_time_sec = entry.get("parkedTime", 0)
-            moving_time_sec = entry.get("movingTime", 0)
-            idle_time_sec = entry.get("idleTime", 0)
-            date_sec=entry.get("dateSec",0)
-            expired_value = "YES" if str(entry.get("expired")).lower() in ["yes", "y", "true", "1"] else "NO"
-            onboard_raw = entry.get("onboardDate")
-            onboard_date = None
-            if onboard_raw:
-                    onboard_dt = datetime.strptime(onboard_raw, "%d-%m-%Y")
-                    onboard_date = onboard_dt.strftime("%Y-%m-%d")
-
-            used_keys = [
-                "vehicleId", "regNo", "driverName", "communicatingPortNo", "safetyParking", 
-                "driverMobile", "timeZone", "odoDistance", "lat", "lng", "deviceModel",
-                "vehicleTypeLabel", "expiryDate", "forwardOrBackward", "expiryDays",
-                "error", "distanceCovered", "chassisNumber", "speed", "routeName", 
-                "altitude", "tankSize", "deviceVolt", "gpsSimNo", "fuelLitre", 
-                "todayWorkingHours", "fuelLitres", "temperature", "vehicleType", 
-                "overSpeedLimit", "ignitionStatus", "status", "oprName", "alert", 
-                "fuelSensorType", "deviceId", "tripName", "shortName", "licenceType", 
-                "direction", "vehicleModel", "engineStatus", "calibrateMode", "vehicleMode",
-                "address", "rigMode", "orgId", "color", "sensorBasedVehicleMode",
-                "ac", "vehicleBusy", "live", "position", "expired", "parkedTime",
-                "movingTime", "idleTime", "dateSec", "lastSeen", "lastComunicationTime", 
-                "onboardDate","rowId","latitude", "longitude","date","isOverSpeed","insideGeoFence",
-                "powerStatus","deviceStatus","tankSize","cameraEnabled","fcode","vehicleName","expiryStatus",
-                "madeIn"
-                
-            ]
-
-            # Only include keys from entry that are NOT used in the doc
-            more_details = {k: v for k, v in entry.items() if k not in used_keys}
-            more_details_json = json.dumps(more_details, indent=2)
-            expiry_status_value = "YES" if str(entry.get("expiryStatus", "")).lower() in ["yes", "y", "true", "1"] else "NO"
-
-
-            expiry_raw = entry.get("expiryDate")
-            expiry_date = None
-
-            if expiry_raw:
-                    expiry_dt = datetime.strptime(expiry_raw, "%d-%m-%Y")
-                    expiry_date = expiry_dt.strftime("%Y-%m-%d")
-            lat = entry.get('lat')
-            lng = entry.get('lng')
-
-            if lat and lng:
-                google_map_url = f"https://www.google.com/maps?q={lat},{lng}"
-                
-                # Create Vehicle T  racking System document
-            doc = frappe.get_doc({
-                "doctype": "Vehicle Tracking System",
-                # "date":date_str,
-                "date":entry.get("date"),
-                "vehicle": vehicle_name,
-                "vehicle_name": vehicle_name,
-                "onboard_date":onboard_date,
-                "reg_no": entry.get("regNo"),
-                "last_seen": entry.get("lastComunicationTime"),
-                "last_comm": last_seen_str,
-                "driver": entry.get("driverName"),
-                "communicating_port_no":entry.get("communicatingPortNo"),
-                "safety_parking":entry.get("safetyParking"),
-                "driver_mobile": entry.get("driverMobile"),
-                "time_zone":entry.get("timeZone"),
-                "kms": entry.get("odoDistance"),
-                "live" :live_status,
-                "latitude": entry.get("lat") or entry.get("latitude"),
-                "longitude": entry.get("lng") or entry.get("longitude"),
-                "device_model": entry.get("deviceModel"),
-                "vehicle_type_label":entry.get("vehicleTypeLabel"),
-                "vehilce_type":entry.get("vehicleTypeLabel"),
-                "expiry_date": expiry_date,
-                "parked_time":entry.get("parkedTime"),
-                "expired":expired_value,
-                "moving_time": entry.get("movingTime"),
-                "forward_or_backward":entry.get("forwardOrBackward"),
-                "expiry_days":entry.get("expiryDays"),
-                "idle_time": entry.get("idleTime"),
-                # "date_sec":seconds_to_hms(date_sec),
-                "date_sec":entry.get("dateSec"),
-                "error":entry.get("error") or "-",
-                "distance_covered":entry.get("distanceCovered"),
-                "chassis_number": entry.get("chassisNumber"),
-                "speed": entry.get("speed"),
-                "route_name":entry.get("routeName"),
-                "altitude":entry.get("altitude")or "-",
-                "expirystatus":expiry_status_value,
-                "device_status":entry.get("deviceStatus"),
-                "tank_size":entry.get("tankSize"),
-                "made_in":entry.get("madeIn"),
-                "device_volt":entry.get("deviceVolt"),
-                "position": position_full,
-                "gps_sim_no":entry.get("gpsSimNo"),
-                "fuel_litre":entry.get("fuelLitre"),
-                "camera_enabled":camera_value,
-                # "duration": entry.get("todayWorkingHours"),
-                "veh_battery": entry.get("powerStatus"),
-                "insidegeofence":entry.get("insideGeoFence"),
-                # "sensor_based_vehicle_mode":entry.get("sensorBasedVehicleMode"),
-                "ac": ac_value,
-                "vehicle_busy":vehicle_busy_value,
-                "today_workinghours":entry.get("todayWorkingHours"),
-                "fuel_ltrs": entry.get("fuelLitres") or entry.get("fuelLitre"),
-                "celsius": entry.get("temperature"),
-                "vehicle_type": entry.get("vehicleType"),
-                "over_speed_limit": entry.get("overSpeedLimit"),
-                "ignition_status": entry.get("ignitionStatus"),
-                "status": entry.get("status"),
-                "oprname":entry.get("oprName"),
-                "alert": entry.get("alert"),
-                "fuel_sensor_type": entry.get("fuelSensorType"),
-                "device_id": entry.get("deviceId"),
-                "trip_name": entry.get("tripName"),
-                "short_name":entry.get("shortName"),
-                "licence_type": entry.get("licenceType"),
-                "direction": entry.get("direction") or entry.get("forwardOrBackward"),
-                "vehicle_model": entry.get("vehicleModel"),
-                "engine_status": entry.get("engineStatus"),
-                "is_over_speed":over_speed_value ,
-                "calibrate_mode": entry.get("calibrateMode"),
-                "vehicle_mode": entry.get("vehicleMode"),
-                "nearest_location": entry.get("address"),
-                "gmap": google_map_url,
-                "fcode":entry.get("fcode"),
-                "rig_mode":entry.get("rigMode"),
-                "org_id":entry.get("orgId"),
-                "color":entry.get("color"),
-                "more_details":more_details_json
-            })
-            doc.sensor_based_vehicle_mode = json.dumps(entry.get("sensorBasedVehicleMode", []))
-            doc.insert(ignore_permissions=True)
-            frappe.db.commit()
-            created.append(doc.name)
-
-        return {"status": "success", "inserted_records": created}
+            clients[account.name] = client
+            results[account.name] = {
+                "status": "success", "inserted": 0, "failed": 0, "received": 0, "skipped": 0,
+                "started": time.monotonic(),
+            }
+            jobs.append((account.name, client, account.params))
+
+        # Parsing happens in the fetch threads; entries flow through normalization
+        # and the writer in batches, so memory stays flat regardless of fleet size.
+        inserted = []
+        for account, kind, payload in fetch_concurrently(jobs, chunk_size, cint(settings.max_parallel_accounts) or 4):
+            result = results[account]
+
+            if kind == "batch":
+                written = insert(
+                    iter_tracking_rows(payload, chunk_size, heartbeat=heartbeat, stats=result, telemetry=telemetry),
+                    telemetry=telemetry,
+                )
+                inserted.extend(written["inserted"])
+                result["inserted"] += len(written["inserted"])
+                result["failed"] += written["failed"]
+            elif kind == "response":
+                status_code, body = payload
+                clients[account].record(status_code)
+                telemetry.provider_status[account] = status_code
+                if status_code != 200:
+                    frappe.log_error(
+                        message=f"Account {account}\nStatus {status_code}: {body}",
+                        title="Vehicle Tracking API Error"
+                    )
+                    result.update({"status": "error", "message": f"Failed API request. Status: {status_code}"})
+            elif kind == "error":
+                telemetry.provider_status.setdefault(account, type(payload).__name__)
+                result.update(handle_fetch_error(account, payload, clients[account]))
+            elif kind == "done":
+                result["duration"] = round(time.monotonic() - result.pop("started"), 3)
+                telemetry.add_fetch_stats(payload)
+
+        clear_dashboard_cache()
+        if inserted:
+            publish_dashboard_delta(poll_started)
+        summary = summarize_results(results, inserted, time.monotonic() - started)
+        telemetry.save(summary)
+        return summary
 
 
     except Exception as e:
         
         frappe.log_error(message=str(e), title="Vehicle Tracking Critical Error")
-        return {"status": "error", "message": "Critical error in tracking process", "error": str(e)}
\ No newline at end of file
+        failure = {"status": "error", "message": "Critical error in tracking process", "error": str(e)}
+        if telemetry is not None:
+            telemetry.save(failure)
+        return failure
+
+
+def get_provider_accounts(settings):
+    """
+    Enabled rows of the Provider Accounts table, or the single account configured
+    on the settings themselves when the table is empty. Accounts with their own
+    frequency are only returned when that much time has passed since their last poll.
+    """
+    accounts = []
+
+    for row in settings.get("provider_accounts") or []:
+        if not row.enabled:
+            continue
+        if flt(row.frequency) and not claim_account_slot(row.account_name, flt(row.frequency)):
+            continue
+        accounts.append(frappe._dict(
+            name=row.account_name,
+            base_url=row.base_url,
+            params={"providerName": row.username, "fcode": row.get_password("fcode", raise_exception=False)},
+        ))
+
+    if not accounts and not settings.get("provider_accounts"):
+        accounts.append(frappe._dict(
+            name="default",
+            base_url=settings.base_url,
+            params={"providerName": settings.username, "fcode": settings.get_password("fcode")},
+        ))
+
+    return accounts
+
+
+def claim_account_slot(account_name, frequency_minutes):
+    interval = max(int(frequency_minutes * 60) - ACCOUNT_SLACK, 1)
+    key = frappe.cache().make_key(f"vehicle_tracking_account_tick:{account_name}")
+    return bool(frappe.cache().set(key, now(), ex=interval, nx=True))
+
+
+def handle_fetch_error(account, error, client):
+    if isinstance(error, ProviderPayloadError):
+        return handle_payload_error(error)
+
+    client.breaker.record_failure()
+    frappe.log_error(message=f"Account {account}\n{error}", title="Vehicle Tracking API Request Failed")
+    return {"status": "error", "message": "API request failed", "error": str(error)}
+
+
+def summarize_results(results, inserted, duration):
+    """
+    Totals over all accounts, shaped like the single-account result. With a
+    single account that failed, its own error is returned as before. A poll
+    where no account was due, or every account was skipped, is "skipped".
+    """
+    if len(results) == 1:
+        only = next(iter(results.values()))
+        if only["status"] != "success":
+            return only
+
+    total = len(inserted) + sum(r.get("failed", 0) for r in results.values())
+    succeeded = any(r["status"] == "success" for r in results.values())
+    skipped = all(r["status"] == "skipped" for r in results.values())
+
+    return {
+        "status": "success" if succeeded else "skipped" if skipped else "error",
+        "inserted_records": inserted,
+        "failed": sum(r.get("failed", 0) for r in results.values()),
+        "received": sum(r.get("received", 0) for r in results.values()),
+        "skipped": sum(r.get("skipped", 0) for r in results.values()),
+        "duration": round(duration, 3),
+        "rows_per_sec": round(total / duration, 1) if duration else total,
+        "accounts": results,
+    }
+
+
+def handle_payload_error(error):
+    """
+    Log a malformed provider body under the same titles the non-streaming parser used.
+    """
+    if error.kind == "empty":
+        frappe.log_error("Empty response from Vamosys API", "Vehicle Tracking API Empty Response")
+        return {"status": "error", "message": "Empty API response"}
+
+    if error.kind == "unexpected":
+        frappe.log_error(message=str(error), title="Vehicle Tracking API Unexpected Response")
+        return {"status": "error", "message": "Unexpected response format from API"}
+
+    frappe.log_error(message=str(error), title="Vehicle Tracking API JSON Decode Error")
+    return {"status": "error", "message": "Invalid JSON response", "response": str(error)}
+
+
+def iter_tracking_rows(entries, batch_size, heartbeat=None, stats=None, telemetry=None):
+    """
+    Turn a stream of provider entries into tracking rows, resolving Vehicles one
+    batch at a time so the fleet index is consulted once per batch.
+    Static vehicle attributes are moved to Vehicle Device Profile. With a
+    `heartbeat` (minutes), rows identical to the vehicle's previous snapshot
+    are dropped until the heartbeat interval has passed.
+    """
+    stats = stats if stats is not None else {}
+    timer = telemetry.timer if telemetry is not None else untimed
+    normalize = get_normalizer()
+    entries = (entry for entry in entries if isinstance(entry, dict) and entry.get("vehicleId"))
+
+    for batch in batched(entries, batch_size):
+        with timer("resolve"):
+            vehicle_index = resolve_vehicles(batch)
+        with timer("normalize"):
+            rows = [normalize(entry, vehicle_index[entry.get("vehicleId")]) for entry in batch]
+        with timer("write"):
+            sync_device_profiles(rows)
+        stats["received"] = stats.get("received", 0) + len(rows)
+
+        if heartbeat is not None:
+            rows, skipped = filter_changed(rows, heartbeat)
+            stats["skipped"] = stats.get("skipped", 0) + skipped
+
+        yield from rows
+
+
+def get_normalizer():
+    """The compiled entry normalizer for the system time zone, built once per process."""
+    tz = get_system_timezone()
+    normalizer = _normalizers.get(tz)
+    if normalizer is None:
+        normalizer = _normalizers[tz] = compile_normalizer(tz)
+    return normalizer
+
+
+def build_tracking_row(entry, vehicle_name):
+    """
+    Normalize one Vamosys entry into a `Vehicle Tracking System` field dict.
+    """
+    return get_normalizer()(entry, vehicle_name)
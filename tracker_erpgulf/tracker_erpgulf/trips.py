@@ -0,0 +1,239 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import frappe
+from frappe.utils import add_days, cint, flt, get_datetime, now, now_datetime
+
+
+EARTH_RADIUS_KM = 6371.0088
+EPOCH = datetime(1970, 1, 1)  # naive: event times stay in the system time zone throughout
+TRIP_JOB_ID = "vehicle_trip_segmentation"
+VEHICLES_PER_QUERY = 50
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance in km; works element-wise on NumPy arrays."""
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def _runs(flags):
+    """Start (inclusive) and end (exclusive) indices of runs of equal values."""
+    change = np.flatnonzero(flags[1:] != flags[:-1]) + 1
+    starts = np.concatenate(([0], change))
+    ends = np.concatenate((change, [len(flags)]))
+    return starts, ends
+
+
+def segment_points(times, lat, lng, speed, moving_speed=5.0, min_stop_seconds=300):
+    """
+    Split one vehicle's time-ordered points into alternating trips and stops.
+
+    `times` are epoch seconds; `lat`, `lng` and `speed` (km/h) are parallel
+    arrays. A point is moving when its speed is at least `moving_speed`; stops
+    shorter than `min_stop_seconds` between two moving runs are folded into the
+    surrounding trip. Each segment spans from its first point to the first point
+    of the next segment, so durations and distances add up without gaps.
+    Returns a list of dicts.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    lng = np.asarray(lng, dtype=np.float64)
+    speed = np.nan_to_num(np.asarray(speed, dtype=np.float64))
+    n = len(times)
+    if n == 0:
+        return []
+
+    step_km = haversine_km(lat[:-1], lng[:-1], lat[1:], lng[1:]) if n > 1 else np.empty(0)
+    cum_km = np.concatenate(([0.0], np.cumsum(np.nan_to_num(step_km))))
+
+    moving = speed >= moving_speed
+    starts, ends = _runs(moving)
+
+    # Fold short stops that sit between two trips into one trip
+    run_moving = moving[starts]
+    run_seconds = times[np.minimum(ends, n - 1)] - times[starts]
+    interior = (starts > 0) & (ends < n)
+    short_stop = ~run_moving & interior & (run_seconds < min_stop_seconds)
+    if short_stop.any():
+        moving = np.repeat(run_moving | short_stop, ends - starts)
+        starts, ends = _runs(moving)
+
+    last = np.minimum(ends, n - 1)
+    counts = ends - starts
+
+    return [
+        {
+            "segment_type": "Trip" if is_moving else "Stop",
+            "start": float(times[s]),
+            "end": float(times[e]),
+            "duration": float(times[e] - times[s]),
+            "distance_km": round(float(cum_km[e] - cum_km[s]), 3),
+            "max_speed": float(max_speed),
+            "avg_speed": round(float(avg_speed), 2),
+            "points": int(count),
+            "start_latitude": float(lat[s]),
+            "start_longitude": float(lng[s]),
+            "end_latitude": float(lat[e]),
+            "end_longitude": float(lng[e]),
+        }
+        for s, e, count, is_moving, max_speed, avg_speed in zip(
+            starts,
+            last,
+            counts,
+            moving[starts],
+            np.maximum.reduceat(speed, starts),
+            np.add.reduceat(speed, starts) / counts,
+        )
+    ]
+
+
+def load_points(from_times, to_time):
+    """
+    Read the points of several vehicles in one query, each from its own
+    {vehicle: from_time} up to `to_time`, and return
+    {vehicle: (times, lat, lng, speed)} NumPy arrays, dropping points without
+    a usable position. Every vehicle is its own index range, so one vehicle
+    with an old open segment does not widen the window of the others.
+    """
+    ranges = " OR ".join(["(vehicle_name = %s AND event_time >= %s)"] * len(from_times))
+    values = [value for vehicle_range in from_times.items() for value in vehicle_range]
+    rows = frappe.db.sql(
+        f"""
+        SELECT vehicle_name, TIMESTAMPDIFF(SECOND, '1970-01-01', event_time), latitude, longitude, speed
+        FROM `tabVehicle Tracking System`
+        WHERE ({ranges}) AND event_time < %s
+        ORDER BY vehicle_name, event_time
+        """,
+        values + [to_time],
+    )
+    if not rows:
+        return {}
+
+    names = np.array([row[0] for row in rows], dtype=object)
+    data = np.array(
+        [[_to_float(value) for value in row[1:]] for row in rows],
+        dtype=np.float64,
+    )
+    valid = ~np.isnan(data[:, :3]).any(axis=1) & (data[:, 1] != 0) & (data[:, 2] != 0)
+    names, data = names[valid], data[valid]
+    if not len(names):
+        return {}
+
+    starts, ends = _runs(names)
+    return {
+        names[s]: (data[s:e, 0], data[s:e, 1], data[s:e, 2], data[s:e, 3])
+        for s, e in zip(starts, ends)
+    }
+
+
+def _from_epoch(seconds):
+    return (EPOCH + timedelta(seconds=seconds)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def segment_vehicles(vehicles, from_times, to_time, moving_speed, min_stop_seconds):
+    """
+    (Re)build the segments of each vehicle from its own start time up to
+    `to_time`, replacing any segments that start inside that window.
+    """
+    points = load_points({vehicle: from_times[vehicle] for vehicle in vehicles}, to_time)
+    timestamp = now()
+    user = frappe.session.user
+    values = []
+
+    for vehicle in vehicles:
+        frappe.db.sql(
+            "DELETE FROM `tabVehicle Trip` WHERE vehicle = %s AND start_time >= %s",
+            (vehicle, from_times[vehicle]),
+        )
+        if vehicle not in points:
+            continue
+
+        for segment in segment_points(*points[vehicle], moving_speed, min_stop_seconds):
+            values.append([
+                frappe.generate_hash(length=10), user, user, timestamp, timestamp, 0,
+                vehicle, segment["segment_type"],
+                _from_epoch(segment["start"]), _from_epoch(segment["end"]), segment["duration"],
+                segment["distance_km"], segment["max_speed"], segment["avg_speed"], segment["points"],
+                segment["start_latitude"], segment["start_longitude"],
+                segment["end_latitude"], segment["end_longitude"],
+            ])
+
+    if values:
+        frappe.db.bulk_insert(
+            "Vehicle Trip",
+            [
+                "name", "owner", "modified_by", "creation", "modified", "docstatus",
+                "vehicle", "segment_type", "start_time", "end_time", "duration",
+                "distance_km", "max_speed", "avg_speed", "points",
+                "start_latitude", "start_longitude", "end_latitude", "end_longitude",
+            ],
+            values,
+        )
+    frappe.db.commit()
+    return len(values)
+
+
+def enqueue_trip_update():
+    """Scheduler entry point."""
+    frappe.enqueue(
+        "tracker_erpgulf.tracker_erpgulf.trips.update_trips",
+        queue="long",
+        job_id=TRIP_JOB_ID,
+        deduplicate=True,
+    )
+
+
+def update_trips(vehicles=None, from_time=None):
+    """
+    Incrementally segment new points for the fleet (or the given vehicles).
+
+    Each vehicle restarts from the beginning of its latest segment, which may
+    still be open, so only that segment and anything after it is recomputed.
+    Vehicles without segments start at `from_time`, defaulting to the trip
+    backfill window in Vehicle Tracking Setting. Passing `from_time` for
+    vehicles that already have segments rebuilds them from that point.
+    """
+    settings = frappe.get_single("Vehicle Tracking Setting")
+    moving_speed = flt(settings.trip_moving_speed) or 5
+    min_stop_seconds = (cint(settings.trip_min_stop_minutes) or 5) * 60
+    default_from = get_datetime(from_time) if from_time else add_days(now_datetime(), -(cint(settings.trip_backfill_days) or 1))
+    to_time = now_datetime()
+
+    if vehicles is None:
+        vehicles = frappe.get_all("Vehicle Live State", pluck="vehicle")
+    elif isinstance(vehicles, str):
+        vehicles = frappe.parse_json(vehicles)
+
+    latest = dict(frappe.db.sql(
+        "SELECT vehicle, MAX(start_time) FROM `tabVehicle Trip` GROUP BY vehicle"
+    )) if not from_time else {}
+
+    segments = 0
+    for start in range(0, len(vehicles), VEHICLES_PER_QUERY):
+        batch = vehicles[start:start + VEHICLES_PER_QUERY]
+        from_times = {vehicle: latest.get(vehicle) or default_from for vehicle in batch}
+        segments += segment_vehicles(batch, from_times, to_time, moving_speed, min_stop_seconds)
+
+    return segments
+
+
+@frappe.whitelist()
+def rebuild_trips(vehicle, from_date):
+    """Recompute one vehicle's trips from a date in the background."""
+    frappe.only_for("System Manager")
+    frappe.enqueue(
+        "tracker_erpgulf.tracker_erpgulf.trips.update_trips",
+        queue="long",
+        vehicles=[vehicle],
+        from_time=str(get_datetime(from_date)),
+    )
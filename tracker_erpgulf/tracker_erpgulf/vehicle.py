@@ -27,42 +27,213 @@
 #         last = loc            # update last seen location
 
 #     return cleaned
+import json
+import time
+
 import frappe
-from frappe.utils import get_datetime
+from datetime import datetime
+from frappe.utils import add_days, add_to_date, date_diff, getdate, now_datetime, nowdate
+
+
+TIMELINE_CACHE_PREFIX = "vehicle_route_timeline"
+TIMELINE_LRU_KEY = "vehicle_route_timeline_lru"
+TIMELINE_CACHE_TTL = 30 * 24 * 60 * 60  # backstop for keys the LRU set no longer tracks
+MAX_CACHED_TIMELINES = 20000  # vehicle-days kept in Redis
+MAX_TIMELINE_VEHICLES = 200
+MAX_TIMELINE_DAYS = 31
+TIMELINE_SETTLE_HOURS = 1  # late points of yesterday still arrive just after midnight
+
+
+def get_day_bounds(day):
+    """Start and end datetimes of a calendar day, for range predicates on event_time."""
+    day = getdate(day)
+    return datetime.combine(day, datetime.min.time()), datetime.combine(day, datetime.max.time())
+
 
 @frappe.whitelist()
 def get_nearest_locations(vehicle, route_date):
-    tracking = frappe.qb.DocType("Vehicle Tracking System")
+    """
+    The vehicle's locations over a day with consecutive repeats collapsed,
+    each with the time it was first reported.
+    """
+    day = getdate(route_date)
+    return fetch_timelines([vehicle], day, day).get(vehicle, {}).get(str(day), [])
+
+
+def fetch_timelines(vehicles, from_date, to_date):
+    """
+    Location timelines of several vehicles over a date range in one query, as
+    {reg_no: {"YYYY-MM-DD": [{"location", "time"}]}}. LAG compares every point
+    with the one before it on the same vehicle-day inside the database, so only
+    location changes are returned and the address text is joined for those rows
+    alone. Days without any change are absent.
+    """
+    if not vehicles:
+        return {}
+
+    rows = frappe.db.sql(
+        """
+        SELECT
+            t.reg_no, t.day, loc.address AS location,
+            IFNULL(DATE_FORMAT(t.event_time, '%%H:%%i:%%s'), '') AS time
+        FROM (
+            SELECT
+                reg_no, name, event_time, location, DATE(event_time) AS day,
+                LAG(location) OVER (PARTITION BY reg_no, DATE(event_time) ORDER BY event_time, name)
+                    AS previous_location
+            FROM `tabVehicle Tracking System`
+            WHERE reg_no IN %(vehicles)s AND event_time BETWEEN %(start)s AND %(end)s
+        ) t
+        LEFT JOIN `tabTracking Location` loc ON loc.name = t.location
+        WHERE NOT (t.location <=> t.previous_location)
+        ORDER BY t.reg_no, t.event_time, t.name
+        """,
+        {
+            "vehicles": tuple(vehicles),
+            "start": get_day_bounds(from_date)[0],
+            "end": get_day_bounds(to_date)[1],
+        },
+        as_dict=True,
+    )
+
+    timelines = {}
+    for row in rows:
+        days = timelines.setdefault(row.reg_no, {})
+        days.setdefault(str(row.day), []).append({"location": row.location, "time": row.time})
+    return timelines
+
+
+@frappe.whitelist()
+def get_route_timelines(vehicles, from_date, to_date=None):
+    """
+    Location timelines of several vehicles over a date range, as
+    {reg_no: {"YYYY-MM-DD": [{"location", "time"}]}} with every requested day
+    present. Past days rarely change, so days with points are cached in Redis
+    per vehicle-day until ingestion writes late points for them; today (and
+    yesterday, for the first hour after midnight) and past days not in the
+    cache are read with a single query.
+    """
+    frappe.has_permission("Vehicle Tracking System", throw=True)
+
+    if isinstance(vehicles, str):
+        vehicles = frappe.parse_json(vehicles)
+    vehicles = list(dict.fromkeys(vehicle for vehicle in vehicles or [] if vehicle))
+    from_date = getdate(from_date)
+    to_date = getdate(to_date or from_date)
+    days = date_diff(to_date, from_date) + 1
+
+    if not vehicles or len(vehicles) > MAX_TIMELINE_VEHICLES:
+        frappe.throw(f"Select 1 to {MAX_TIMELINE_VEHICLES} vehicles")
+    if days < 1 or days > MAX_TIMELINE_DAYS:
+        frappe.throw(f"Select a date range of 1 to {MAX_TIMELINE_DAYS} days")
+
+    today = getdate(nowdate())
+    settled = getdate(add_to_date(now_datetime(), hours=-TIMELINE_SETTLE_HOURS))
+    dates = [str(add_days(from_date, offset)) for offset in range(days) if add_days(from_date, offset) <= today]
+    past = [day for day in dates if getdate(day) < settled]
+
+    timelines = {vehicle: {} for vehicle in vehicles}
+    cached = get_cached_timelines([(vehicle, day) for vehicle in vehicles for day in past])
+    for (vehicle, day), timeline in cached.items():
+        timelines[vehicle][day] = timeline
 
-    rows = (
-        frappe.qb.from_(tracking)
-        .select(
-            tracking.nearest_location,
-            tracking.date   # datetime field
+    missing = [(vehicle, day) for vehicle in vehicles for day in dates if day not in timelines[vehicle]]
+    if missing:
+        fetched = fetch_timelines(
+            list(dict.fromkeys(vehicle for vehicle, _ in missing)),
+            min(day for _, day in missing),
+            max(day for _, day in missing),
         )
-        .where(tracking.reg_no == vehicle)
-        .where(tracking.date.like(f"{route_date}%"))
-        .orderby(tracking.date)
-    ).run(as_dict=True)
+        for vehicle, day in missing:
+            timelines[vehicle][day] = fetched.get(vehicle, {}).get(day, [])
 
-    cleaned = []
-    last_location = None
+        # Empty days are not cached: their points may still be on the way
+        cache_timelines({
+            (vehicle, day): timelines[vehicle][day]
+            for vehicle, day in missing
+            if getdate(day) < settled and timelines[vehicle][day]
+        })
 
-    for r in rows:
-        location = r.nearest_location
-        time_str = ""
+    return {vehicle: {day: timelines[vehicle][day] for day in dates} for vehicle in vehicles}
 
-        # extract time from datetime
-        if r.date:
-            dt = get_datetime(r.date)
-            time_str = dt.strftime("%H:%M:%S")
 
-        if location != last_location:
-            cleaned.append({
-                "location": location,
-                "time": time_str
-            })
+def get_cached_timelines(keys):
+    """Cached timelines of (vehicle, day) pairs, fetched together; hits are marked as recently used."""
+    if not keys:
+        return {}
+
+    cache = frappe.cache()
+    values = cache.mget([_timeline_key(vehicle, day) for vehicle, day in keys])
+    hits = {key: json.loads(value) for key, value in zip(keys, values) if value is not None}
+    if hits:
+        cache.zadd(_timeline_key(), {_timeline_member(*key): time.time() for key in hits})
+    return hits
+
+
+def cache_timelines(timelines):
+    """
+    Cache past-day timelines and evict the least recently used ones beyond
+    MAX_CACHED_TIMELINES. A sorted set scored by last use tracks recency.
+    """
+    if not timelines:
+        return
+
+    cache = frappe.cache()
+    pipeline = cache.pipeline()
+    for (vehicle, day), timeline in timelines.items():
+        pipeline.set(_timeline_key(vehicle, day), json.dumps(timeline, separators=(",", ":")), ex=TIMELINE_CACHE_TTL)
+    pipeline.zadd(_timeline_key(), {_timeline_member(*key): time.time() for key in timelines})
+    pipeline.execute()
+
+    excess = cache.zcard(_timeline_key()) - MAX_CACHED_TIMELINES
+    if excess > 0:
+        evicted = [member for member, _ in cache.zpopmin(_timeline_key(), excess)]
+        cache.delete(*[_timeline_key(*frappe.safe_decode(member).rsplit("|", 1)) for member in evicted])
+
+
+def invalidate_route_timelines(rows):
+    """
+    Ingestion hook: once `rows` commit, drop the cached timelines of the past
+    vehicle-days they add points to (late, backfilled or re-ingested points).
+    """
+    today = nowdate()
+    keys = {
+        (row["reg_no"], str(row["event_time"])[:10])
+        for row in rows
+        if row.get("reg_no") and row.get("event_time") and str(row["event_time"])[:10] < today
+    }
+    if keys:
+        frappe.db.after_commit.add(lambda: forget_timelines(keys))
+
+
+def forget_timelines(keys):
+    cache = frappe.cache()
+    cache.delete(*[_timeline_key(vehicle, day) for vehicle, day in keys])
+    cache.zrem(_timeline_key(), *[_timeline_member(vehicle, day) for vehicle, day in keys])
+
+
+def _timeline_member(vehicle, day):
+    return f"{vehicle}|{day}"
+
+
+def _timeline_key(vehicle=None, day=None):
+    if vehicle is None:
+        return frappe.cache().make_key(TIMELINE_LRU_KEY)
+    return frappe.cache().make_key(f"{TIMELINE_CACHE_PREFIX}:{vehicle}:{day}")
+
+
+@frappe.whitelist()
+def get_live_state(vehicle=None):
+    """
+    Current position, speed, A/C and status from `Vehicle Live State`,
+    for one vehicle or for the whole fleet.
+    """
+    fields = [
+        "vehicle", "reg_no", "position", "speed", "ac", "status", "ignition_status",
+        "last_comm", "latitude", "longitude", "nearest_location", "gmap"
+    ]
 
-        last_location = location
+    if vehicle:
+        return frappe.db.get_value("Vehicle Live State", vehicle, fields, as_dict=True)
 
-    return cleaned
+    return frappe.get_all("Vehicle Live State", fields=fields, order_by="vehicle")
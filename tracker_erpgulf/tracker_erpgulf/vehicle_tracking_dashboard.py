@@ -1,92 +1,129 @@
 import frappe
-from frappe.utils import getdate, nowdate
+from frappe.utils import flt, getdate, nowdate
 from datetime import datetime
 
+DASHBOARD_CACHE_KEY = "vehicle_tracking_dashboard"
+DASHBOARD_CACHE_TTL = 60  # seconds; ingestion clears it as soon as new data lands
+DASHBOARD_EVENT = "vehicle_tracking_dashboard_update"
+LIVE_STATE_DOCTYPE = "Vehicle Live State"
+
+# Position mapping
+STATUS_MAP = {
+    "P - Parked Vehicle": "parked",
+    "M - Moving Vehicle": "moving",
+    "S - Stopped Vehicle": "stopped"
+}
+
+
 @frappe.whitelist(allow_guest=True)
 def get_dashboard_data():
-    today = getdate(nowdate())
-    start_of_day = datetime.combine(today, datetime.min.time())
-    end_of_day = datetime.combine(today, datetime.max.time())
+    data = frappe.cache().get_value(DASHBOARD_CACHE_KEY)
+    if data is None:
+        data = build_dashboard_data()
+        frappe.cache().set_value(DASHBOARD_CACHE_KEY, data, expires_in_sec=DASHBOARD_CACHE_TTL)
+    return data
 
-    # Fetch all Vehicle Tracking System records
-    all_records = frappe.get_all(
-        "Vehicle Tracking System",
-        fields=[
-            "vehicle_name", "reg_no", "position", "last_comm",
-            "kms", "ac", "today_workinghours"
-        ],
-        order_by="modified desc"
-    )
 
-    # Filter today's records based on last_comm
-    today_records = [
-        rec for rec in all_records
-        if rec.last_comm and start_of_day <= rec.last_comm <= end_of_day
-    ]
-
-    # Position mapping
-    status_map = {
-        "P - Parked Vehicle": "parked",
-        "M - Moving Vehicle": "moving",
-        "S - Stopped Vehicle": "stopped"
+def clear_dashboard_cache():
+    frappe.cache().delete_value(DASHBOARD_CACHE_KEY)
+
+
+def build_dashboard_data():
+    return {**get_dashboard_counters(), "vehicle_list": get_vehicle_list()}
+
+
+def publish_dashboard_delta(since):
+    """
+    Push the vehicles whose live state was written at or after `since`, with
+    freshly computed counters, to open dashboards, which patch themselves in
+    place instead of reloading everything. Nothing is sent if no vehicle changed.
+    Deltas go to the Vehicle Live State doctype room, which only sessions that
+    can read Vehicle Live State are allowed to join.
+    """
+    vehicles = get_vehicle_list({"modified": [">=", since]})
+    if not vehicles:
+        return
+
+    try:
+        frappe.publish_realtime(
+            DASHBOARD_EVENT,
+            {"counters": get_dashboard_counters(), "vehicles": vehicles},
+            doctype=LIVE_STATE_DOCTYPE,
+        )
+    except Exception:
+        frappe.log_error(message=frappe.get_traceback(), title="Vehicle Tracking Dashboard Push Failed")
+
+
+def get_dashboard_counters():
+    today = getdate(nowdate())
+    bounds = {
+        "start": datetime.combine(today, datetime.min.time()),
+        "end": datetime.combine(today, datetime.max.time()),
     }
 
+    # Vehicles that reported today, counted by position and A/C in SQL
+    groups = frappe.db.sql(
+        """
+        SELECT
+            position,
+            UPPER(IFNULL(ac, '')) AS ac,
+            COUNT(*) AS vehicles,
+            SUM(IFNULL(kms, 0)) AS kms,
+            SUM(FLOOR(CAST(IFNULL(NULLIF(today_workinghours, ''), '0') AS DECIMAL(20, 3)) / 1000)) AS working_seconds,
+            SUM(CAST(IFNULL(NULLIF(today_workinghours, ''), '0') AS DECIMAL(20, 3)) >= 1000) AS working_vehicles
+        FROM `tabVehicle Live State`
+        WHERE last_comm BETWEEN %(start)s AND %(end)s
+        GROUP BY position, UPPER(IFNULL(ac, ''))
+        """,
+        bounds,
+        as_dict=True
+    )
+
     moving = stopped = parked = 0
     ac_on = ac_off = 0
+    today_count = 0
     total_distance = 0
     total_working_seconds = 0
-    vehicle_distances = {}
-
-    def ms_to_hms(ms):
-        """Convert milliseconds (str or number) to HH:MM:SS"""
-        try:
-            ms = float(ms)
-        except (ValueError, TypeError):
-            ms = 0
-        seconds = int(ms // 1000)
-        h = seconds // 3600
-        m = (seconds % 3600) // 60
-        s = seconds % 60
-        return h, m, s, seconds
-
     vehicle_count_for_avg = 0
 
-    for rec in today_records:
-        status_key = status_map.get(rec.position, "parked")
+    for group in groups:
+        status_key = STATUS_MAP.get(group.position, "parked")
         if status_key == "moving":
-            moving += 1
+            moving += group.vehicles
         elif status_key == "stopped":
-            stopped += 1
+            stopped += group.vehicles
         else:
-            parked += 1
-
-        kms = rec.kms or 0
-        total_distance += kms
-        vehicle_distances[rec.vehicle_name] = kms
-
-        # Today working hours in milliseconds
-        wh_ms = getattr(rec, "today_workinghours", 0) or 0
-        h, m, s, sec = ms_to_hms(wh_ms)
-        if sec > 0:
-            total_working_seconds += sec
-            vehicle_count_for_avg += 1
-
-        ac_value = (rec.ac or "").upper()
-        if ac_value == "ON":
-            ac_on += 1
+            parked += group.vehicles
+
+        if group.ac == "ON":
+            ac_on += group.vehicles
         else:
-            ac_off += 1
+            ac_off += group.vehicles
+
+        today_count += group.vehicles
+        total_distance += flt(group.kms)
+        total_working_seconds += int(group.working_seconds or 0)
+        vehicle_count_for_avg += int(group.working_vehicles or 0)
 
     # Top 8 vehicles by distance
-    top_vehicles = sorted(vehicle_distances.items(), key=lambda x: x[1], reverse=True)[:8]
-    distance_chart_labels = [v for v, _ in top_vehicles]
-    distance_chart_values = [d for _, d in top_vehicles]
+    top_vehicles = frappe.db.sql(
+        """
+        SELECT vehicle, IFNULL(kms, 0) AS kms
+        FROM `tabVehicle Live State`
+        WHERE last_comm BETWEEN %(start)s AND %(end)s
+        ORDER BY kms DESC
+        LIMIT 8
+        """,
+        bounds,
+        as_dict=True
+    )
+    distance_chart_labels = [v.vehicle for v in top_vehicles]
+    distance_chart_values = [flt(v.kms) for v in top_vehicles]
 
-    most_run = max(vehicle_distances.items(), key=lambda x: x[1])[0] if vehicle_distances else None
+    most_run = top_vehicles[0].vehicle if top_vehicles else None
 
-    today_vehicle_set = set(rec.vehicle_name for rec in today_records)
-    all_vehicles = frappe.get_all("Vehicle", fields=["name"])
-    not_run_today = len([v for v in all_vehicles if v.name not in today_vehicle_set])
+    total_vehicles = frappe.db.count("Vehicle")
+    not_run_today = max(total_vehicles - today_count, 0)
 
     # Average working hours
     vehicle_count_for_avg = vehicle_count_for_avg or 1
@@ -96,22 +133,6 @@ def get_dashboard_data():
     s = avg_seconds % 60
     avg_duration_str = f"{h:02d}:{m:02d}:{s:02d}"
 
-    # Vehicle list for dashboard
-    vehicle_list = []
-    for rec in all_records:
-        status_key = status_map.get(rec.position, "parked")
-        wh_ms = getattr(rec, "today_workinghours", 0) or 0
-        h, m, s, sec = ms_to_hms(wh_ms)
-        vehicle_list.append({
-            "vehicle_name": rec.vehicle_name,
-            "reg_no": rec.reg_no,
-            "position": status_key.capitalize(),
-            "last_comm": rec.last_comm.strftime("%d-%m-%Y %H:%M:%S") if rec.last_comm else "-",
-            "today_workinghours": f"{h:02d}:{m:02d}:{s:02d}",
-            "kms": rec.kms or 0,
-            "ac": rec.ac or "-"
-        })
-
     return {
         "moving": moving,
         "stopped": stopped,
@@ -121,10 +142,51 @@ def get_dashboard_data():
         "most_run": most_run,
         "not_run_today": not_run_today,
         "avg_duration": avg_duration_str,
-        "avg_distance": total_distance // (len(today_records) or 1),
+        "avg_distance": total_distance // (today_count or 1),
         "distance_chart": {
             "labels": distance_chart_labels,
             "values": distance_chart_values
-        },
-        "vehicle_list": vehicle_list
+        }
     }
+
+
+def ms_to_hms(ms):
+    """Convert milliseconds (str or number) to HH:MM:SS"""
+    try:
+        ms = float(ms)
+    except (ValueError, TypeError):
+        ms = 0
+    seconds = int(ms // 1000)
+    h = seconds // 3600
+    m = (seconds % 3600) // 60
+    s = seconds % 60
+    return h, m, s, seconds
+
+
+def get_vehicle_list(filters=None):
+    """Vehicle list for dashboard, one row per vehicle from Vehicle Live State."""
+    live_states = frappe.get_all(
+        "Vehicle Live State",
+        filters=filters,
+        fields=[
+            "vehicle as vehicle_name", "reg_no", "position", "last_comm",
+            "kms", "ac", "today_workinghours"
+        ],
+        order_by="last_comm desc"
+    )
+
+    vehicle_list = []
+    for rec in live_states:
+        status_key = STATUS_MAP.get(rec.position, "parked")
+        h, m, s, sec = ms_to_hms(rec.today_workinghours or 0)
+        vehicle_list.append({
+            "vehicle_name": rec.vehicle_name,
+            "reg_no": rec.reg_no,
+            "position": status_key.capitalize(),
+            "last_comm": rec.last_comm.strftime("%d-%m-%Y %H:%M:%S") if rec.last_comm else "-",
+            "today_workinghours": f"{h:02d}:{m:02d}:{s:02d}",
+            "kms": rec.kms or 0,
+            "ac": rec.ac or "-"
+        })
+
+    return vehicle_list